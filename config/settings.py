@@ -12,6 +12,22 @@ class Settings:
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    # Point at a local stand-in such as `python -m src.utils.mock_openai` for offline runs
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL") or None
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "30"))
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    # Client-level retries; LLMScheduler already retries with backoff, so keep this at 0
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "200"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "50"))
+    OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+    # Ask for structured output: "json_schema" (models that support it), "json_object" or "off"
+    OPENAI_STRUCTURED_OUTPUT: str = os.getenv("OPENAI_STRUCTURED_OUTPUT", "off").lower()
+    # "record" saves every completion to the cassette, "replay" serves them back offline
+    LLM_CASSETTE_MODE: str = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+    LLM_CASSETTE_PATH: str = os.getenv("LLM_CASSETTE_PATH", "cassettes/llm.jsonl")
+    # "full" or "compact" (static instructions first, so providers can cache the prefix)
+    PROMPT_VARIANT: str = os.getenv("PROMPT_VARIANT", "full").lower()
     
     # Database Configuration
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///trivia_bot.db")
@@ -28,7 +44,116 @@ class Settings:
     DEFAULT_QUESTION_TIMEOUT: int = 30
     BASE_POINTS: int = 100
     MAX_SPEED_BONUS: float = 1.0
+
+    # Question Pool Configuration
+    QUESTION_POOL_ENABLED: bool = os.getenv("QUESTION_POOL_ENABLED", "true").lower() == "true"
+    QUESTION_POOL_LOW_WATERMARK: int = int(os.getenv("QUESTION_POOL_LOW_WATERMARK", "2"))
+    QUESTION_POOL_HIGH_WATERMARK: int = int(os.getenv("QUESTION_POOL_HIGH_WATERMARK", "5"))
+    QUESTION_POOL_MAX_SIZE: int = int(os.getenv("QUESTION_POOL_MAX_SIZE", "10"))
+    QUESTION_POOL_REFILL_INTERVAL: float = float(os.getenv("QUESTION_POOL_REFILL_INTERVAL", "5"))
+    
+    # Question Bank Configuration
+    QUESTION_BANK_ENABLED: bool = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+    QUESTION_BANK_CANDIDATES: int = int(os.getenv("QUESTION_BANK_CANDIDATES", "10"))
+    
+    # Generation Worker Configuration: with workers enabled the bot only serves
+    # banked questions, and `python -m src.trivia.worker` processes fill the bank
+    GENERATION_WORKERS_ENABLED: bool = os.getenv("GENERATION_WORKERS_ENABLED", "false").lower() == "true"
+    WORKER_READY_TARGET: int = int(os.getenv("WORKER_READY_TARGET", "30"))  # unserved questions per key
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    WORKER_POLL_INTERVAL: float = float(os.getenv("WORKER_POLL_INTERVAL", "15"))
+    WORKER_CLAIM_TTL: float = float(os.getenv("WORKER_CLAIM_TTL", "120"))
+    
+    # Demand Model Configuration: pre-generation targets follow game_sessions history
+    DEMAND_ENABLED: bool = os.getenv("DEMAND_ENABLED", "true").lower() == "true"
+    DEMAND_HISTORY_DAYS: int = int(os.getenv("DEMAND_HISTORY_DAYS", "28"))
+    DEMAND_REFRESH_INTERVAL: float = float(os.getenv("DEMAND_REFRESH_INTERVAL", "3600"))
+    DEMAND_MIN_TARGET: int = int(os.getenv("DEMAND_MIN_TARGET", "1"))  # questions kept for keys nobody plays
+    
+    # Re-serve banked questions this old with shuffled options, skipping any the user played recently
+    REUSE_ENABLED: bool = os.getenv("REUSE_ENABLED", "true").lower() == "true"
+    REUSE_MIN_AGE_DAYS: float = float(os.getenv("REUSE_MIN_AGE_DAYS", "14"))
+    REUSE_USER_COOLDOWN_DAYS: float = float(os.getenv("REUSE_USER_COOLDOWN_DAYS", "30"))
+    
+    # Packed corpus for fallback questions, built with python -m src.trivia.build_corpus
+    FALLBACK_CORPUS_PATH: str = os.getenv("FALLBACK_CORPUS_PATH", "fallback_corpus.bin")
+    
+    # Seen-question filters are ~4 KB per user; this caps the in-memory cache (~20 MB)
+    SEEN_FILTER_CACHE_USERS: int = int(os.getenv("SEEN_FILTER_CACHE_USERS", "5000"))
+    # A user's filter is written back every SEEN_SAVE_EVERY questions, and all unsaved
+    # ones every SEEN_FLUSH_INTERVAL seconds, rather than once per question served
+    SEEN_SAVE_EVERY: int = int(os.getenv("SEEN_SAVE_EVERY", "5"))
+    SEEN_FLUSH_INTERVAL: float = float(os.getenv("SEEN_FLUSH_INTERVAL", "60"))
+    
+    # Near-Duplicate Detection Configuration
+    NEAR_DUPLICATE_ENABLED: bool = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.4"))
+    
+    # Prefetch Configuration
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_TTL: float = float(os.getenv("PREFETCH_TTL", "120"))
     
+    # Batch Generation Configuration
+    QUESTION_BATCH_SIZE: int = int(os.getenv("QUESTION_BATCH_SIZE", "5"))
+    QUESTION_BATCH_MAX_SIZE: int = int(os.getenv("QUESTION_BATCH_MAX_SIZE", "10"))
+    
+    # Generate this many candidates at once instead of retrying serially (0 or 1 disables)
+    PARALLEL_CANDIDATES: int = int(os.getenv("PARALLEL_CANDIDATES", "0"))
+    PARALLEL_CANDIDATES_MODE: str = os.getenv("PARALLEL_CANDIDATES_MODE", "concurrent").lower()  # or "batch"
+    
+    # Stream batches so the first question can be shown before the rest arrive
+    STREAMING_ENABLED: bool = os.getenv("STREAMING_ENABLED", "true").lower() == "true"
+    STREAM_EXPLANATION_WAIT: float = float(os.getenv("STREAM_EXPLANATION_WAIT", "3"))
+    # "inline" generates explanations with the question; "deferred" fetches them after it's served
+    EXPLANATION_MODE: str = os.getenv("EXPLANATION_MODE", "inline").lower()
+    
+    # Request Hedging Configuration: covers non-streamed calls only (single
+    # questions, candidates, STREAMING_ENABLED=false); streamed batches, the
+    # default /trivia path, are never hedged
+    HEDGE_ENABLED: bool = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+    HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "90"))
+    HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    HEDGE_LATENCY_WINDOW: int = int(os.getenv("HEDGE_LATENCY_WINDOW", "200"))
+    HEDGE_MAX_PER_MINUTE: int = int(os.getenv("HEDGE_MAX_PER_MINUTE", "10"))
+    HEDGE_MAX_RATIO: float = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+    
+    # Circuit Breaker Configuration
+    CIRCUIT_BREAKER_ENABLED: bool = os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+    CIRCUIT_FAILURE_RATE: float = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+    CIRCUIT_MIN_CALLS: int = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+    CIRCUIT_WINDOW: int = int(os.getenv("CIRCUIT_WINDOW", "20"))
+    CIRCUIT_SLOW_CALL_SECONDS: float = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "10"))
+    CIRCUIT_COOLDOWN: float = float(os.getenv("CIRCUIT_COOLDOWN", "30"))
+    
+    # LLM Scheduler Configuration
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    # Slots background work (pool refills, prefetches) may never take
+    LLM_INTERACTIVE_RESERVE: int = int(os.getenv("LLM_INTERACTIVE_RESERVE", "2"))
+    # 0 disables token-per-minute limiting
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+    
+    # Generation Budget Configuration
+    BUDGET_ENABLED: bool = os.getenv("BUDGET_ENABLED", "true").lower() == "true"
+    USER_GENERATION_BURST: int = int(os.getenv("USER_GENERATION_BURST", "5"))
+    USER_GENERATIONS_PER_HOUR: float = float(os.getenv("USER_GENERATIONS_PER_HOUR", "30"))
+    GUILD_TOKEN_BURST: int = int(os.getenv("GUILD_TOKEN_BURST", "50000"))
+    GUILD_TOKENS_PER_HOUR: float = float(os.getenv("GUILD_TOKENS_PER_HOUR", "200000"))
+    TOKEN_USAGE_FLUSH_INTERVAL: float = float(os.getenv("TOKEN_USAGE_FLUSH_INTERVAL", "60"))
+    
+    # Model Routing Configuration
+    # Candidate models, comma separated; the first is used until the others are profiled
+    LLM_MODELS: str = os.getenv("LLM_MODELS", "gpt-3.5-turbo")
+    # Pin routes to a model, e.g. "hard=gpt-4o,persona=gpt-3.5-turbo" (routes: easy, medium, hard, persona)
+    MODEL_ROUTES: str = os.getenv("MODEL_ROUTES", "")
+    MODEL_LATENCY_BUDGET: float = float(os.getenv("MODEL_LATENCY_BUDGET", "8"))
+    MODEL_MIN_PASS_RATE: float = float(os.getenv("MODEL_MIN_PASS_RATE", "0.8"))
+    MODEL_MIN_SAMPLES: int = int(os.getenv("MODEL_MIN_SAMPLES", "10"))
+    MODEL_EXPLORE_RATE: float = float(os.getenv("MODEL_EXPLORE_RATE", "0.05"))
+    MODEL_PROFILE_WINDOW: int = int(os.getenv("MODEL_PROFILE_WINDOW", "100"))
+
     @classmethod
     def validate(cls) -> bool:
         """Validate that required environment variables are set."""
@@ -54,6 +54,7 @@ def main():
     # Required packages
     packages = [
         "discord.py>=2.3.0",
+        "aiohttp>=3.8.0",
         "openai>=1.0.0", 
         "python-dotenv>=1.0.0",
         "sqlalchemy>=2.0.0",
@@ -3,6 +3,7 @@ from discord.ext import commands
 import logging
 from typing import Optional
 from config.settings import settings
+from src.utils.openai_client import openai_client
 
 class TriviaBot(commands.Bot):
     def __init__(self):
@@ -84,4 +85,5 @@ class TriviaBot(commands.Bot):
     async def close(self):
         """Clean shutdown."""
         self.logger.info("Shutting down bot...")
+        await openai_client.close()
         await super().close()
\ No newline at end of file
@@ -2,6 +2,12 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
+from collections import defaultdict
+from typing import Dict
+
+from src.trivia.generator import trivia_generator
+from src.utils.circuit_breaker import openai_breaker
+from src.utils.llm_scheduler import llm_scheduler
 
 class AdminCog(commands.Cog):
     def __init__(self, bot):
@@ -22,8 +28,178 @@ class AdminCog(commands.Cog):
         embed.add_field(name="Users", value=len(self.bot.users), inline=True)
         embed.add_field(name="Latency", value=f"{round(self.bot.latency * 1000)}ms", inline=True)
         
+        pool_stats = trivia_generator.question_pool.get_stats()
+        embed.add_field(
+            name="Question Pool",
+            value=f"{pool_stats['size']} ready | {pool_stats['hit_rate']:.1f}% hit rate "
+                  f"({pool_stats['hits']} hits, {pool_stats['misses']} misses)",
+            inline=False
+        )
+        
+        serve_stats = trivia_generator.get_serve_stats()
+        embed.add_field(
+            name="Question Sources",
+            value=f"Prefetch: {serve_stats['prefetch']} | Bank: {serve_stats['bank']} | "
+                  f"Pool: {serve_stats['pool']} | Live: {serve_stats['live']} | "
+                  f"Reused: {serve_stats['reuse']} | Degraded: {serve_stats['degraded']} | "
+                  f"Over budget: {serve_stats['budget']} ({serve_stats['bank_rate']:.1f}% from bank, "
+                  f"{serve_stats['reuse_rate']:.1f}% reused) | "
+                  f"{serve_stats['questions_per_call']:.2f} questions per LLM call",
+            inline=False
+        )
+        
+        prefetch_stats = trivia_generator.prefetcher.get_stats()
+        embed.add_field(
+            name="Prefetch",
+            value=f"{prefetch_stats['hit_rate']:.1f}% hit rate ({prefetch_stats['hits']}/{prefetch_stats['issued']}) | "
+                  f"{prefetch_stats['expired']} expired",
+            inline=False
+        )
+        
+        batch_stats = trivia_generator.get_batch_stats()
+        embed.add_field(
+            name="Batch Generation",
+            value=f"{batch_stats['batches']} batches | {batch_stats['acceptance_rate']:.1f}% accepted | "
+                  f"{batch_stats['tokens_per_question']:.0f} tokens/question | "
+                  f"{batch_stats['coalesced']} coalesced",
+            inline=False
+        )
+        
+        parse_stats = trivia_generator.get_parse_stats()
+        if parse_stats:
+            embed.add_field(
+                name="Response Parsing",
+                value="\n".join(
+                    f"{model}: {counts['strict']} clean, {counts['salvaged']} salvaged, "
+                    f"{counts['failed']} failed ({counts['failure_rate']:.1f}%)"
+                    for model, counts in parse_stats.items()
+                ),
+                inline=False
+            )
+        
+        candidate_stats = trivia_generator.get_candidate_stats()
+        if candidate_stats:
+            embed.add_field(
+                name="Candidate Acceptance",
+                value=" | ".join(
+                    f"{category}: {counts['acceptance_rate']:.0f}% of {counts['candidates']}"
+                    for category, counts in sorted(candidate_stats.items())
+                ),
+                inline=False
+            )
+        
+        hedge_stats = trivia_generator.hedger.get_stats()
+        embed.add_field(
+            name="Request Hedging",
+            value=f"{hedge_stats['hedges']} hedged of {hedge_stats['requests']} | "
+                  f"{hedge_stats['wins']} won, {hedge_stats['losses']} lost | "
+                  f"{hedge_stats['throttled']} throttled",
+            inline=False
+        )
+        
+        circuit_stats = openai_breaker.get_stats()
+        embed.add_field(
+            name="OpenAI Circuit",
+            value=f"{circuit_stats['state']} | {circuit_stats['failure_rate']:.0f}% failing | "
+                  f"opened {circuit_stats['opened']}x, {circuit_stats['rejected']} calls rejected",
+            inline=False
+        )
+        
+        routes = []
+        for route, decision in trivia_generator.router.get_table().items():
+            profile = decision["profiles"].get(decision["model"])
+            detail = decision["reason"]
+            if profile and profile["samples"]:
+                detail += f", p50 {profile['p50']:.1f}s"
+                if profile["pass_rate"] is not None:
+                    detail += f", {profile['pass_rate'] * 100:.0f}% pass"
+            routes.append(f"{route}: {decision['model']} ({detail})")
+        embed.add_field(name="Model Routing", value="\n".join(routes), inline=False)
+        
+        scheduler_stats = llm_scheduler.get_stats()
+        queued = scheduler_stats["queued"]
+        embed.add_field(
+            name="LLM Scheduler",
+            value=f"{scheduler_stats['active']} active | queued {queued['interactive']}/"
+                  f"{queued['personality']}/{queued['background']} (interactive/personality/background) | "
+                  f"{scheduler_stats['retries']} retries, {scheduler_stats['rate_limited']} rate limited | "
+                  f"{scheduler_stats['tokens_last_minute']:,} tokens last minute",
+            inline=False
+        )
+        
         await interaction.response.send_message(embed=embed)
     
+    @app_commands.command(name="usage", description="Show OpenAI token usage and cost per guild (owner only)")
+    @app_commands.describe(days="How many days back to include (default 7)")
+    async def usage(self, interaction: discord.Interaction, days: app_commands.Range[int, 1, 90] = 7):
+        """Show estimated OpenAI cost per guild, day by day."""
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can view usage.", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        rows = await trivia_generator.budget.get_usage(days)
+        
+        guilds: Dict[str, Dict] = {}
+        for row in rows:
+            totals = guilds.setdefault(row['guild_id'], {"tokens": 0, "requests": 0, "cost": 0.0, "daily": defaultdict(float)})
+            totals["tokens"] += row['prompt_tokens'] + row['completion_tokens']
+            totals["requests"] += row['requests']
+            totals["cost"] += row['cost']
+            totals["daily"][row['day']] += row['cost']
+        
+        total_cost = sum(totals["cost"] for totals in guilds.values())
+        budget_stats = trivia_generator.budget.get_stats()
+        embed = discord.Embed(
+            title=f"OpenAI Usage (last {days} days)",
+            description=f"${total_cost:.2f} estimated across {len(guilds)} guilds | "
+                        f"{budget_stats['limited']} generations refused over budget",
+            color=0x00ff00
+        )
+        
+        # Embeds hold at most 25 fields
+        for guild_id, totals in sorted(guilds.items(), key=lambda item: -item[1]["cost"])[:25]:
+            guild = self.bot.get_guild(int(guild_id)) if guild_id != '0' else None
+            name = guild.name if guild else ("DMs and background" if guild_id == '0' else f"Guild {guild_id}")
+            daily = " · ".join(f"{day:%m/%d} ${cost:.2f}" for day, cost in sorted(totals["daily"].items()))
+            embed.add_field(
+                name=f"{name}: ${totals['cost']:.2f}",
+                value=f"{totals['tokens']:,} tokens in {totals['requests']} calls\n{daily}"[:1024],
+                inline=False
+            )
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="demand", description="Show forecast demand and hit rate per question key (owner only)")
+    async def demand(self, interaction: discord.Interaction):
+        """Show the demand forecast, pre-generation target and measured hit rate per key."""
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can view demand.", ephemeral=True)
+            return
+        
+        pool = trivia_generator.question_pool
+        table = trivia_generator.demand.get_table(pool.queues)
+        
+        lines = []
+        for row in table[:25]:
+            category, difficulty, era = row["key"]
+            hit_rate = f"{row['hit_rate']:.0f}%" if row["hit_rate"] is not None else "n/a"
+            ready = len(pool.queues[row["key"]]) if row["key"] in pool.queues else 0
+            target = pool.targets.get(row["key"], pool.high_watermark) if pool.enabled else "-"
+            lines.append(
+                f"`{category}/{difficulty}/{era}` {row['forecast']:.1f}/h | {ready}/{target} pooled | "
+                f"{hit_rate} ready ({row['hits']}/{row['hits'] + row['misses']})"
+            )
+        
+        embed = discord.Embed(
+            title="Question Demand",
+            description="\n".join(lines)[:4096] or "No requests or history yet.",
+            color=0x00ff00
+        )
+        embed.set_footer(text="Forecast is requests per hour now (UTC), from game history; "
+                              "ready means served from prefetch, bank or pool")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
     @commands.command(name="sync")
     @commands.is_owner()
     async def sync_commands(self, ctx):
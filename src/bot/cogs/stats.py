@@ -9,6 +9,7 @@ from src.utils.scoring import scoring_system
 from src.personality.response_generator import personality_engine
 from src.personality.personas import ResponseType
 from src.trivia.generator import trivia_generator
+from src.trivia.budget import usage_guild
 
 class StatsCog(commands.Cog):
     def __init__(self, bot):
@@ -137,6 +138,7 @@ class StatsCog(commands.Cog):
     @app_commands.command(name="roast", description="Get roasted by your trivia host based on your stats")
     async def roast_me(self, interaction: discord.Interaction):
         """Generate a playful roast based on user's stats."""
+        usage_guild.set(interaction.guild_id)
         try:
             await interaction.response.defer()
             
@@ -8,16 +8,19 @@ from typing import Dict, Optional, Any
 from datetime import datetime
 
 from src.trivia.generator import trivia_generator, TriviaQuestion
+from src.trivia.budget import usage_guild
 from src.personality.response_generator import personality_engine
 from src.personality.personas import ResponseType
 from src.utils.scoring import scoring_system
 from src.database.database import db_manager
+from config.settings import settings
 
 class TriviaGame:
     """Represents an active trivia game session."""
     
     def __init__(self, user_id: int, channel_id: int, persona: str = "sarcastic_host"):
         self.user_id = user_id
+        self.db_user_id: Optional[int] = None
         self.channel_id = channel_id
         self.persona = persona
         self.current_question: Optional[TriviaQuestion] = None
@@ -33,6 +36,9 @@ class TriviaCog(commands.Cog):
         
         # Initialize database on cog load
         self.bot.loop.create_task(self._initialize_database())
+        
+        # Start pre-generating questions in the background
+        self.bot.loop.create_task(self._start_question_pool())
     
     async def _initialize_database(self):
         """Initialize database tables."""
@@ -41,6 +47,25 @@ class TriviaCog(commands.Cog):
             self.logger.info("Database initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize database: {e}")
+            return
+        
+        try:
+            await trivia_generator.rebuild_near_duplicate_index()
+        except Exception as e:
+            self.logger.error(f"Failed to build near-duplicate index: {e}")
+    
+    async def _start_question_pool(self):
+        """Start the background question pool refill task."""
+        try:
+            trivia_generator.question_pool.start()
+        except Exception as e:
+            self.logger.error(f"Failed to start question pool: {e}")
+    
+    async def cog_unload(self):
+        """Stop background tasks when the cog is unloaded."""
+        trivia_generator.prefetcher.clear()
+        await trivia_generator.question_pool.stop()
+        await trivia_generator.seen_questions.flush()
     
     @app_commands.command(name="trivia", description="Start a trivia question")
     @app_commands.describe(
@@ -57,6 +82,7 @@ class TriviaCog(commands.Cog):
     ):
         """Start a new trivia question."""
         user_id = interaction.user.id
+        usage_guild.set(interaction.guild_id)
         
         # Check if user already has an active game
         if user_id in self.active_games and self.active_games[user_id].is_active:
@@ -72,11 +98,14 @@ class TriviaCog(commands.Cog):
             # Get or create user in database
             user_data = await db_manager.get_or_create_user(str(user_id), interaction.user.display_name)
             
-            # Generate question
-            question = await asyncio.to_thread(trivia_generator.generate_question, category, difficulty, era)
+            # Serve from the bank or pool when possible, otherwise generate live
+            question = await trivia_generator.get_question(
+                category, difficulty, era, user_data['id'], interaction.guild_id
+            )
             
             # Create game session
             game = TriviaGame(user_id, interaction.channel.id, user_data['preferred_persona'])
+            game.db_user_id = user_data['id']
             game.current_question = question
             game.start_time = time.time()
             game.is_active = True
@@ -115,6 +144,7 @@ class TriviaCog(commands.Cog):
     async def answer(self, interaction: discord.Interaction, answer: str):
         """Submit an answer to the current trivia question."""
         user_id = interaction.user.id
+        usage_guild.set(interaction.guild_id)
         
         # Check if user has an active game
         if user_id not in self.active_games or not self.active_games[user_id].is_active:
@@ -144,6 +174,9 @@ class TriviaCog(commands.Cog):
                 )
                 return
             
+            # The question is resolved; start preparing the user's next one
+            trivia_generator.prefetcher.schedule(game.db_user_id)
+            
             # Check if answer is correct
             is_correct = answer == question.correct_answer.upper()
             
@@ -156,12 +189,17 @@ class TriviaCog(commands.Cog):
             user_data = await db_manager.get_or_create_user(str(user_id), interaction.user.display_name)
             
             # Save game session to database
+            requested = question.request_key or (None, None, None)
             game_data = {
                 "user_id": user_data['id'],
+                "question_id": question.question_id,
                 "question_text": question.question,
                 "category": question.category,
                 "difficulty": question.difficulty,
                 "era": question.era,
+                "requested_category": requested[0],
+                "requested_difficulty": requested[1],
+                "requested_era": requested[2],
                 "correct_answer": question.correct_answer,
                 "user_answer": answer,
                 "is_correct": is_correct,
@@ -187,6 +225,9 @@ class TriviaCog(commands.Cog):
                 response_type, game.persona, response_context
             )
             
+            # A streamed question's explanation may still be on its way
+            await question.wait_for_explanation(settings.STREAM_EXPLANATION_WAIT)
+            
             # Create result embed
             embed = self._create_result_embed(
                 question, answer, is_correct, total_score, response_time, personality_response
@@ -220,6 +261,7 @@ class TriviaCog(commands.Cog):
     async def skip(self, interaction: discord.Interaction):
         """Skip the current trivia question."""
         user_id = interaction.user.id
+        usage_guild.set(interaction.guild_id)
         
         if user_id not in self.active_games or not self.active_games[user_id].is_active:
             await interaction.response.send_message(
@@ -235,10 +277,16 @@ class TriviaCog(commands.Cog):
             if game.timeout_task:
                 game.timeout_task.cancel()
             
+            # Start preparing the user's next question
+            trivia_generator.prefetcher.schedule(game.db_user_id)
+            
             # Show correct answer
             question = game.current_question
             correct_option = question.options[ord(question.correct_answer.upper()) - ord('A')]
             
+            # Brief wait only: the interaction must be answered within 3 seconds
+            await question.wait_for_explanation(min(settings.STREAM_EXPLANATION_WAIT, 1))
+            
             embed = discord.Embed(
                 title="Question Skipped",
                 description=f"The correct answer was **{question.correct_answer}: {correct_option}**",
@@ -308,8 +356,12 @@ class TriviaCog(commands.Cog):
                 game = self.active_games[user_id]
                 question = game.current_question
                 
+                # Start preparing the user's next question
+                trivia_generator.prefetcher.schedule(game.db_user_id)
+                
                 # Show timeout message
                 correct_option = question.options[ord(question.correct_answer.upper()) - ord('A')]
+                await question.wait_for_explanation(settings.STREAM_EXPLANATION_WAIT)
                 
                 embed = discord.Embed(
                     title="⏰ Time's Up!",
@@ -1,11 +1,14 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, extract, inspect, select, update, func, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from contextlib import asynccontextmanager
+import json
 import logging
-from typing import AsyncGenerator, Optional
+import random
+from datetime import date, datetime, timedelta
+from typing import AsyncGenerator, Dict, List, Optional
 from config.settings import settings
-from .models import Base, User, GameSession, UserStats, Leaderboard, PersonaSettings
+from .models import Base, User, GameSession, Question, UserStats, Leaderboard, PersonaSettings, TokenUsage, GenerationClaim
 
 class DatabaseManager:
     def __init__(self):
@@ -45,15 +48,35 @@ class DatabaseManager:
                 # PostgreSQL async
                 async with self.engine.begin() as conn:
                     await conn.run_sync(Base.metadata.create_all)
+                    await conn.run_sync(self._add_missing_columns)
             else:
                 # SQLite sync
-                Base.metadata.create_all(bind=self.engine)
+                with self.engine.begin() as conn:
+                    Base.metadata.create_all(bind=conn)
+                    self._add_missing_columns(conn)
             
             self.logger.info("Database tables created successfully")
         except Exception as e:
             self.logger.error(f"Failed to create tables: {e}")
             raise
     
+    def _add_missing_columns(self, connection):
+        """Add nullable columns introduced after a table was created (create_all never alters tables)."""
+        inspector = inspect(connection)
+        
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                self.logger.info(f"Added column {table.name}.{column.name}")
+    
     def get_session(self):
         """Get database session context manager."""
         if hasattr(self, 'async_session') and self.async_session:
@@ -526,5 +549,651 @@ class DatabaseManager:
         finally:
             session.close()
 
+    async def save_questions(self, questions: List[dict]) -> Dict[str, int]:
+        """
+        Add questions to the question bank, skipping any whose text hash is already stored.
+        
+        Returns a mapping of text_hash -> question id for every question passed in.
+        """
+        if not questions:
+            return {}
+        
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                await session.execute(self._insert_questions_statement(questions))
+                result = await session.execute(
+                    select(Question.text_hash, Question.id).where(
+                        Question.text_hash.in_([question['text_hash'] for question in questions])
+                    )
+                )
+                return {text_hash: question_id for text_hash, question_id in result.all()}
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._save_questions_sync, questions)
+    
+    def _save_questions_sync(self, questions: List[dict]) -> Dict[str, int]:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            session.execute(self._insert_questions_statement(questions))
+            result = session.execute(
+                select(Question.text_hash, Question.id).where(
+                    Question.text_hash.in_([question['text_hash'] for question in questions])
+                )
+            )
+            ids = {text_hash: question_id for text_hash, question_id in result.all()}
+            session.commit()
+            return ids
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    async def import_questions(self, questions: List[dict]) -> int:
+        """Add a chunk of questions to the bank in one transaction. Returns how many were new."""
+        if not questions:
+            return 0
+        
+        rows = [dict(question, options=json.dumps(question['options'])) for question in questions]
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                result = await session.execute(self._import_questions_statement(), rows)
+                return len(result.all())
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._import_questions_sync, rows)
+    
+    def _import_questions_sync(self, rows: List[dict]) -> int:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            inserted = len(session.execute(self._import_questions_statement(), rows).all())
+            session.commit()
+            return inserted
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _import_questions_statement(self):
+        """
+        INSERT executed with many parameter sets, ignoring text hash conflicts.
+        
+        Unlike a multi-row VALUES statement it isn't recompiled per chunk, and
+        RETURNING only yields the rows that were actually inserted.
+        """
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        
+        return insert(Question).on_conflict_do_nothing(index_elements=['text_hash']).returning(Question.id)
+    
+    def _insert_questions_statement(self, questions: List[dict]):
+        """Build a multi-row INSERT that ignores text hash conflicts."""
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        
+        rows = [dict(question, options=json.dumps(question['options'])) for question in questions]
+        return insert(Question).values(rows).on_conflict_do_nothing(index_elements=['text_hash'])
+    
+    async def get_bank_candidates(
+        self,
+        category: str,
+        difficulty: str,
+        era: str,
+        limit: int = 10,
+        created_before: Optional[datetime] = None,
+        cooldown: Optional[tuple] = None,
+        unserved_first: bool = False
+    ) -> List[dict]:
+        """
+        Get up to `limit` banked questions matching a request, starting at a random id.
+        
+        For reuse, `created_before` restricts the search to questions banked
+        before a time, and `cooldown` = (user_id, since) skips questions that
+        user has played since then. With `unserved_first`, questions never
+        served are returned first and served ones only fill the remainder, so
+        the stock generation workers keep topped up is what gets played.
+        """
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                max_id = (await session.execute(select(func.max(Question.id)))).scalar()
+                if not max_id:
+                    return []
+                
+                start = random.randint(1, max_id)
+                questions = []
+                for served, from_start in self._bank_candidate_passes(unserved_first):
+                    if len(questions) < limit:
+                        result = await session.execute(self._bank_candidates_query(
+                            category, difficulty, era, start, limit - len(questions), from_start,
+                            created_before, cooldown, served
+                        ))
+                        questions.extend(result.scalars().all())
+                
+                return [self._question_to_dict(question) for question in questions]
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(
+                self._get_bank_candidates_sync, category, difficulty, era, limit, created_before, cooldown, unserved_first
+            )
+    
+    def _get_bank_candidates_sync(
+        self,
+        category: str,
+        difficulty: str,
+        era: str,
+        limit: int = 10,
+        created_before: Optional[datetime] = None,
+        cooldown: Optional[tuple] = None,
+        unserved_first: bool = False
+    ) -> List[dict]:
+        """Synchronous version for SQLite. Returns dicts to avoid session issues."""
+        session = self.SessionLocal()
+        try:
+            max_id = session.execute(select(func.max(Question.id))).scalar()
+            if not max_id:
+                return []
+            
+            start = random.randint(1, max_id)
+            questions = []
+            for served, from_start in self._bank_candidate_passes(unserved_first):
+                if len(questions) < limit:
+                    questions.extend(session.execute(self._bank_candidates_query(
+                        category, difficulty, era, start, limit - len(questions), from_start,
+                        created_before, cooldown, served
+                    )).scalars().all())
+            
+            return [self._question_to_dict(question) for question in questions]
+        finally:
+            session.close()
+    
+    def _bank_candidate_passes(self, unserved_first: bool) -> List[tuple]:
+        """(served, from_start) for each query: from the start id, then wrapping round, per served filter."""
+        served_filters = (False, True) if unserved_first else (None,)
+        return [(served, from_start) for served in served_filters for from_start in (True, False)]
+    
+    def _bank_candidates_query(
+        self,
+        category: str,
+        difficulty: str,
+        era: str,
+        start: int,
+        limit: int,
+        from_start: bool,
+        created_before: Optional[datetime] = None,
+        cooldown: Optional[tuple] = None,
+        served: Optional[bool] = None
+    ):
+        """
+        Build a bank query walking the primary key from a random start id
+        (or, to wrap around, up to it). 'random' and 'any' match everything.
+        `served` limits it to questions served before (True) or never (False).
+        """
+        query = select(Question)
+        
+        if difficulty != 'any':
+            query = query.where(Question.difficulty == difficulty)
+        if category != 'random':
+            query = query.where(Question.category == category)
+        if era != 'any':
+            query = query.where(Question.era == era)
+        
+        if created_before is not None:
+            query = query.where(Question.created_at < created_before)
+        if served is not None:
+            times_served = func.coalesce(Question.times_served, 0)
+            query = query.where(times_served > 0 if served else times_served == 0)
+        if cooldown is not None:
+            user_id, since = cooldown
+            recently_played = select(GameSession.question_id).where(
+                GameSession.user_id == user_id,
+                GameSession.created_at >= since,
+                GameSession.question_id.is_not(None)
+            )
+            query = query.where(Question.id.not_in(recently_played))
+        
+        if from_start:
+            query = query.where(Question.id >= start)
+        else:
+            query = query.where(Question.id < start)
+        
+        return query.order_by(Question.id).limit(limit)
+    
+    async def record_question_served(self, question_id: int):
+        """Increment a banked question's times_served counter."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                await session.execute(self._question_served_statement(question_id))
+        else:
+            # SQLite sync path
+            import asyncio
+            await asyncio.to_thread(self._record_question_served_sync, question_id)
+    
+    def _record_question_served_sync(self, question_id: int):
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            session.execute(self._question_served_statement(question_id))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _question_served_statement(self, question_id: int):
+        return (
+            update(Question)
+            .where(Question.id == question_id)
+            .values(times_served=func.coalesce(Question.times_served, 0) + 1)
+        )
+    
+    async def save_question_explanation(self, question_id: int, explanation: str):
+        """Fill in a banked question's explanation once it has been fetched."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                await session.execute(self._question_explanation_statement(question_id, explanation))
+        else:
+            # SQLite sync path
+            import asyncio
+            await asyncio.to_thread(self._save_question_explanation_sync, question_id, explanation)
+    
+    def _save_question_explanation_sync(self, question_id: int, explanation: str):
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            session.execute(self._question_explanation_statement(question_id, explanation))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _question_explanation_statement(self, question_id: int, explanation: str):
+        return (
+            update(Question)
+            .where(Question.id == question_id)
+            .values(explanation=explanation)
+        )
+    
+    async def get_seen_questions(self, user_id: int) -> Optional[bytes]:
+        """Get a user's serialized seen-question filter."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                result = await session.execute(select(User.seen_questions).where(User.id == user_id))
+                return result.scalar_one_or_none()
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._get_seen_questions_sync, user_id)
+    
+    def _get_seen_questions_sync(self, user_id: int) -> Optional[bytes]:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            return session.execute(select(User.seen_questions).where(User.id == user_id)).scalar_one_or_none()
+        finally:
+            session.close()
+    
+    async def save_seen_questions(self, user_id: int, data: bytes):
+        """Store a user's serialized seen-question filter."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                await session.execute(update(User).where(User.id == user_id).values(seen_questions=data))
+        else:
+            # SQLite sync path
+            import asyncio
+            await asyncio.to_thread(self._save_seen_questions_sync, user_id, data)
+    
+    def _save_seen_questions_sync(self, user_id: int, data: bytes):
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            session.execute(update(User).where(User.id == user_id).values(seen_questions=data))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    async def add_token_usage(self, rows: List[dict]):
+        """Add per-guild, per-day, per-model request and token counts to the running totals."""
+        if not rows:
+            return
+        
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                await session.execute(self._token_usage_statement(rows))
+        else:
+            # SQLite sync path
+            import asyncio
+            await asyncio.to_thread(self._add_token_usage_sync, rows)
+    
+    def _add_token_usage_sync(self, rows: List[dict]):
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            session.execute(self._token_usage_statement(rows))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _token_usage_statement(self, rows: List[dict]):
+        """Build a multi-row upsert that increments existing counters."""
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        
+        statement = insert(TokenUsage).values(rows)
+        return statement.on_conflict_do_update(
+            index_elements=['guild_id', 'day', 'model'],
+            set_={
+                name: getattr(TokenUsage, name) + getattr(statement.excluded, name)
+                for name in ('requests', 'prompt_tokens', 'completion_tokens')
+            }
+        )
+    
+    async def get_token_usage(self, since: date) -> List[dict]:
+        """Get token usage rows from a day onwards, oldest first."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                result = await session.execute(self._token_usage_query(since))
+                return [dict(row._mapping) for row in result.all()]
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._get_token_usage_sync, since)
+    
+    def _get_token_usage_sync(self, since: date) -> List[dict]:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            result = session.execute(self._token_usage_query(since))
+            return [dict(row._mapping) for row in result.all()]
+        finally:
+            session.close()
+    
+    def _token_usage_query(self, since: date):
+        return (
+            select(
+                TokenUsage.guild_id, TokenUsage.day, TokenUsage.model, TokenUsage.requests,
+                TokenUsage.prompt_tokens, TokenUsage.completion_tokens
+            )
+            .where(TokenUsage.day >= since)
+            .order_by(TokenUsage.day)
+        )
+    
+    async def get_demand_counts(self, since: datetime) -> List[tuple]:
+        """
+        Count games since a time per (category, difficulty, era, weekday, hour).
+        
+        Games are counted under the key the user requested. Games saved
+        before that was recorded fall back to the banked question's category,
+        then to the category stored with the game. Weekdays run from 0
+        (Sunday) to 6. Each row ends with its oldest game's time.
+        """
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                result = await session.execute(self._demand_counts_query(since))
+                return [tuple(row) for row in result.all()]
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._get_demand_counts_sync, since)
+    
+    def _get_demand_counts_sync(self, since: datetime) -> List[tuple]:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            return [tuple(row) for row in session.execute(self._demand_counts_query(since)).all()]
+        finally:
+            session.close()
+    
+    def _demand_counts_query(self, since: datetime):
+        category = func.coalesce(GameSession.requested_category, Question.category, GameSession.category)
+        difficulty = func.coalesce(GameSession.requested_difficulty, GameSession.difficulty)
+        era = func.coalesce(GameSession.requested_era, GameSession.era)
+        weekday = extract('dow', GameSession.created_at)
+        hour = extract('hour', GameSession.created_at)
+        return (
+            select(
+                category, difficulty, era, weekday, hour,
+                func.count(GameSession.id), func.min(GameSession.created_at)
+            )
+            .outerjoin(Question, Question.id == GameSession.question_id)
+            .where(GameSession.created_at >= since)
+            .group_by(category, difficulty, era, weekday, hour)
+        )
+    
+    async def get_question_documents(self) -> List[tuple]:
+        """Get (id, question_text, options, correct_answer) for every banked question."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                result = await session.execute(self._question_documents_query())
+                return [(row[0], row[1], json.loads(row[2]), row[3]) for row in result.all()]
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._get_question_documents_sync)
+    
+    def _get_question_documents_sync(self) -> List[tuple]:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            result = session.execute(self._question_documents_query())
+            return [(row[0], row[1], json.loads(row[2]), row[3]) for row in result.all()]
+        finally:
+            session.close()
+    
+    def _question_documents_query(self):
+        """Select only the columns needed for near-duplicate indexing."""
+        return select(Question.id, Question.question_text, Question.options, Question.correct_answer)
+    
+    async def get_ready_question_counts(self) -> Dict[tuple, int]:
+        """Count banked questions never served yet, per (category, difficulty, era)."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                result = await session.execute(self._ready_counts_query())
+                return {(row[0], row[1], row[2]): row[3] for row in result.all()}
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._get_ready_question_counts_sync)
+    
+    def _get_ready_question_counts_sync(self) -> Dict[tuple, int]:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            result = session.execute(self._ready_counts_query())
+            return {(row[0], row[1], row[2]): row[3] for row in result.all()}
+        finally:
+            session.close()
+    
+    def _ready_counts_query(self):
+        return (
+            select(Question.category, Question.difficulty, Question.era, func.count(Question.id))
+            .where(func.coalesce(Question.times_served, 0) == 0)
+            .group_by(Question.category, Question.difficulty, Question.era)
+        )
+    
+    async def claim_generation_key(
+        self,
+        category: str,
+        difficulty: str,
+        era: str,
+        worker_id: str,
+        lease_seconds: float
+    ) -> bool:
+        """
+        Claim a (category, difficulty, era) key for a generation worker.
+        
+        Succeeds if the key is free, its lease has expired, or the worker
+        already holds it (which renews the lease). The claim is a single
+        conditional UPDATE, so two workers can never both win it.
+        """
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                await session.execute(self._insert_claim_statement(category, difficulty, era))
+                result = await session.execute(
+                    self._claim_statement(category, difficulty, era, worker_id, lease_seconds)
+                )
+                return result.rowcount == 1
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(
+                self._claim_generation_key_sync, category, difficulty, era, worker_id, lease_seconds
+            )
+    
+    def _claim_generation_key_sync(
+        self,
+        category: str,
+        difficulty: str,
+        era: str,
+        worker_id: str,
+        lease_seconds: float
+    ) -> bool:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            session.execute(self._insert_claim_statement(category, difficulty, era))
+            result = session.execute(self._claim_statement(category, difficulty, era, worker_id, lease_seconds))
+            session.commit()
+            return result.rowcount == 1
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _insert_claim_statement(self, category: str, difficulty: str, era: str):
+        """Create the key's claim row if this is the first time it's claimed."""
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        
+        return insert(GenerationClaim).values(
+            category=category, difficulty=difficulty, era=era
+        ).on_conflict_do_nothing(index_elements=['category', 'difficulty', 'era'])
+    
+    def _claim_statement(self, category: str, difficulty: str, era: str, worker_id: str, lease_seconds: float):
+        now = datetime.utcnow()
+        return (
+            update(GenerationClaim)
+            .where(
+                GenerationClaim.category == category,
+                GenerationClaim.difficulty == difficulty,
+                GenerationClaim.era == era,
+                (GenerationClaim.claimed_until.is_(None))
+                | (GenerationClaim.claimed_until < now)
+                | (GenerationClaim.claimed_by == worker_id)
+            )
+            .values(claimed_by=worker_id, claimed_until=now + timedelta(seconds=lease_seconds))
+        )
+    
+    async def release_generation_key(self, category: str, difficulty: str, era: str, worker_id: str):
+        """Give up a worker's claim on a key so others can take it straight away."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                await session.execute(self._release_claim_statement(category, difficulty, era, worker_id))
+        else:
+            # SQLite sync path
+            import asyncio
+            await asyncio.to_thread(self._release_generation_key_sync, category, difficulty, era, worker_id)
+    
+    def _release_generation_key_sync(self, category: str, difficulty: str, era: str, worker_id: str):
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            session.execute(self._release_claim_statement(category, difficulty, era, worker_id))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _release_claim_statement(self, category: str, difficulty: str, era: str, worker_id: str):
+        return (
+            update(GenerationClaim)
+            .where(
+                GenerationClaim.category == category,
+                GenerationClaim.difficulty == difficulty,
+                GenerationClaim.era == era,
+                GenerationClaim.claimed_by == worker_id
+            )
+            .values(claimed_by=None, claimed_until=None)
+        )
+    
+    async def get_questions_after(self, after_id: int, limit: int = 1000) -> List[dict]:
+        """Get the next `limit` banked questions by id, for walking the whole bank in pages."""
+        if hasattr(self, 'async_session') and self.async_session:
+            # PostgreSQL async path
+            async with self._async_session_context() as session:
+                result = await session.execute(self._questions_after_query(after_id, limit))
+                return [self._question_to_dict(question) for question in result.scalars().all()]
+        else:
+            # SQLite sync path
+            import asyncio
+            return await asyncio.to_thread(self._get_questions_after_sync, after_id, limit)
+    
+    def _get_questions_after_sync(self, after_id: int, limit: int = 1000) -> List[dict]:
+        """Synchronous version for SQLite."""
+        session = self.SessionLocal()
+        try:
+            result = session.execute(self._questions_after_query(after_id, limit))
+            return [self._question_to_dict(question) for question in result.scalars().all()]
+        finally:
+            session.close()
+    
+    def _questions_after_query(self, after_id: int, limit: int):
+        return select(Question).where(Question.id > after_id).order_by(Question.id).limit(limit)
+    
+    def _question_to_dict(self, question: Question) -> dict:
+        """Convert a Question row to a plain dict."""
+        return {
+            'id': question.id,
+            'text_hash': question.text_hash,
+            'question_text': question.question_text,
+            'options': json.loads(question.options),
+            'correct_answer': question.correct_answer,
+            'category': question.category,
+            'subcategory': question.subcategory,
+            'difficulty': question.difficulty,
+            'era': question.era,
+            'explanation': question.explanation,
+            'times_served': question.times_served
+        }
+
 # Global database manager instance
 db_manager = DatabaseManager()
\ No newline at end of file
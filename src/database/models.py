@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, Text, LargeBinary, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -20,6 +20,7 @@ class User(Base):
     preferred_persona = Column(String(50), default='sarcastic_host')
     created_at = Column(DateTime, default=datetime.utcnow)
     last_active = Column(DateTime, default=datetime.utcnow)
+    seen_questions = Column(LargeBinary)  # serialized SeenFilter (~4 KB), see src/trivia/seen.py
     
     # Relationships
     game_sessions = relationship("GameSession", back_populates="user")
@@ -44,10 +45,15 @@ class GameSession(Base):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    question_id = Column(Integer, ForeignKey('questions.id'))  # null for fallback questions
     question_text = Column(Text, nullable=False)
     category = Column(String(100))
     difficulty = Column(String(20))
     era = Column(String(50))
+    # The normalized (category, difficulty, era) the user asked for, which demand forecasts count
+    requested_category = Column(String(100))
+    requested_difficulty = Column(String(20))
+    requested_era = Column(String(50))
     correct_answer = Column(String(500), nullable=False)
     user_answer = Column(String(500))
     is_correct = Column(Boolean, default=False)
@@ -62,6 +68,27 @@ class GameSession(Base):
     # Relationships
     user = relationship("User", back_populates="game_sessions")
 
+class Question(Base):
+    __tablename__ = 'questions'
+    
+    id = Column(Integer, primary_key=True)
+    text_hash = Column(String(40), unique=True, index=True, nullable=False)  # SHA-1 of normalized question text
+    question_text = Column(Text, nullable=False)
+    options = Column(Text, nullable=False)  # JSON list of the four options in A-D order
+    correct_answer = Column(String(1), nullable=False)
+    category = Column(String(100), nullable=False)  # requested category, e.g. 'science'
+    subcategory = Column(String(100))  # specific topic it was generated for, e.g. 'Chemistry'
+    difficulty = Column(String(20), nullable=False)
+    era = Column(String(50), default='any')
+    explanation = Column(Text)
+    source = Column(String(50), default='openai')
+    times_served = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_questions_lookup', 'category', 'difficulty', 'era'),
+    )
+
 class UserStats(Base):
     __tablename__ = 'user_stats'
     
@@ -110,4 +137,33 @@ class PersonaSettings(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+class TokenUsage(Base):
+    __tablename__ = 'token_usage'
+    
+    id = Column(Integer, primary_key=True)
+    guild_id = Column(String(20), nullable=False)  # '0' for DMs and background generation
+    day = Column(Date, nullable=False)
+    model = Column(String(50), nullable=False)
+    requests = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    
+    __table_args__ = (
+        Index('ix_token_usage_key', 'guild_id', 'day', 'model', unique=True),
+    )
+
+class GenerationClaim(Base):
+    __tablename__ = 'generation_claims'
+    
+    id = Column(Integer, primary_key=True)
+    category = Column(String(100), nullable=False)
+    difficulty = Column(String(20), nullable=False)
+    era = Column(String(50), nullable=False)
+    claimed_by = Column(String(100))  # worker id holding the key, see src/trivia/worker.py
+    claimed_until = Column(DateTime)  # lease expiry; null or past means the key is free
+    
+    __table_args__ = (
+        Index('ix_generation_claims_key', 'category', 'difficulty', 'era', unique=True),
+    )
@@ -1,8 +1,12 @@
-import openai
 import random
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 from config.settings import settings
+from src.utils.openai_client import openai_client
+from src.utils.circuit_breaker import CircuitOpenError, openai_breaker
+from src.utils.llm_scheduler import Priority, estimate_tokens, llm_scheduler
+from src.utils.model_router import model_router
 from .personas import PersonaManager, ResponseType, PersonaConfig
 
 class PersonalityEngine:
@@ -10,7 +14,7 @@ class PersonalityEngine:
     
     def __init__(self):
         self.logger = logging.getLogger('TriviaBot.PersonalityEngine')
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = openai_client
         self.persona_manager = PersonaManager()
     
     async def generate_response(
@@ -39,9 +43,10 @@ class PersonalityEngine:
                 if template_response:
                     return template_response
             
-            # Fall back to AI generation for more dynamic responses
-            import asyncio
-            return await asyncio.to_thread(self._generate_ai_response, persona, response_type, context)
+            # Fall back to AI generation for more dynamic responses, unless OpenAI is down
+            if not openai_breaker.available():
+                return self._get_fallback_response(response_type, context)
+            return await self._generate_ai_response(persona, response_type, context)
             
         except Exception as e:
             self.logger.error(f"Failed to generate response: {e}")
@@ -79,7 +84,7 @@ class PersonalityEngine:
             self.logger.warning(f"Template response failed: {e}")
             return None
     
-    def _generate_ai_response(
+    async def _generate_ai_response(
         self,
         persona: PersonaConfig,
         response_type: ResponseType,
@@ -90,18 +95,16 @@ class PersonalityEngine:
             # Create context-specific prompt
             prompt = self._create_response_prompt(persona, response_type, context)
             
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": persona.system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.8
-            )
+            messages = [
+                {"role": "system", "content": persona.system_prompt},
+                {"role": "user", "content": prompt}
+            ]
+            response = await self._create_persona_completion(messages, temperature=0.8)
             
             return response.choices[0].message.content.strip()
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             self.logger.error(f"AI response generation failed: {e}")
             raise
@@ -170,15 +173,21 @@ class PersonalityEngine:
         user_stats: Dict[str, Any]
     ) -> str:
         """Generate a custom roast based on user statistics."""
+        if not openai_breaker.available():
+            # OpenAI is down; a canned roast in the persona's voice beats the generic one
+            persona = self.persona_manager.get_persona(persona_name)
+            roast = self._get_template_response(persona, ResponseType.ROAST, user_stats)
+            if roast:
+                return roast
+        
         try:
-            import asyncio
-            return await asyncio.to_thread(self._generate_custom_roast_sync, persona_name, user_stats)
+            return await self._generate_custom_roast_ai(persona_name, user_stats)
         except Exception as e:
             self.logger.error(f"Custom roast generation failed: {e}")
             return "Your stats are so abysmal that my circuits are actually shorting out from pure disappointment. Even my error messages are more intelligent than your trivia performance. 💀"
     
-    def _generate_custom_roast_sync(self, persona_name: str, user_stats: Dict[str, Any]) -> str:
-        """Synchronous custom roast generation."""
+    async def _generate_custom_roast_ai(self, persona_name: str, user_stats: Dict[str, Any]) -> str:
+        """Generate the custom roast with OpenAI."""
         persona = self.persona_manager.get_persona(persona_name)
         
         # Create roast prompt with stats
@@ -194,18 +203,40 @@ Stats:
 
 Give an ABSOLUTELY DEVASTATING roast that's hilariously cruel. Use cutting wit, brutal sarcasm, and creative insults. Compare their performance to pathetic things. Question their intelligence, their life choices, and their basic competence. Be relentlessly harsh but clever. Make it sting with humor. Examples: 'Your win rate is lower than my expectations for humanity' or 'I've seen rocks with better critical thinking skills.' Keep it under 120 words of pure savagery."""
 
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": persona.system_prompt + " You are now in MAXIMUM SAVAGE MODE. Be devastatingly cruel with your wit. Destroy them with creative, brutal humor. Compare them to pathetic things. Make them question everything. Use cutting sarcasm that makes them laugh while crying inside. Be relentlessly harsh but hilariously clever."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150,
-            temperature=1.0
-        )
+        messages = [
+            {"role": "system", "content": persona.system_prompt + " You are now in MAXIMUM SAVAGE MODE. Be devastatingly cruel with your wit. Destroy them with creative, brutal humor. Compare them to pathetic things. Make them question everything. Use cutting sarcasm that makes them laugh while crying inside. Be relentlessly harsh but hilariously clever."},
+            {"role": "user", "content": prompt}
+        ]
+        response = await self._create_persona_completion(messages, temperature=1.0)
         
         return response.choices[0].message.content.strip()
     
+    async def _create_persona_completion(self, messages: List[Dict[str, str]], temperature: float):
+        """Make a persona line API call on the persona route's model."""
+        model = model_router.choose("persona")
+        
+        async def attempt():
+            started = time.monotonic()
+            try:
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=150,
+                    temperature=temperature
+                )
+            except Exception:
+                model_router.record_validation(model, "persona", False)
+                raise
+            model_router.record_latency(model, "persona", time.monotonic() - started)
+            model_router.record_validation(model, "persona", bool(response.choices and response.choices[0].message.content))
+            return response
+        
+        return await llm_scheduler.run(
+            lambda: openai_breaker.call(attempt),
+            estimated_tokens=estimate_tokens(messages, 150),
+            priority=Priority.PERSONALITY
+        )
+    
     def get_available_personas(self) -> Dict[str, str]:
         """Get available personas with descriptions."""
         return self.persona_manager.get_persona_descriptions()
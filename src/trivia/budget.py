@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings
+from src.database.database import db_manager
+from src.utils.llm_scheduler import llm_scheduler
+
+# Discord guild the current task's LLM calls are billed to; None for DMs and background work
+usage_guild: ContextVar[Optional[int]] = ContextVar("usage_guild", default=None)
+
+# USD per 1K (prompt, completion) tokens; unknown models are priced as gpt-3.5-turbo
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4-turbo": (0.01, 0.03)
+}
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Approximate USD cost of a number of tokens on a model."""
+    prices = next(
+        (price for name, price in sorted(MODEL_PRICES.items(), key=lambda item: -len(item[0])) if model.startswith(name)),
+        MODEL_PRICES["gpt-3.5-turbo"]
+    )
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1000
+
+class TokenBucket:
+    """Refills at `rate` units per second up to `capacity`. Spending may overdraw it."""
+    
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+    
+    def refill(self) -> float:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.level
+    
+    def spend(self, amount: float):
+        self.refill()
+        self.level -= amount
+
+class GenerationBudget:
+    """
+    Rate limits fresh OpenAI generations per user and per guild, and records what they cost.
+    
+    Each user gets a bucket of USER_GENERATION_BURST generations refilling at
+    USER_GENERATIONS_PER_HOUR. Each guild gets a bucket of OpenAI tokens
+    (GUILD_TOKEN_BURST, refilling at GUILD_TOKENS_PER_HOUR) charged with the
+    real usage of every call made on its behalf, persona replies included.
+    A request over either budget is served from the bank instead. Usage is
+    summed per guild, day and model and written to the token_usage table
+    every TOKEN_USAGE_FLUSH_INTERVAL seconds.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger('TriviaBot.GenerationBudget')
+        self.enabled = settings.BUDGET_ENABLED
+        self.user_burst = settings.USER_GENERATION_BURST
+        self.user_rate = settings.USER_GENERATIONS_PER_HOUR / 3600
+        self.guild_burst = settings.GUILD_TOKEN_BURST
+        self.guild_rate = settings.GUILD_TOKENS_PER_HOUR / 3600
+        self.flush_interval = settings.TOKEN_USAGE_FLUSH_INTERVAL
+        
+        self.user_buckets: Dict[int, TokenBucket] = {}
+        self.guild_buckets: Dict[int, TokenBucket] = {}
+        # (guild_id, day, model) -> [requests, prompt_tokens, completion_tokens]
+        self._pending: Dict[Tuple[str, date, str], List[int]] = {}
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"allowed": 0, "user_limited": 0, "guild_limited": 0}
+        
+        llm_scheduler.usage_listeners.append(self.record_usage)
+    
+    def try_spend(self, user_id: Optional[int], guild_id: Optional[int]) -> bool:
+        """Take one fresh generation from the user's budget if both budgets allow it."""
+        if not self.allows(user_id, guild_id):
+            return False
+        self.charge(user_id)
+        return True
+    
+    def allows(self, user_id: Optional[int], guild_id: Optional[int]) -> bool:
+        """Whether both budgets have room for a fresh generation, without spending any."""
+        if not self.enabled:
+            return True
+        
+        if user_id is not None and self._user_bucket(user_id).refill() < 1:
+            self.stats["user_limited"] += 1
+            return False
+        
+        if guild_id is not None and self._guild_bucket(guild_id).refill() <= 0:
+            self.stats["guild_limited"] += 1
+            return False
+        
+        self.stats["allowed"] += 1
+        return True
+    
+    def charge(self, user_id: Optional[int]):
+        """Take one fresh generation from the user's budget, e.g. once a prefetched one is served."""
+        if self.enabled and user_id is not None:
+            self._user_bucket(user_id).spend(1)
+    
+    def refund(self, user_id: Optional[int]):
+        """Give back a generation charged by try_spend when the generation then failed."""
+        if self.enabled and user_id is not None:
+            self._user_bucket(user_id).spend(-1)
+    
+    def record_usage(self, model: Optional[str], usage):
+        """Scheduler listener: bill a completed call to the current guild and queue it for storage."""
+        guild_id = usage_guild.get()
+        if self.enabled and guild_id is not None:
+            self._guild_bucket(guild_id).spend(usage.total_tokens)
+        
+        key = (str(guild_id or 0), datetime.utcnow().date(), model or "unknown")
+        counts = self._pending.setdefault(key, [0, 0, 0])
+        counts[0] += 1
+        counts[1] += usage.prompt_tokens or 0
+        counts[2] += usage.completion_tokens or 0
+        
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self.flush())
+    
+    async def flush(self):
+        """Write pending usage to the database and forget buckets that have refilled."""
+        self._last_flush = time.monotonic()
+        pending, self._pending = self._pending, {}
+        rows = [
+            {
+                'guild_id': guild_id,
+                'day': day,
+                'model': model,
+                'requests': counts[0],
+                'prompt_tokens': counts[1],
+                'completion_tokens': counts[2]
+            }
+            for (guild_id, day, model), counts in pending.items()
+        ]
+        
+        try:
+            await db_manager.add_token_usage(rows)
+        except Exception as e:
+            self.logger.warning(f"Failed to save token usage: {e}")
+            # Keep it for the next flush
+            for key, counts in pending.items():
+                merged = self._pending.setdefault(key, [0, 0, 0])
+                for i, value in enumerate(counts):
+                    merged[i] += value
+        
+        # A full bucket is the same as no bucket
+        for buckets in (self.user_buckets, self.guild_buckets):
+            for key in [key for key, bucket in buckets.items() if bucket.refill() >= bucket.capacity]:
+                del buckets[key]
+    
+    async def get_usage(self, days: int = 7) -> List[dict]:
+        """Get stored usage for the last `days` days with an estimated cost on each row."""
+        await self.flush()
+        rows = await db_manager.get_token_usage(datetime.utcnow().date() - timedelta(days=days - 1))
+        for row in rows:
+            row['cost'] = estimate_cost(row['model'], row['prompt_tokens'], row['completion_tokens'])
+        return rows
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get budget decision counters."""
+        stats = dict(self.stats)
+        stats["limited"] = stats["user_limited"] + stats["guild_limited"]
+        return stats
+    
+    def _user_bucket(self, user_id: int) -> TokenBucket:
+        if user_id not in self.user_buckets:
+            self.user_buckets[user_id] = TokenBucket(self.user_burst, self.user_rate)
+        return self.user_buckets[user_id]
+    
+    def _guild_bucket(self, guild_id: int) -> TokenBucket:
+        if guild_id not in self.guild_buckets:
+            self.guild_buckets[guild_id] = TokenBucket(self.guild_burst, self.guild_rate)
+        return self.guild_buckets[guild_id]
@@ -0,0 +1,172 @@
+"""
+Build the packed fallback corpus served when OpenAI and the bank can't be used.
+
+    python -m src.trivia.build_corpus --from-bank [pack.json more.jsonl ...]
+    python -m src.trivia.build_corpus --info
+
+Questions come from the question bank (--from-bank) and/or question packs
+in any format the importer reads; pack questions are validated the same
+way. Exact duplicates are dropped. The corpus is written to
+FALLBACK_CORPUS_PATH (or --output) and replaces the old file atomically,
+so it can be rebuilt while the bot is running; the bot maps the new file
+on its next fallback question.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from array import array
+from pathlib import Path
+from typing import List
+
+from config.settings import settings
+from src.database.database import db_manager
+from src.trivia.corpus import CorpusWriter, FallbackCorpus
+from src.trivia.importer import READERS, QuestionImporter, detect_format
+from src.trivia.generator import trivia_generator
+
+class FingerprintSet:
+    """
+    Open-addressing set of 64-bit fingerprints in one flat array.
+    
+    Takes 16-32 bytes per entry at its 25-50% load factor, against ~70 for
+    a Python set of ints, so deduplicating a large corpus stays small.
+    """
+    
+    def __init__(self, capacity: int = 1 << 16):
+        self.slots = array("Q", bytes(8 * capacity))
+        self.mask = capacity - 1
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def add(self, fingerprint: int) -> bool:
+        """Add a fingerprint; False if it was already present."""
+        fingerprint = fingerprint or 1  # 0 marks an empty slot
+        if not self._insert(fingerprint):
+            return False
+        self.size += 1
+        if self.size * 2 > len(self.slots):
+            self._grow()
+        return True
+    
+    def _insert(self, fingerprint: int) -> bool:
+        slots, mask = self.slots, self.mask
+        index = fingerprint & mask
+        while slots[index]:
+            if slots[index] == fingerprint:
+                return False
+            index = (index + 1) & mask
+        slots[index] = fingerprint
+        return True
+    
+    def _grow(self):
+        old = self.slots
+        self.slots = array("Q", bytes(16 * len(old)))
+        self.mask = len(self.slots) - 1
+        for fingerprint in old:
+            if fingerprint:
+                self._insert(fingerprint)
+
+class CorpusBuilder:
+    """Feeds bank rows into a CorpusWriter, skipping exact duplicates."""
+    
+    def __init__(self, writer: CorpusWriter):
+        self.writer = writer
+        # 64-bit prefixes of text hashes; a collision only drops one question
+        self.seen = FingerprintSet()
+        self.stats = {"added": 0, "duplicates": 0}
+    
+    def add_row(self, row: dict):
+        """Add a bank row, as returned by the database or QuestionImporter.to_row."""
+        if not self.seen.add(int(row['text_hash'][:16], 16)):
+            self.stats["duplicates"] += 1
+            return
+        
+        self.writer.add(
+            row['category'],
+            row['difficulty'],
+            row['question_text'],
+            row['options'],
+            row['correct_answer'],
+            row['explanation'],
+            row['subcategory']
+        )
+        self.stats["added"] += 1
+    
+    async def add_bank(self, page_size: int = 1000):
+        """Add every banked question, paging by id so memory stays flat."""
+        after_id = 0
+        while True:
+            rows = await db_manager.get_questions_after(after_id, page_size)
+            if not rows:
+                return
+            for row in rows:
+                self.add_row(row)
+            after_id = rows[-1]['id']
+    
+    def add_pack(self, importer: QuestionImporter, path: Path, file_format: str):
+        with path.open(encoding="utf-8-sig", newline="") as stream:
+            try:
+                for record in READERS[file_format](stream):
+                    importer.stats["read"] += 1
+                    row = importer.to_row(record)
+                    if row:
+                        self.add_row(row)
+            except ValueError as e:
+                importer.logger.error(f"Stopped reading {path}: {e}")
+
+def print_info(path: str):
+    corpus = FallbackCorpus(path)
+    if not corpus.available():
+        print(f"No usable corpus at {path}")
+        return
+    print(f"{path}: {len(corpus)} questions in {len(corpus.keys)} keys")
+    for (category, difficulty), (_, count) in sorted(corpus.keys.items()):
+        print(f"  {category:<20}{difficulty:<10}{count:>9}")
+    corpus.close()
+
+async def build(args: argparse.Namespace) -> CorpusBuilder:
+    builder = CorpusBuilder(CorpusWriter(args.output))
+    if args.from_bank:
+        await db_manager.create_tables()
+        await builder.add_bank()
+    
+    if args.files:
+        importer = QuestionImporter(trivia_generator, difficulty=args.difficulty, seed=args.seed)
+        for name in args.files:
+            path = Path(name)
+            builder.add_pack(importer, path, args.format or detect_format(path))
+        skipped = importer.stats["unreadable"] + importer.stats["rejected"]
+        print(f"Packs: {importer.stats['read']} read, {skipped} unreadable or rejected", file=sys.stderr)
+    
+    builder.writer.finish()
+    return builder
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Build the packed fallback question corpus")
+    parser.add_argument("files", nargs="*", help="JSON, JSONL or CSV question packs")
+    parser.add_argument("--from-bank", action="store_true", help="include every question in the question bank")
+    parser.add_argument("--output", default=settings.FALLBACK_CORPUS_PATH, help="corpus file (FALLBACK_CORPUS_PATH)")
+    parser.add_argument("--format", choices=sorted(READERS), help="override detection by file extension")
+    parser.add_argument("--difficulty", default="medium", choices=["easy", "medium", "hard"],
+                        help="difficulty for pack questions that don't state one")
+    parser.add_argument("--seed", type=int, default=None, help="seed for shuffling Open Trivia DB answers")
+    parser.add_argument("--info", action="store_true", help="show the questions per key in an existing corpus")
+    parser.add_argument("--verbose", action="store_true", help="log every rejected question")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    if args.info:
+        print_info(args.output)
+        return
+    if not args.from_bank and not args.files:
+        parser.error("give --from-bank and/or question pack files")
+    
+    builder = asyncio.run(build(args))
+    print(f"Wrote {args.output}: {builder.stats['added']} questions in {len(builder.writer.offsets)} keys, "
+          f"{builder.stats['duplicates']} duplicates skipped")
+
+if __name__ == "__main__":
+    main()
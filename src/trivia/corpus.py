@@ -0,0 +1,229 @@
+"""
+Packed, memory-mapped question corpus for serving fallback questions.
+
+The file is built offline (python -m src.trivia.build_corpus) and opened
+with mmap, so the bot keeps no per-question objects in memory: picking a
+question reads one offset from the key's offset array and decodes the one
+record it points at. Opening parses only the key directory, so startup
+time and RSS stay flat however many questions the corpus holds.
+
+Layout, little-endian:
+
+    magic      8 bytes, b"TQCORP01"
+    key count  u32
+    directory  per key: u8 length + category, u8 length + difficulty,
+               u64 file offset of the key's offset array, u32 question count
+    offsets    per key: u64 file offset of each of its records
+    records    u32 length + UTF-8 JSON
+               [question, options, correct_answer, explanation, subcategory]
+"""
+import json
+import logging
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+MAGIC = b"TQCORP01"
+RECORD_LENGTH = struct.Struct("<I")
+OFFSET = struct.Struct("<Q")
+DIRECTORY_ENTRY = struct.Struct("<QI")
+
+CorpusKey = Tuple[str, str]  # (category, difficulty), category lower-cased
+
+class FallbackCorpus:
+    """Read side: random questions per (category, difficulty) straight from the mapped file."""
+    
+    def __init__(self, path: str):
+        self.logger = logging.getLogger('TriviaBot.FallbackCorpus')
+        self.path = path
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._identity: Optional[Tuple[int, int]] = None
+        # key -> (offset array position, count); the only per-key state held
+        self.keys: Dict[CorpusKey, Tuple[int, int]] = {}
+        self._by_difficulty: Dict[str, List[CorpusKey]] = {}
+        self._missing_logged = False
+    
+    def __len__(self) -> int:
+        return sum(count for _, count in self.keys.values())
+    
+    def pick(self, category: Optional[str], difficulty: str, rng: random.Random = random) -> Optional[dict]:
+        """
+        A random question for the key, or None if there is no usable corpus.
+        
+        Without a category, or one the corpus doesn't have, picks from every
+        category at the difficulty, then from every question, weighting keys
+        by size so each question is equally likely.
+        """
+        if not self.available():
+            return None
+        
+        key = ((category or "").lower(), difficulty)
+        if key in self.keys:
+            candidates = [key]
+        else:
+            candidates = self._by_difficulty.get(difficulty) or list(self.keys)
+        
+        key = self._choose(candidates, rng)
+        position, count = self.keys[key]
+        index = rng.randrange(count)
+        
+        (offset,) = OFFSET.unpack_from(self._map, position + index * OFFSET.size)
+        (length,) = RECORD_LENGTH.unpack_from(self._map, offset)
+        start = offset + RECORD_LENGTH.size
+        question, options, correct_answer, explanation, subcategory = json.loads(self._map[start:start + length])
+        
+        return {
+            "question": question,
+            "options": options,
+            "correct_answer": correct_answer,
+            "explanation": explanation,
+            "category": subcategory or key[0],
+            "difficulty": key[1]
+        }
+    
+    def _choose(self, candidates: List[CorpusKey], rng: random.Random) -> CorpusKey:
+        if len(candidates) == 1:
+            return candidates[0]
+        return rng.choices(candidates, [self.keys[key][1] for key in candidates])[0]
+    
+    def available(self) -> bool:
+        """Map the file, or remap it if it was rebuilt since. False if there's nothing to serve."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            if not self._missing_logged:
+                self._missing_logged = True
+                self.logger.info(f"No fallback corpus at {self.path}; using built-in fallback questions")
+            self.close()
+            return False
+        
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if identity == self._identity:
+            return bool(self.keys)
+        
+        self.close()
+        self._identity = identity
+        try:
+            self._open()
+        except (OSError, ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+            self.logger.error(f"Unreadable fallback corpus {self.path}: {e}")
+            self.close()
+            return False
+        
+        self.logger.info(f"Fallback corpus mapped: {len(self)} questions in {len(self.keys)} keys")
+        return bool(self.keys)
+    
+    def _open(self):
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a question corpus")
+        
+        (key_count,) = RECORD_LENGTH.unpack_from(self._map, len(MAGIC))
+        position = len(MAGIC) + RECORD_LENGTH.size
+        for _ in range(key_count):
+            category, position = self._read_name(position)
+            difficulty, position = self._read_name(position)
+            offsets, count = DIRECTORY_ENTRY.unpack_from(self._map, position)
+            position += DIRECTORY_ENTRY.size
+            if offsets + count * OFFSET.size > len(self._map):
+                raise ValueError("truncated corpus")
+            if count:
+                self.keys[(category, difficulty)] = (offsets, count)
+                self._by_difficulty.setdefault(difficulty, []).append((category, difficulty))
+    
+    def _read_name(self, position: int) -> Tuple[str, int]:
+        length = self._map[position]
+        end = position + 1 + length
+        return self._map[position + 1:end].decode("utf-8"), end
+    
+    def close(self):
+        self.keys = {}
+        self._by_difficulty = {}
+        self._identity = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class CorpusWriter:
+    """
+    Write side: appends records to a scratch file, then assembles the corpus.
+    
+    The writer holds only an 8-byte offset per question in memory; the
+    directory and offset arrays are written ahead of the records once
+    every question has been added. The finished file replaces `path`
+    atomically, so a running bot never maps a half-written corpus.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.offsets: Dict[CorpusKey, array] = {}
+        self._records = tempfile.TemporaryFile()
+        self._size = 0
+    
+    def add(self, category: str, difficulty: str, question: str, options: List[str],
+            correct_answer: str, explanation: str = "", subcategory: Optional[str] = None):
+        record = json.dumps(
+            [question, options, correct_answer, explanation or "", subcategory or category],
+            ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        
+        key = (category.lower()[:255], difficulty[:255])
+        self.offsets.setdefault(key, array("Q")).append(self._size)
+        self._records.write(RECORD_LENGTH.pack(len(record)))
+        self._records.write(record)
+        self._size += RECORD_LENGTH.size + len(record)
+    
+    def counts(self) -> Dict[CorpusKey, int]:
+        return {key: len(offsets) for key, offsets in sorted(self.offsets.items())}
+    
+    def finish(self):
+        """Write the corpus to `path`, replacing any previous one."""
+        keys = sorted(self.offsets)
+        names = [(key[0].encode("utf-8")[:255], key[1].encode("utf-8")[:255]) for key in keys]
+        
+        header_size = len(MAGIC) + RECORD_LENGTH.size + sum(
+            2 + len(category) + len(difficulty) + DIRECTORY_ENTRY.size for category, difficulty in names
+        )
+        records_start = header_size + OFFSET.size * sum(len(offsets) for offsets in self.offsets.values())
+        
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        handle, scratch = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as output:
+                output.write(MAGIC)
+                output.write(RECORD_LENGTH.pack(len(keys)))
+                position = header_size
+                for key, (category, difficulty) in zip(keys, names):
+                    output.write(bytes([len(category)]) + category + bytes([len(difficulty)]) + difficulty)
+                    output.write(DIRECTORY_ENTRY.pack(position, len(self.offsets[key])))
+                    position += OFFSET.size * len(self.offsets[key])
+                
+                for key in keys:
+                    offsets = self.offsets[key]
+                    for i in range(len(offsets)):
+                        offsets[i] += records_start
+                    if sys.byteorder != "little":
+                        offsets.byteswap()
+                    offsets.tofile(output)
+                
+                self._records.seek(0)
+                shutil.copyfileobj(self._records, output)
+            os.chmod(scratch, 0o644)  # mkstemp creates it private to the builder
+            os.replace(scratch, self.path)
+        except BaseException:
+            os.unlink(scratch)
+            raise
+        finally:
+            self._records.close()
@@ -0,0 +1,189 @@
+import random
+import re
+import zlib
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Words that carry no meaning about the fact being asked. Dropping them keeps
+# "What is the capital of France?" and "Which city is the capital of France?" close.
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'by', 'called', 'did', 'do', 'does', 'for',
+    'from', 'has', 'have', 'how', 'in', 'into', 'is', 'it', 'its', 'known', 'name',
+    'named', 'of', 'on', 'or', 's', 'that', 'the', 'this', 'to', 'was', 'were', 'what',
+    'when', 'where', 'which', 'who', 'whom', 'whose', 'why', 'with'
+}
+
+SHINGLE_SIZE = 5  # characters; spans word boundaries, so word order counts
+HASH_PRIME = (1 << 61) - 1  # Mersenne prime for the (a*x + b) mod p hash family
+SLOT_BITS = 24  # up to ~16.7M indexed questions
+SLOT_MASK = (1 << SLOT_BITS) - 1
+BUCKET_MASK = (1 << (64 - SLOT_BITS)) - 1
+# Recently added band keys are kept in dicts and merged into the sorted bands in batches
+MERGE_SIZE = 4096
+
+def normalize_question_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial rewordings compare equal."""
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    return ' '.join(text.split())
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index for spotting reworded duplicates of stored questions.
+    
+    Each question (plus its correct answer) is reduced to its content words,
+    and the character shingles of those words in order are summarized by a
+    MinHash signature. Shingles cross word boundaries, so "Who did Brutus
+    betray? Caesar" and "Who did Caesar betray? Brutus" stay apart. Signatures
+    are split into bands; questions sharing any band bucket are candidates,
+    and a candidate is a duplicate if its estimated Jaccard similarity
+    reaches the threshold.
+    
+    Everything lives in flat arrays rather than per-question objects: each
+    indexed question costs 4 bytes per permutation for its signature, 8 bytes
+    for its id and 8 bytes per band, about 410 bytes with the defaults
+    (~125 MB for 300k questions). Keys added one at a time wait in small
+    per-band dicts until MERGE_SIZE of them are merged into the sorted bands.
+    """
+    
+    def __init__(
+        self,
+        num_bands: int = 20,
+        band_rows: int = 3,
+        threshold: float = 0.4
+    ):
+        self.num_bands = num_bands
+        self.band_rows = band_rows
+        self.num_perm = num_bands * band_rows
+        self.threshold = threshold
+        
+        # One (a*x + b) mod p hash per permutation over 32-bit shingle hashes.
+        # Fixed seed so signatures are reproducible between runs.
+        rng = random.Random(0x7121A)
+        self._hashes = [(rng.randrange(1, HASH_PRIME), rng.randrange(HASH_PRIME)) for _ in range(self.num_perm)]
+        
+        self._signatures = array('I')  # num_perm values per slot, truncated to 32 bits
+        self._question_ids = array('q')  # -1 for questions not stored in the bank
+        self._bands = [array('Q') for _ in range(num_bands)]  # sorted (bucket << SLOT_BITS | slot)
+        self._recent: List[Dict[int, List[int]]] = [{} for _ in range(num_bands)]  # bucket -> slots
+        self._recent_count = 0
+    
+    def __len__(self) -> int:
+        return len(self._question_ids)
+    
+    def signature(self, text: str) -> List[int]:
+        """Compute the MinHash signature of a question document."""
+        shingles = self._shingles(text)
+        return [min([(a * value + b) % HASH_PRIME for value in shingles]) & 0xFFFFFFFF for a, b in self._hashes]
+    
+    def find_duplicate(self, text: str) -> Optional[int]:
+        """
+        Find an indexed near-duplicate of the text.
+        
+        Returns the matching question id (-1 if it was indexed without one),
+        or None if nothing is similar enough.
+        """
+        match = self._find(self.signature(text))
+        return match[0] if match else None
+    
+    def similarity(self, text: str, other: str) -> float:
+        """Estimate the Jaccard similarity of two question documents."""
+        return self._estimate(self.signature(text), self.signature(other))
+    
+    def add(self, text: str, question_id: Optional[int] = None):
+        """Index a question document."""
+        slot = self._append(self.signature(text), question_id)
+        for recent, key in zip(self._recent, self._band_keys(self._signatures, slot)):
+            recent.setdefault(key & ~SLOT_MASK, []).append(slot)
+        
+        self._recent_count += 1
+        if self._recent_count >= MERGE_SIZE:
+            self._merge()
+    
+    def add_many(self, documents: Iterable[Tuple[str, Optional[int]]]):
+        """Index many (text, question_id) documents, sorting the bands once at the end."""
+        for text, question_id in documents:
+            slot = self._append(self.signature(text), question_id)
+            for band, key in zip(self._bands, self._band_keys(self._signatures, slot)):
+                band.append(key)
+        
+        self._merge()
+    
+    def clear(self):
+        """Drop every indexed question."""
+        self._signatures = array('I')
+        self._question_ids = array('q')
+        self._bands = [array('Q') for _ in range(self.num_bands)]
+        self._recent = [{} for _ in range(self.num_bands)]
+        self._recent_count = 0
+    
+    def _merge(self):
+        """Move recently added keys into the sorted bands."""
+        for index, (band, recent) in enumerate(zip(self._bands, self._recent)):
+            keys = (bucket | slot for bucket, slots in recent.items() for slot in slots)
+            self._bands[index] = array('Q', sorted(chain(band, keys)))
+            recent.clear()
+        self._recent_count = 0
+    
+    def _shingles(self, text: str) -> set:
+        """Hash the character shingles of the text's content words, with a crude plural strip."""
+        words = []
+        for word in normalize_question_text(text).split():
+            if word in STOP_WORDS:
+                continue
+            if len(word) > 3 and word.endswith('s'):
+                word = word[:-1]
+            words.append(word)
+        
+        content = ' '.join(words)
+        return {
+            zlib.crc32(content[start:start + SHINGLE_SIZE].encode('utf-8'))
+            for start in range(max(1, len(content) - SHINGLE_SIZE + 1))
+        }
+    
+    def _append(self, signature: List[int], question_id: Optional[int]) -> int:
+        """Store a signature and return its slot number."""
+        slot = len(self._question_ids)
+        if slot > SLOT_MASK:
+            raise OverflowError("Near-duplicate index is full")
+        self._signatures.extend(signature)
+        self._question_ids.append(question_id if question_id is not None else -1)
+        return slot
+    
+    def _band_keys(self, signatures, slot: int = 0) -> List[int]:
+        """Bucket keys for each band of the signature stored at a slot."""
+        offset = slot * self.num_perm
+        rows = self.band_rows
+        return [
+            ((hash((band, *signatures[offset + band * rows:offset + (band + 1) * rows])) & BUCKET_MASK) << SLOT_BITS) | slot
+            for band in range(self.num_bands)
+        ]
+    
+    def _find(self, signature: List[int]) -> Optional[Tuple[int, float]]:
+        """Return (question_id, similarity) of the best indexed match above the threshold."""
+        checked = set()
+        best = None
+        
+        for band, recent, key in zip(self._bands, self._recent, self._band_keys(signature)):
+            bucket = key & ~SLOT_MASK
+            position = bisect_left(band, bucket)
+            end = position
+            while end < len(band) and (band[end] & ~SLOT_MASK) == bucket:
+                end += 1
+            
+            for slot in chain((entry & SLOT_MASK for entry in band[position:end]), recent.get(bucket, ())):
+                if slot in checked:
+                    continue
+                checked.add(slot)
+                
+                offset = slot * self.num_perm
+                score = self._estimate(signature, self._signatures[offset:offset + self.num_perm])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (self._question_ids[slot], score)
+        
+        return best
+    
+    def _estimate(self, signature: List[int], other) -> float:
+        """Fraction of matching signature values, an estimate of Jaccard similarity."""
+        return sum(1 for a, b in zip(signature, other) if a == b) / self.num_perm
@@ -0,0 +1,133 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.settings import settings
+from src.database.database import db_manager
+
+PoolKey = Tuple[str, str, str]  # (category, difficulty, era), as in generator.py
+
+class DemandModel:
+    """
+    Forecasts /trivia requests per key from game_sessions history.
+    
+    Games from the last DEMAND_HISTORY_DAYS are counted per key, weekday
+    and hour of day. A key's forecast for the current hour blends the
+    average for this weekday and hour (Friday nights) with the average
+    for this hour across all days, which has more samples behind it.
+    Pre-generation targets share the fixed total among keys in proportion
+    to the forecast, so popular keys get more questions and unplayed keys
+    keep DEMAND_MIN_TARGET. With no history, every key keeps the base target.
+    """
+    
+    def __init__(self, categories: Dict[str, List[str]]):
+        self.logger = logging.getLogger('TriviaBot.DemandModel')
+        self.enabled = settings.DEMAND_ENABLED
+        self.history_days = settings.DEMAND_HISTORY_DAYS
+        self.refresh_interval = settings.DEMAND_REFRESH_INTERVAL
+        self.min_target = settings.DEMAND_MIN_TARGET
+        
+        # Games saved before requests were recorded store the specific topic; map it back to its category
+        self.categories = {name.lower(): name for name in categories}
+        for name, subcategories in categories.items():
+            for subcategory in subcategories:
+                self.categories.setdefault(subcategory.lower(), name)
+        
+        # key -> {(weekday, hour): games}, weekday 0 = Sunday
+        self.slots: Dict[PoolKey, Dict[Tuple[int, int], int]] = {}
+        self.days_observed = 0.0
+        self.refreshed_at: Optional[float] = None
+        # key -> [served ready, generated or degraded]
+        self.outcomes: Dict[PoolKey, List[int]] = {}
+    
+    async def refresh(self):
+        """Reload the weekday and hour counts from game_sessions."""
+        if not self.enabled:
+            return
+        self.refreshed_at = time.monotonic()
+        
+        now = datetime.utcnow()
+        rows = await db_manager.get_demand_counts(now - timedelta(days=self.history_days))
+        
+        slots: Dict[PoolKey, Dict[Tuple[int, int], int]] = {}
+        oldest = now
+        for category, difficulty, era, weekday, hour, games, first in rows:
+            category = self.categories.get((category or "").lower())
+            if category is None or not difficulty:
+                continue  # custom topics are never pre-generated
+            key = (category, difficulty, era or "any")
+            slot = (int(weekday), int(hour))
+            slots.setdefault(key, {})
+            slots[key][slot] = slots[key].get(slot, 0) + games
+            oldest = min(oldest, first) if first else oldest
+        
+        self.slots = slots
+        # A young bot has less history than the window; averages use what exists
+        self.days_observed = min(self.history_days, max(1.0, (now - oldest).total_seconds() / 86400))
+        self.logger.info(f"Demand model refreshed: {len(slots)} keys over {self.days_observed:.1f} days")
+    
+    async def maybe_refresh(self):
+        """Refresh if the counts are older than DEMAND_REFRESH_INTERVAL."""
+        if self.enabled and (
+            self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_interval
+        ):
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.logger.warning(f"Failed to refresh demand model: {e}")
+    
+    def forecast(self, key: PoolKey, when: Optional[datetime] = None) -> float:
+        """Expected requests per hour for a key at a time (default: now, UTC)."""
+        slots = self.slots.get(key)
+        if not slots:
+            return 0.0
+        
+        when = when or datetime.utcnow()
+        weekday, hour = (when.weekday() + 1) % 7, when.hour
+        weeks = max(1.0, self.days_observed / 7)
+        
+        this_slot = slots.get((weekday, hour), 0) / weeks
+        this_hour = sum(games for (_, h), games in slots.items() if h == hour) / self.days_observed
+        return (this_slot + this_hour) / 2
+    
+    def targets(self, keys: Iterable[PoolKey], base: int, cap: int) -> Dict[PoolKey, int]:
+        """Share base * len(keys) questions among keys by forecast, each between DEMAND_MIN_TARGET and cap."""
+        keys = list(keys)
+        forecasts = {key: self.forecast(key) for key in keys}
+        total = sum(forecasts.values())
+        if not self.enabled or not total:
+            return {key: base for key in keys}
+        
+        budget = base * len(keys)
+        return {
+            key: max(self.min_target, min(cap, math.ceil(budget * forecast / total)))
+            for key, forecast in forecasts.items()
+        }
+    
+    def hottest(self, keys: Iterable[PoolKey]) -> List[PoolKey]:
+        """Keys ordered by forecast, busiest first."""
+        return sorted(keys, key=lambda key: -self.forecast(key))
+    
+    def known_keys(self) -> List[PoolKey]:
+        """Every key with games in the history window."""
+        return list(self.slots)
+    
+    def record(self, key: PoolKey, ready: bool):
+        """Record whether a request was served a question prepared in advance."""
+        outcome = self.outcomes.setdefault(key, [0, 0])
+        outcome[0 if ready else 1] += 1
+    
+    def get_table(self, keys: Iterable[PoolKey]) -> List[Dict]:
+        """Forecast and measured hit rate per key, busiest first."""
+        table = []
+        for key in self.hottest(set(keys) | set(self.outcomes)):
+            hits, misses = self.outcomes.get(key, (0, 0))
+            table.append({
+                "key": key,
+                "forecast": self.forecast(key),
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": (hits / (hits + misses)) * 100 if hits + misses else None
+            })
+        return table
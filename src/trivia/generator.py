@@ -1,11 +1,30 @@
-import openai
+import asyncio
+import hashlib
 import json
 import re
 import logging
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
 from config.settings import settings
 import random
+from src.utils.openai_client import openai_client
+from src.database.database import db_manager
+from src.trivia.dedup import NearDuplicateIndex, normalize_question_text
+from src.trivia.seen import SeenFilter, SeenQuestionTracker
+from src.trivia.streaming import IncrementalJSONParser
+from src.trivia.salvage import salvage_json
+from src.trivia.budget import GenerationBudget, usage_guild
+from src.trivia.demand import DemandModel
+from src.trivia.corpus import FallbackCorpus
+from src.utils.hedging import RequestHedger
+from src.utils.circuit_breaker import CircuitOpenError, openai_breaker
+from src.utils.llm_scheduler import Priority, PriorityHandle, estimate_tokens, llm_priority, llm_scheduler
+from src.utils.model_router import model_router
+from src.utils.token_counter import count_message_tokens
 
 @dataclass
 class TriviaQuestion:
@@ -16,11 +35,471 @@ class TriviaQuestion:
     difficulty: str
     era: Optional[str] = None
     explanation: Optional[str] = None
+    question_id: Optional[int] = None  # question bank id, once stored
+    model: Optional[str] = field(default=None, compare=False)  # model that generated it, if generated here
+    # Set once served; a streamed question can be served before its batch is banked
+    served: bool = field(default=False, repr=False, compare=False)
+    # The normalized (category, difficulty, era) request it was served for
+    request_key: Optional[Tuple[str, str, str]] = field(default=None, repr=False, compare=False)
+    # Resolved once a streamed question's explanation has arrived
+    explanation_ready: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+    
+    async def wait_for_explanation(self, timeout: float):
+        """Give a still-streaming or deferred explanation up to `timeout` seconds to arrive."""
+        if self.explanation_ready is None or self.explanation_ready.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self.explanation_ready), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    def shuffled(self) -> "TriviaQuestion":
+        """A copy with the options in a new order and the correct answer letter remapped."""
+        correct = self.options[ord(self.correct_answer.upper()) - ord('A')]
+        options = list(self.options)
+        while options == list(self.options) and len(set(options)) > 1:
+            random.shuffle(options)
+        return replace(
+            self,
+            options=options,
+            correct_answer=chr(ord('A') + options.index(correct)),
+            explanation_ready=None
+        )
+    
+    @property
+    def text_hash(self) -> str:
+        """Hash of the normalized question text, used to dedupe the question bank."""
+        return hashlib.sha1(normalize_question_text(self.question).encode('utf-8')).hexdigest()
+
+# (category, difficulty, era) after normalization
+PoolKey = Tuple[str, str, str]
+
+# Structured output schemas, used when OPENAI_STRUCTURED_OUTPUT is "json_schema".
+# Property order matches the prompts so streamed questions complete early.
+QUESTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "question": {"type": "string"},
+        "options": {
+            "type": "object",
+            "properties": {letter: {"type": "string"} for letter in "ABCD"},
+            "required": list("ABCD"),
+            "additionalProperties": False
+        },
+        "correct_answer": {"type": "string", "enum": list("ABCD")},
+        "explanation": {"type": "string"}
+    },
+    "required": ["question", "options", "correct_answer", "explanation"],
+    "additionalProperties": False
+}
+
+QUESTION_RESPONSE_FORMAT = {"name": "trivia_question", "strict": True, "schema": QUESTION_SCHEMA}
+
+BATCH_RESPONSE_FORMAT = {
+    "name": "trivia_questions",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {"questions": {"type": "array", "items": QUESTION_SCHEMA}},
+        "required": ["questions"],
+        "additionalProperties": False
+    }
+}
+
+# EXPLANATION_MODE=deferred: the same schemas without the explanation
+SHORT_QUESTION_SCHEMA = dict(
+    QUESTION_SCHEMA,
+    properties={name: schema for name, schema in QUESTION_SCHEMA["properties"].items() if name != "explanation"},
+    required=["question", "options", "correct_answer"]
+)
+
+SHORT_QUESTION_RESPONSE_FORMAT = dict(QUESTION_RESPONSE_FORMAT, schema=SHORT_QUESTION_SCHEMA)
+
+SHORT_BATCH_RESPONSE_FORMAT = dict(
+    BATCH_RESPONSE_FORMAT,
+    schema=dict(
+        BATCH_RESPONSE_FORMAT["schema"],
+        properties={"questions": {"type": "array", "items": SHORT_QUESTION_SCHEMA}}
+    )
+)
+
+SYSTEM_PROMPT = "You are a trivia question generator. Always respond with valid JSON in the exact format requested."
+
+# PROMPT_VARIANT=compact: every static instruction lives in this system message,
+# shared by single, retry and batch requests, so the provider can cache it as
+# a prefix. The user message only carries the topic, difficulty and count.
+COMPACT_SYSTEM_PROMPT = """You are a trivia question generator. Respond with valid JSON only: no prose, no code fences.
+
+Each question is an object:
+{"question": "Your question?", "options": {"A": "...", "B": "...", "C": "...", "D": "..."}, "correct_answer": "A", "explanation": "Brief reason it is correct"}
+
+Rules:
+- Exactly 4 options and one correct answer; vary which letter is correct
+- Clear and unambiguous; no extremely specific dates or obscure facts
+- Never use words of the correct answer in the question, or describe the process that names it
+- Wrong options are plausible, from the same topic, and about as long as the correct one
+- Test knowledge, not reading comprehension
+- When asked for several questions, each covers a different fact
+
+Bad: "Which sculpture depicts David?" (David). Good: "Which Renaissance artist painted the Sistine Chapel ceiling?" (Michelangelo)
+
+Difficulty:
+- easy: well-known facts, suitable for beginners
+- medium: moderately challenging, requires some knowledge
+- hard: requires specialized or detailed knowledge"""
+
+COMPACT_SHORT_SYSTEM_PROMPT = COMPACT_SYSTEM_PROMPT.replace(', "explanation": "Brief reason it is correct"', "")
+
+EXPLANATION_SYSTEM_PROMPT = "You explain trivia answers. Reply with one or two plain sentences, no preamble."
+
+class QuestionPool:
+    """
+    In-memory pool of pre-generated questions, refilled by a background task.
+    
+    Only keys with demand are pooled: those the demand model has seen
+    played recently, and those requested since startup. A fresh bot with no
+    game history spends nothing until someone plays. Each key's watermarks
+    scale with the demand model's forecast for the current hour; the busiest
+    keys are refilled first.
+    """
+    
+    def __init__(self, generator: "TriviaGenerator"):
+        self.logger = logging.getLogger('TriviaBot.QuestionPool')
+        self.generator = generator
+        # Generation workers fill the bank instead when they're enabled
+        self.enabled = settings.QUESTION_POOL_ENABLED and not settings.GENERATION_WORKERS_ENABLED
+        self.max_size = settings.QUESTION_POOL_MAX_SIZE
+        self.high_watermark = min(settings.QUESTION_POOL_HIGH_WATERMARK, self.max_size)
+        self.low_watermark = min(settings.QUESTION_POOL_LOW_WATERMARK, self.high_watermark)
+        self.refill_interval = settings.QUESTION_POOL_REFILL_INTERVAL
+        
+        self.queues: Dict[PoolKey, Deque[TriviaQuestion]] = {}
+        # Per-key high watermarks from the demand model, recomputed every pass
+        self.targets: Dict[PoolKey, int] = {}
+        self.hits = 0
+        self.misses = 0
+        
+        self._refill_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    def is_poolable(self, key: PoolKey) -> bool:
+        """Only built-in categories are pre-generated."""
+        return self.enabled and key[0] in self.generator.categories
+    
+    def take(
+        self,
+        category: str,
+        difficulty: str,
+        era: str,
+        seen: Optional[SeenFilter] = None
+    ) -> Optional[TriviaQuestion]:
+        """Pop a ready question the user hasn't seen, or None on a miss."""
+        key = self.generator._normalize_request(category, difficulty, era)
+        if not self.is_poolable(key):
+            return None
+        
+        queue = self._track(key)
+        question = None
+        for _ in range(len(queue)):
+            candidate = queue.popleft()
+            if seen is None or candidate.text_hash not in seen:
+                question = candidate
+                break
+            # Seen by this user; leave it for someone else
+            queue.append(candidate)
+        
+        if question:
+            self.hits += 1
+        else:
+            self.misses += 1
+        
+        # Wake the refill task early instead of waiting for the next interval
+        if len(queue) < self._watermarks(key)[0] and self._wakeup:
+            self._wakeup.set()
+        
+        return question
+    
+    def put(self, key: PoolKey, question: TriviaQuestion) -> bool:
+        """Add a question to the pool. Returns False if the key is full."""
+        queue = self._track(key)
+        if len(queue) >= self.max_size:
+            return False
+        queue.append(question)
+        return True
+    
+    def start(self):
+        """Start the background refill task. Must be called from a running event loop."""
+        if not self.enabled or (self._refill_task and not self._refill_task.done()):
+            return
+        
+        # Keys are tracked by the refill loop from the demand model's history,
+        # and by take() as users ask for them
+        self._wakeup = asyncio.Event()
+        self._refill_task = asyncio.create_task(self._refill_loop())
+        self.logger.info("Question pool started")
+    
+    async def stop(self):
+        """Cancel the background refill task."""
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and current pool size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) * 100 if lookups else 0.0,
+            "keys": len(self.queues),
+            "size": sum(len(queue) for queue in self.queues.values())
+        }
+    
+    def _watermarks(self, key: PoolKey) -> Tuple[int, int]:
+        """(low, high) watermarks for a key, keeping the configured ratio between them."""
+        high = self.targets.get(key, self.high_watermark)
+        if not self.high_watermark:
+            return 0, high
+        return math.ceil(high * self.low_watermark / self.high_watermark), high
+    
+    def _track(self, key: PoolKey) -> Deque[TriviaQuestion]:
+        """Get the queue for a key, registering it for refills."""
+        if key not in self.queues:
+            self.queues[key] = deque(maxlen=self.max_size)
+        return self.queues[key]
+    
+    async def _refill_loop(self):
+        """Top up every key that has dropped below the low watermark."""
+        llm_priority.set(Priority.BACKGROUND)
+        while True:
+            self._wakeup.clear()
+            
+            demand = self.generator.demand
+            await demand.maybe_refresh()
+            for key in demand.known_keys():
+                if self.is_poolable(key):
+                    self._track(key)
+            self.targets = demand.targets(self.queues, self.high_watermark, self.max_size)
+            
+            for key in demand.hottest(self.queues):
+                # Don't spend the half-open probe on background refills
+                if openai_breaker.state != openai_breaker.CLOSED:
+                    break
+                if len(self.queues[key]) < self._watermarks(key)[0]:
+                    await self._refill(key)
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _refill(self, key: PoolKey):
+        """Generate questions for a key until it reaches the high watermark."""
+        queue = self.queues[key]
+        high_watermark = self._watermarks(key)[1]
+        while len(queue) < high_watermark:
+            count = min(high_watermark - len(queue), self.generator.batch_size)
+            try:
+                questions = await self.generator.generate_questions(*key, count)
+            except Exception as e:
+                # Leave the key short and retry on the next pass
+                self.logger.warning(f"Pool refill failed for {key}: {e}")
+                return
+            
+            if not questions:
+                return
+            for question in questions:
+                self.put(key, question)
+
+class QuestionPrefetcher:
+    """
+    Speculatively prepares each user's next question as soon as they resolve one.
+    
+    Most players run /trivia again with the same parameters right after
+    answering or skipping, so their next question is fetched in the background
+    and handed over instantly on a matching request. Unclaimed questions expire
+    after a TTL and go back to the shared pool.
+    """
+    
+    def __init__(self, generator: "TriviaGenerator"):
+        self.logger = logging.getLogger('TriviaBot.QuestionPrefetcher')
+        self.generator = generator
+        self.enabled = settings.PREFETCH_ENABLED
+        self.ttl = settings.PREFETCH_TTL
+        
+        self.last_requests: Dict[int, PoolKey] = {}
+        self.prefetched: Dict[int, Tuple[PoolKey, TriviaQuestion, str, asyncio.TimerHandle]] = {}
+        self.pending: Dict[int, Tuple[PoolKey, asyncio.Task, PriorityHandle]] = {}
+        self.stats = {"issued": 0, "hits": 0, "misses": 0, "expired": 0}
+    
+    def record_request(self, user_id: int, key: PoolKey):
+        """Remember the parameters of a user's latest /trivia request."""
+        self.last_requests[user_id] = key
+    
+    def schedule(self, user_id: int):
+        """Start prefetching the user's next question with their last request parameters."""
+        if not self.enabled or user_id not in self.last_requests:
+            return
+        if user_id in self.pending or user_id in self.prefetched:
+            return
+        
+        key = self.last_requests[user_id]
+        priority = PriorityHandle(Priority.BACKGROUND)
+        self.pending[user_id] = (key, asyncio.create_task(self._prefetch(user_id, key, priority)), priority)
+        self.stats["issued"] += 1
+    
+    async def claim(self, user_id: int, key: PoolKey) -> Optional[TriviaQuestion]:
+        """Hand over the user's prefetched question if it matches the request."""
+        pending = self.pending.get(user_id)
+        if pending and pending[0] == key:
+            # Almost ready; waiting beats starting from scratch, as long as it
+            # stops queueing behind background work. Shielded so a cancelled
+            # request doesn't take the prefetch down with it.
+            _, task, priority = pending
+            llm_scheduler.promote(priority)
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise  # this request was cancelled, not the prefetch
+            except Exception:
+                pass  # a failed prefetch simply leaves nothing to claim
+        
+        entry = self.prefetched.pop(user_id, None)
+        if entry is None:
+            return None
+        
+        prefetched_key, question, source, expiry = entry
+        expiry.cancel()
+        
+        if prefetched_key != key:
+            self.stats["misses"] += 1
+            self._release(prefetched_key, question, source)
+            return None
+        
+        self.stats["hits"] += 1
+        if source == "live":
+            # Generated speculatively for free; it counts once the user gets it
+            self.generator.budget.charge(user_id)
+        return question
+    
+    def clear(self):
+        """Cancel in-flight prefetches and release every unclaimed question."""
+        for _, task, _ in self.pending.values():
+            task.cancel()
+        self.pending.clear()
+        
+        for user_id in list(self.prefetched):
+            key, question, source, expiry = self.prefetched.pop(user_id)
+            expiry.cancel()
+            self._release(key, question, source)
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Get prefetch counters and hit rate."""
+        stats = dict(self.stats)
+        stats["hit_rate"] = (stats["hits"] / stats["issued"]) * 100 if stats["issued"] else 0.0
+        return stats
+    
+    async def _prefetch(self, user_id: int, key: PoolKey, priority: PriorityHandle):
+        """
+        Reserve or generate the next question for a user.
+        
+        Budgets are only checked here; the user is charged if they claim a
+        generated question, and its tokens are recorded as background usage.
+        """
+        llm_priority.set(priority)
+        guild_id = usage_guild.get()
+        usage_guild.set(None)
+        try:
+            seen = await self.generator.seen_questions.get(user_id)
+            question, source = await self.generator._find_question(
+                seen, *key, user_id=user_id, guild_id=guild_id, speculative=True
+            )
+        except Exception as e:
+            self.logger.warning(f"Prefetch failed for user {user_id}: {e}")
+            return
+        finally:
+            self.pending.pop(user_id, None)
+        
+        if source in ("degraded", "budget"):
+            # Bank stand-ins aren't worth holding; the request will find one itself
+            return
+        
+        expiry = asyncio.get_running_loop().call_later(self.ttl, self._expire, user_id)
+        self.prefetched[user_id] = (key, question, source, expiry)
+    
+    def _expire(self, user_id: int):
+        """Release a prefetched question that wasn't claimed in time."""
+        entry = self.prefetched.pop(user_id, None)
+        if entry:
+            key, question, source, _ = entry
+            self.stats["expired"] += 1
+            self._release(key, question, source)
+    
+    def _release(self, key: PoolKey, question: TriviaQuestion, source: str):
+        """
+        Return an unused question to the shared pool.
+        
+        Only pooled and freshly generated questions go back, and only under
+        the key they were made for. Bank and reused questions simply stay in
+        the bank; degraded picks may come from any category or difficulty.
+        """
+        if source not in ("pool", "live") or not self.generator._matches_key(question, key):
+            return
+        if self.generator.question_pool.is_poolable(key):
+            self.generator.question_pool.put(key, question)
+
+class GenerationFlight:
+    """
+    One in-flight batch generation shared by every concurrent request for the same key.
+    
+    Questions are published as soon as they are usable, which with streaming
+    is before the rest of the batch (or even their own explanation) arrives.
+    """
+    
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.questions: List[TriviaQuestion] = []
+        self.waiters = 0
+        self.claimed = 0
+        self._published = asyncio.get_running_loop().create_future()
+    
+    def publish(self, question: TriviaQuestion):
+        """Make a question claimable and wake everyone waiting for one."""
+        self.questions.append(question)
+        self._published.set_result(None)
+        self._published = asyncio.get_running_loop().create_future()
+    
+    async def next_question(self) -> Optional[TriviaQuestion]:
+        """Claim the next question once it's published, or None if the batch runs out."""
+        while self.claimed >= len(self.questions):
+            if self.task.done():
+                return None
+            await asyncio.wait({self.task, self._published}, return_when=asyncio.FIRST_COMPLETED)
+        
+        self.claimed += 1
+        return self.questions[self.claimed - 1]
+    
+    def failed(self) -> bool:
+        return self.task.done() and (self.task.cancelled() or self.task.exception() is not None)
 
 class TriviaGenerator:
     def __init__(self):
         self.logger = logging.getLogger('TriviaBot.TriviaGenerator')
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = openai_client
+        # Picks the model per request from live latency and validation profiles
+        self.router = model_router
+        self.parse_stats: Dict[str, Dict[str, int]] = {}
+        self.prompt_variant = settings.PROMPT_VARIANT
+        # Leave explanations out of generation and fetch them once a question is served
+        self.defer_explanations = settings.EXPLANATION_MODE == "deferred"
+        # Prompt tokens sent per prompt variant, counted locally
+        self.prompt_stats: Dict[str, Dict[str, int]] = {}
+        self.candidate_stats: Dict[str, Dict[str, int]] = {}
         
         # Predefined categories and their subcategories
         self.categories = {
@@ -37,9 +516,270 @@ class TriviaGenerator:
         }
         
         self.difficulties = ["easy", "medium", "hard"]
+        # Forecasts requests per key from game history to size pre-generation
+        self.demand = DemandModel(self.categories)
+        # Mapped on the first fallback question, so it costs nothing until OpenAI and the bank both fail
+        self.fallback_corpus = FallbackCorpus(settings.FALLBACK_CORPUS_PATH)
         self.eras = ["ancient", "medieval", "renaissance", "modern", "contemporary", "any"]
+        
+        self.batch_size = settings.QUESTION_BATCH_SIZE
+        # Questions come from `python -m src.trivia.worker` processes through the bank
+        self.external_workers = settings.GENERATION_WORKERS_ENABLED
+        
+        # Where /trivia questions were served from
+        self.serve_stats = {"prefetch": 0, "bank": 0, "pool": 0, "live": 0, "degraded": 0, "budget": 0, "reuse": 0}
+        # Generation requests sent to OpenAI, to relate questions served to LLM calls
+        self.generation_calls = 0
+        # Re-serve aged bank questions with shuffled options before generating
+        self.reuse_enabled = settings.REUSE_ENABLED
+        
+        # Per-user and per-guild limits on fresh generations, plus token usage accounting
+        self.budget = GenerationBudget()
+        
+        # Batch generation metrics
+        self.batch_stats = {"batches": 0, "requested": 0, "accepted": 0, "tokens": 0, "coalesced": 0}
+        
+        # Duplicates slow OpenAI calls once they pass the model's tail latency
+        self.hedger = RequestHedger()
+        
+        # Live generations in progress, shared by identical concurrent requests
+        self._flights: Dict[PoolKey, GenerationFlight] = {}
+        
+        # Near-duplicate detection over every accepted question
+        self.near_duplicates = NearDuplicateIndex(threshold=settings.NEAR_DUPLICATE_THRESHOLD)
+        self._index_pending: Optional[List[Tuple[str, Optional[int]]]] = None
+        
+        self.seen_questions = SeenQuestionTracker()
+        self.question_pool = QuestionPool(self)
+        self.prefetcher = QuestionPrefetcher(self)
+        self._background_tasks = set()
     
-    def generate_question(
+    async def get_question(
+        self,
+        category: str = "random",
+        difficulty: str = "medium",
+        era: str = "any",
+        user_id: Optional[int] = None,
+        guild_id: Optional[int] = None
+    ) -> TriviaQuestion:
+        """
+        Get a question for a /trivia request without calling OpenAI when possible.
+        
+        Tries, in order: the user's prefetched question, a pooled question
+        they haven't seen, a banked question they haven't seen, an aged banked
+        question with reshuffled options, and finally live generation if the
+        user's and guild's budgets allow it, or a degraded bank question if
+        they don't or OpenAI is failing. The served question is recorded in
+        the user's seen filter.
+        
+        Args:
+            user_id: Database id of the requesting user, used to skip questions they've seen
+            guild_id: Discord guild the request came from, None in DMs
+        """
+        key = self._normalize_request(category, difficulty, era)
+        question = None
+        
+        if user_id is not None:
+            self.prefetcher.record_request(user_id, key)
+            question = await self.prefetcher.claim(user_id, key)
+            source = "prefetch"
+        
+        if question is None:
+            seen = await self.seen_questions.get(user_id) if user_id is not None else None
+            question, source = await self._find_question(seen, *key, user_id=user_id, guild_id=guild_id)
+        
+        self.serve_stats[source] += 1
+        self.demand.record(key, source in ("prefetch", "bank", "pool", "reuse"))
+        self.request_explanation(question)
+        
+        if user_id is not None:
+            await self.seen_questions.mark_seen(user_id, question.text_hash)
+        question.served = True
+        question.request_key = key
+        if question.question_id is not None:
+            self._spawn(db_manager.record_question_served(question.question_id))
+        
+        return question
+    
+    def request_explanation(self, question: TriviaQuestion):
+        """In deferred mode, start fetching a served question's explanation unless one is already there or coming."""
+        if not self.defer_explanations or question.explanation or (question.explanation_ready and not question.explanation_ready.done()):
+            return
+        question.explanation_ready = asyncio.get_running_loop().create_future()
+        self._spawn(self._fetch_explanation(question))
+    
+    async def _fetch_explanation(self, question: TriviaQuestion):
+        """Ask for a short explanation of the correct answer; on failure the question goes without."""
+        options = " ".join(f"{letter}) {option}" for letter, option in zip("ABCD", question.options))
+        letter = question.correct_answer.upper()
+        correct = question.options[ord(letter) - ord('A')]
+        messages = [
+            {"role": "system", "content": EXPLANATION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Question: {question.question}\nOptions: {options}\n"
+                                        f"Correct answer: {letter}) {correct}\n"
+                                        f"Explain briefly why this answer is correct."}
+        ]
+        model = self.router.choose("persona")
+        
+        try:
+            response = await llm_scheduler.run(
+                lambda: openai_breaker.call(lambda: self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=100,
+                    temperature=0.3
+                )),
+                estimated_tokens=estimate_tokens(messages, 100),
+                priority=Priority.PERSONALITY
+            )
+            question.explanation = response.choices[0].message.content.strip()
+        except Exception as e:
+            self.logger.warning(f"Failed to fetch explanation: {e}")
+            question.explanation = ""
+        finally:
+            question.explanation_ready.set_result(None)
+        
+        if question.explanation and question.question_id is not None:
+            await db_manager.save_question_explanation(question.question_id, question.explanation)
+    
+    async def _find_question(
+        self,
+        seen: Optional[SeenFilter],
+        category: str,
+        difficulty: str,
+        era: str,
+        user_id: Optional[int] = None,
+        guild_id: Optional[int] = None,
+        speculative: bool = False
+    ) -> Tuple[TriviaQuestion, str]:
+        """
+        Find a question from the pool, the bank, bank reuse, then OpenAI. Returns (question, source).
+        
+        The in-memory pool goes first: pooled questions are banked too, and a
+        pool hit saves the database round trip on every request.
+        
+        Args:
+            speculative: Check the budgets without spending; the caller charges if the question is served
+        """
+        question = self.question_pool.take(category, difficulty, era, seen)
+        if question:
+            return question, "pool"
+        
+        question = await self._get_bank_question(seen, category, difficulty, era)
+        if question:
+            return question, "bank"
+        
+        question = await self._get_reused_question(user_id, category, difficulty, era)
+        if question:
+            return question, "reuse"
+        
+        if self.external_workers:
+            # Generation happens out of process; never block a user on OpenAI
+            return await self._get_degraded_question(seen, category, difficulty, era), "degraded"
+        
+        if openai_breaker.available():
+            allowed = self.budget.allows(user_id, guild_id) if speculative else self.budget.try_spend(user_id, guild_id)
+            if not allowed:
+                return await self._get_degraded_question(seen, category, difficulty, era), "budget"
+            try:
+                return await self._generate_shared(category, difficulty, era), "live"
+            except CircuitOpenError:
+                pass
+            except Exception as e:
+                self.logger.warning(f"Live generation failed, serving from the bank: {e}")
+            if not speculative:
+                # Nothing was generated, so the user keeps their generation
+                self.budget.refund(user_id)
+        return await self._get_degraded_question(seen, category, difficulty, era), "degraded"
+    
+    async def _get_degraded_question(
+        self,
+        seen: Optional[SeenFilter],
+        category: str,
+        difficulty: str,
+        era: str
+    ) -> TriviaQuestion:
+        """
+        Serve a question without calling OpenAI, when its circuit is open or a budget is spent.
+        
+        Widens the bank search step by step: any era, then any category, then
+        any difficulty, then questions the user has already seen. The hardcoded
+        fallback questions are only used when the bank is empty.
+        """
+        for request in ((category, difficulty, "any"), ("random", difficulty, "any"), ("random", "any", "any")):
+            question = await self._get_bank_question(seen, *request)
+            if question:
+                return question
+        
+        question = await self._get_bank_question(None, "random", "any", "any")
+        return question or self._get_fallback_question(category, difficulty)
+    
+    async def _generate_shared(self, category: str, difficulty: str, era: str) -> TriviaQuestion:
+        """
+        Generate a question live, coalescing identical concurrent requests.
+        
+        The first request for a key starts a batch generation; everyone asking
+        for the same key while it runs waits on that batch and takes a distinct
+        question from it. Waiters left over when a batch runs out start the next
+        one, so OpenAI concurrency is bounded by the number of distinct keys.
+        Raises if generation failed, so the caller can degrade.
+        """
+        key = (category, difficulty, era)
+        coalesced = False
+        
+        for _ in range(2):
+            flight = self._flights.get(key)
+            # A finished flight may not have landed yet; skip it once it's used up
+            if flight is None or (flight.task.done() and flight.claimed >= len(flight.questions)):
+                flight = GenerationFlight()
+                flight.task = asyncio.create_task(
+                    self.generate_questions(*key, self.batch_size, on_question=flight.publish)
+                )
+                flight.task.add_done_callback(lambda _, key=key, flight=flight: self._land_flight(key, flight))
+                self._flights[key] = flight
+            elif not coalesced:
+                # Counted once per request, however many flights it waits on
+                coalesced = True
+                self.batch_stats["coalesced"] += 1
+            
+            flight.waiters += 1
+            try:
+                question = await flight.next_question()
+            finally:
+                flight.waiters -= 1
+                if flight.waiters == 0 and flight.task.done():
+                    self._pool_leftovers(key, flight)
+            
+            if question:
+                return question
+            if flight.failed():
+                # Retrying one question at a time would just fail again
+                if flight.task.cancelled():
+                    raise RuntimeError(f"Shared generation for {key} was cancelled")
+                raise flight.task.exception()
+        
+        # Batches came back empty; fall back to the single-question path
+        if not openai_breaker.available():
+            raise CircuitOpenError("openai circuit is open")
+        return await self._generate_single(category, difficulty, era)
+    
+    def _land_flight(self, key: PoolKey, flight: GenerationFlight):
+        """Stop routing requests to a finished flight; pool its leftovers if nobody is waiting."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.waiters == 0:
+            self._pool_leftovers(key, flight)
+    
+    def _pool_leftovers(self, key: PoolKey, flight: GenerationFlight):
+        """Put questions nobody claimed into the pool; they're already in the bank."""
+        leftovers = flight.questions[flight.claimed:]
+        flight.claimed = len(flight.questions)
+        if not self.question_pool.is_poolable(key):
+            return
+        for question in leftovers:
+            self.question_pool.put(key, question)
+    
+    async def generate_question(
         self, 
         category: str = "random", 
         difficulty: str = "medium", 
@@ -47,61 +787,651 @@ class TriviaGenerator:
     ) -> TriviaQuestion:
         """Generate a trivia question using OpenAI."""
         try:
-            # Normalize inputs
-            category = category.lower()
-            difficulty = difficulty.lower()
-            era = era.lower()
-            
-            # Validate inputs - allow custom categories
-            if difficulty not in self.difficulties:
-                difficulty = "medium"
-            if era not in self.eras:
-                era = "any"
-            
-            # Get specific subcategory if applicable
-            specific_category = self._get_specific_category(category)
-            
-            # Create the prompt
-            prompt = self._create_trivia_prompt(specific_category, difficulty, era)
-            
-            # Generate question using OpenAI
-            response = self._call_openai(prompt)
-            
-            # Parse the response
-            question = self._parse_response(response, specific_category, difficulty, era)
-            
-            # Quality control validation
-            if not self._validate_question_quality(question):
-                self.logger.warning("Question failed quality check, regenerating...")
-                # Try once more with stricter prompt
-                stricter_prompt = self._create_stricter_prompt(specific_category, difficulty, era)
-                response = self._call_openai(stricter_prompt)
-                question = self._parse_response(response, specific_category, difficulty, era)
-            
-            self.logger.info(f"Generated question: {category}/{difficulty}/{era}")
-            return question
-            
+            return await self._generate_single(category, difficulty, era)
         except Exception as e:
             self.logger.error(f"Failed to generate question: {e}")
             # Return a fallback question
             return self._get_fallback_question(category, difficulty)
     
-    def _get_specific_category(self, category: str) -> str:
-        """Get a specific subcategory or return the category itself."""
+    async def _generate_single(self, category: str, difficulty: str, era: str) -> TriviaQuestion:
+        """Generate one question, banking it if it passed validation. Raises on failure."""
+        category, difficulty, era = self._normalize_request(category, difficulty, era)
+        
+        # Each path banks what it accepts itself; a batch is banked as a whole
+        if settings.PARALLEL_CANDIDATES > 1:
+            question = await self._generate_candidates(category, difficulty, era, settings.PARALLEL_CANDIDATES)
+        else:
+            question = await self._generate_fresh(category, difficulty, era)
+        
+        self.logger.info(f"Generated question: {category}/{difficulty}/{era}")
+        return question
+    
+    async def generate_questions(
+        self,
+        category: str = "random",
+        difficulty: str = "medium",
+        era: str = "any",
+        n: int = 5,
+        on_question: Optional[Callable[[TriviaQuestion], None]] = None
+    ) -> List[TriviaQuestion]:
+        """
+        Generate up to n questions with a single OpenAI call.
+        
+        Each question in the batch is parsed and validated on its own, so one
+        bad item doesn't discard the rest. Raises if the call itself fails.
+        
+        Args:
+            on_question: Called with each accepted question as soon as it is usable.
+                When streaming, that is before its explanation has arrived.
+        """
+        category, difficulty, era = self._normalize_request(category, difficulty, era)
+        n = max(1, min(n, settings.QUESTION_BATCH_MAX_SIZE))
+        
+        specific_category = self._get_specific_category(category)
+        prompt = self._create_batch_prompt(specific_category, difficulty, era, n)
+        model = self.router.choose(difficulty)
+        
+        if settings.STREAMING_ENABLED:
+            questions, tokens = await self._stream_batch(prompt, n, specific_category, difficulty, era, on_question, model)
+        else:
+            response = await self._create_completion(prompt, model, difficulty, max_tokens=150 * n + 100, batch=True)
+            content = response.choices[0].message.content.strip()
+            
+            questions = []
+            for question in self._parse_batch_response(content, specific_category, difficulty, era, model):
+                if len(questions) >= n:
+                    break
+                if not self._validate_question_quality(question) or self._is_near_duplicate(question, questions):
+                    continue
+                questions.append(question)
+                if on_question:
+                    on_question(question)
+            
+            usage = getattr(response, "usage", None)
+            tokens = usage.total_tokens if usage else 0
+        
+        await self._accept_questions(questions, category, difficulty, era)
+        
+        self.batch_stats["batches"] += 1
+        self.batch_stats["requested"] += n
+        self.batch_stats["accepted"] += len(questions)
+        self.batch_stats["tokens"] += tokens
+        
+        self.logger.info(f"Generated batch: {category}/{difficulty}/{era} ({len(questions)}/{n} accepted)")
+        return questions
+    
+    async def _stream_batch(
+        self,
+        prompt: str,
+        n: int,
+        category: str,
+        difficulty: str,
+        era: str,
+        on_question: Optional[Callable[[TriviaQuestion], None]],
+        model: str
+    ) -> Tuple[List[TriviaQuestion], int]:
+        """
+        Stream a batch completion, parsing the JSON array as it arrives.
+        
+        A question is validated and handed to `on_question` as soon as its text,
+        options and answer are complete; its explanation is filled in when the
+        rest of its object arrives. Returns (accepted questions, total tokens).
+        """
+        parser = IncrementalJSONParser()
+        questions = []
+        awaiting_explanation: List[Tuple[TriviaQuestion, Dict]] = []
+        examined = 0
+        tokens = 0
+        text = []
+        malformed = False
+        parsed = 0  # items that had every field we need, accepted or not
+        
+        try:
+            async for chunk in self._stream_completion(prompt, model, difficulty, max_tokens=150 * n + 100, batch=True):
+                usage = getattr(chunk, "usage", None)
+                if usage:
+                    tokens = usage.total_tokens
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                
+                text.append(chunk.choices[0].delta.content)
+                if malformed:
+                    continue
+                try:
+                    parser.feed(text[-1])
+                except ValueError as e:
+                    # Read the rest and salvage it once the stream ends
+                    self.logger.warning(f"Malformed streamed batch response: {e}")
+                    malformed = True
+                    continue
+                
+                # Some completions wrap the array in an object
+                items = parser.root
+                if isinstance(items, dict):
+                    items = items.get("questions", [])
+                if not isinstance(items, list):
+                    continue
+                
+                while examined < len(items):
+                    item = items[examined]
+                    if not isinstance(item, dict):
+                        examined += 1
+                        continue
+                    
+                    ready = "question" in item and "correct_answer" in item and parser.is_complete(item.get("options"))
+                    if not ready:
+                        if parser.is_complete(item):
+                            examined += 1  # closed without the fields we need
+                            continue
+                        break
+                    
+                    examined += 1
+                    parsed += 1
+                    question = self._stream_question(item, questions, n, category, difficulty, era, model)
+                    if question:
+                        questions.append(question)
+                        if question.explanation_ready:
+                            awaiting_explanation.append((question, item))
+                        if on_question:
+                            on_question(question)
+                
+                for question, item in list(awaiting_explanation):
+                    if parser.is_complete(item):
+                        question.explanation = item.get("explanation", "")
+                        question.explanation_ready.set_result(None)
+                        awaiting_explanation.remove((question, item))
+            
+            if malformed:
+                parsed += self._salvage_stream(
+                    "".join(text), examined, questions, n, category, difficulty, era, on_question, model
+                )
+            self._record_parse(
+                "failed" if not parsed else "strict" if parser.done and not malformed else "salvaged", model, difficulty
+            )
+        except Exception as e:
+            # Keep the questions that made it; some may already be on screen
+            if not questions:
+                raise
+            self.logger.error(f"Streamed batch cut short after {len(questions)} questions: {e}")
+        finally:
+            # Whatever didn't arrive isn't coming; don't leave anyone waiting on it
+            for question, item in awaiting_explanation:
+                question.explanation = item.get("explanation", "")
+                question.explanation_ready.set_result(None)
+        
+        return questions, tokens
+    
+    def _salvage_stream(
+        self,
+        text: str,
+        examined: int,
+        questions: List[TriviaQuestion],
+        n: int,
+        category: str,
+        difficulty: str,
+        era: str,
+        on_question: Optional[Callable[[TriviaQuestion], None]],
+        model: str
+    ) -> int:
+        """
+        Recover questions from a streamed batch the incremental parser gave up on.
+        
+        Returns how many items were recovered, whether or not they were accepted.
+        """
+        data = salvage_json(text)
+        if isinstance(data, dict):
+            data = data.get("questions", [data])
+        if not isinstance(data, list):
+            return 0
+        
+        recovered = 0
+        # Items before `examined` were already handled while streaming
+        for item in data[examined:]:
+            if not isinstance(item, dict) or not {"question", "options", "correct_answer"} <= item.keys():
+                continue
+            recovered += 1
+            question = self._stream_question(item, questions, n, category, difficulty, era, model)
+            if question:
+                if question.explanation_ready:
+                    question.explanation_ready.set_result(None)
+                questions.append(question)
+                if on_question:
+                    on_question(question)
+        return recovered
+    
+    def _stream_question(
+        self,
+        item: Dict,
+        accepted: List[TriviaQuestion],
+        n: int,
+        category: str,
+        difficulty: str,
+        era: str,
+        model: str
+    ) -> Optional[TriviaQuestion]:
+        """Build and validate a question from a partially streamed batch item."""
+        if len(accepted) >= n:
+            return None
+        try:
+            question = self._question_from_data(item, category, difficulty, era, model)
+        except (KeyError, TypeError) as e:
+            self.logger.warning(f"Skipping malformed batch item: {e}")
+            return None
+        
+        if not self._validate_question_quality(question) or self._is_near_duplicate(question, accepted):
+            return None
+        if not self.defer_explanations:
+            question.explanation_ready = asyncio.get_running_loop().create_future()
+        return question
+    
+    def get_batch_stats(self) -> Dict[str, float]:
+        """Get batch generation counters, including tokens spent per accepted question."""
+        stats = dict(self.batch_stats)
+        stats["tokens_per_question"] = stats["tokens"] / stats["accepted"] if stats["accepted"] else 0.0
+        stats["acceptance_rate"] = (stats["accepted"] / stats["requested"]) * 100 if stats["requested"] else 0.0
+        return stats
+    
+    def get_serve_stats(self) -> Dict[str, float]:
+        """Get counts of where questions were served from."""
+        stats = dict(self.serve_stats)
+        total = sum(stats.values())
+        stats["bank_rate"] = (stats["bank"] / total) * 100 if total else 0.0
+        stats["reuse_rate"] = (stats["reuse"] / total) * 100 if total else 0.0
+        stats["llm_calls"] = self.generation_calls
+        stats["questions_per_call"] = total / self.generation_calls if self.generation_calls else float(total)
+        return stats
+    
+    async def _get_bank_question(
+        self,
+        seen: Optional[SeenFilter],
+        category: str,
+        difficulty: str,
+        era: str
+    ) -> Optional[TriviaQuestion]:
+        """Fetch a question the user hasn't seen from the question bank, if any, preferring unserved ones."""
+        if not settings.QUESTION_BANK_ENABLED:
+            return None
+        
+        try:
+            candidates = await db_manager.get_bank_candidates(
+                category, difficulty, era, limit=settings.QUESTION_BANK_CANDIDATES, unserved_first=True
+            )
+        except Exception as e:
+            self.logger.warning(f"Question bank lookup failed: {e}")
+            return None
+        
+        data = next((row for row in candidates if seen is None or row['text_hash'] not in seen), None)
+        return self._question_from_bank_row(data) if data else None
+    
+    async def _get_reused_question(
+        self,
+        user_id: Optional[int],
+        category: str,
+        difficulty: str,
+        era: str
+    ) -> Optional[TriviaQuestion]:
+        """
+        Re-serve an aged bank question with its options shuffled.
+        
+        Only questions banked at least REUSE_MIN_AGE_DAYS ago qualify, and
+        never one the user played in the last REUSE_USER_COOLDOWN_DAYS. The
+        seen filter is deliberately ignored: players who saw a question weeks
+        ago rarely remember which letter was right.
+        """
+        if not self.reuse_enabled or not settings.QUESTION_BANK_ENABLED:
+            return None
+        
+        now = datetime.utcnow()
+        cooldown = (user_id, now - timedelta(days=settings.REUSE_USER_COOLDOWN_DAYS)) if user_id is not None else None
+        try:
+            candidates = await db_manager.get_bank_candidates(
+                category, difficulty, era, limit=1,
+                created_before=now - timedelta(days=settings.REUSE_MIN_AGE_DAYS),
+                cooldown=cooldown
+            )
+        except Exception as e:
+            self.logger.warning(f"Question reuse lookup failed: {e}")
+            return None
+        
+        return self._question_from_bank_row(candidates[0]).shuffled() if candidates else None
+    
+    def _question_from_bank_row(self, data: dict) -> TriviaQuestion:
+        return TriviaQuestion(
+            question=data['question_text'],
+            options=data['options'],
+            correct_answer=data['correct_answer'],
+            category=data['subcategory'] or data['category'],
+            difficulty=data['difficulty'],
+            era=data['era'] if data['era'] != "any" else None,
+            explanation=data['explanation'],
+            question_id=data['id']
+        )
+    
+    async def rebuild_near_duplicate_index(self):
+        """Rebuild the near-duplicate index from every question in the bank."""
+        if not settings.NEAR_DUPLICATE_ENABLED:
+            return
+        
+        rows = await db_manager.get_question_documents()
+        documents = [
+            (self._dedup_document(question_text, options, correct_answer), question_id)
+            for question_id, question_text, options, correct_answer in rows
+        ]
+        
+        # Build off the event loop into a fresh index; questions accepted
+        # meanwhile are queued and replayed after the swap.
+        self._index_pending = []
+        try:
+            index = NearDuplicateIndex(threshold=settings.NEAR_DUPLICATE_THRESHOLD)
+            await asyncio.to_thread(index.add_many, documents)
+            index.add_many(self._index_pending)
+            self.near_duplicates = index
+        finally:
+            self._index_pending = None
+        
+        self.logger.info(f"Near-duplicate index rebuilt with {len(self.near_duplicates)} questions")
+    
+    def _dedup_document(self, question_text: str, options: List[str], correct_answer: str) -> str:
+        """Text indexed for near-duplicate detection: the question plus its correct answer."""
+        try:
+            return f"{question_text} {options[ord(correct_answer.upper()) - ord('A')]}"
+        except (IndexError, TypeError, AttributeError):
+            return question_text
+    
+    def _is_near_duplicate(self, question: TriviaQuestion, batch: List[TriviaQuestion] = None) -> bool:
+        """Check a question against the index and the other questions accepted in its batch."""
+        if not settings.NEAR_DUPLICATE_ENABLED:
+            return False
+        
+        document = self._dedup_document(question.question, question.options, question.correct_answer)
+        
+        duplicate_of = self.near_duplicates.find_duplicate(document)
+        if duplicate_of is not None:
+            self.logger.warning(f"Rejected near-duplicate of bank question #{duplicate_of}: '{question.question}'")
+            return True
+        
+        for other in batch or []:
+            other_document = self._dedup_document(other.question, other.options, other.correct_answer)
+            if self.near_duplicates.similarity(document, other_document) >= self.near_duplicates.threshold:
+                self.logger.warning(f"Rejected near-duplicate within batch: '{question.question}'")
+                return True
+        
+        return False
+    
+    async def _accept_questions(
+        self,
+        questions: List[TriviaQuestion],
+        category: str,
+        difficulty: str,
+        era: str
+    ):
+        """Store accepted questions in the bank and the near-duplicate index."""
+        await self._save_to_bank(questions, category, difficulty, era)
+        
+        if not settings.NEAR_DUPLICATE_ENABLED:
+            return
+        
+        for question in questions:
+            document = self._dedup_document(question.question, question.options, question.correct_answer)
+            self.near_duplicates.add(document, question.question_id)
+            if self._index_pending is not None:
+                self._index_pending.append((document, question.question_id))
+    
+    async def _save_to_bank(
+        self,
+        questions: List[TriviaQuestion],
+        category: str,
+        difficulty: str,
+        era: str
+    ):
+        """Store accepted questions in the question bank and record their bank ids."""
+        if not settings.QUESTION_BANK_ENABLED or not questions:
+            return
+        
+        rows = [
+            {
+                'text_hash': question.text_hash,
+                'question_text': question.question,
+                'options': question.options,
+                'correct_answer': question.correct_answer,
+                'category': category,
+                'subcategory': question.category,
+                'difficulty': difficulty,
+                'era': era,
+                'explanation': question.explanation
+            }
+            for question in questions
+        ]
+        
+        try:
+            ids = await db_manager.save_questions(rows)
+        except Exception as e:
+            # The bank is an optimization; never fail generation over it
+            self.logger.warning(f"Failed to save questions to bank: {e}")
+            return
+        
+        for question in questions:
+            question.question_id = ids.get(question.text_hash)
+            if question.served and question.question_id is not None:
+                # Handed out while the rest of its batch was still streaming
+                self._spawn(db_manager.record_question_served(question.question_id))
+    
+    def _spawn(self, coro):
+        """Run a fire-and-forget coroutine, keeping a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._finish_background_task)
+    
+    def _finish_background_task(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            self.logger.warning(f"Background task failed: {task.exception()}")
+    
+    def _matches_key(self, question: TriviaQuestion, key: PoolKey) -> bool:
+        """Whether a question fits a normalized request; built-in categories match their subcategories."""
+        category, difficulty, era = key
+        if question.difficulty != difficulty or (question.era or "any") != era:
+            return False
+        if category == "random":
+            return True
+        return question.category.lower() == category or question.category in self.categories.get(category, [])
+    
+    def _normalize_request(self, category: str, difficulty: str, era: str) -> PoolKey:
+        """Normalize request parameters. Custom categories are kept as-is."""
+        category = category.lower()
+        difficulty = difficulty.lower()
+        era = era.lower()
+        
+        if difficulty not in self.difficulties:
+            difficulty = "medium"
+        if era not in self.eras:
+            era = "any"
+        
+        return category, difficulty, era
+    
+    async def _generate_fresh(self, category: str, difficulty: str, era: str) -> TriviaQuestion:
+        """
+        Generate a question from OpenAI with one quality retry. Raises on failure.
+        
+        The question is banked only if it passed validation; a retry that
+        fails again is still served, but kept out of the bank and the index.
+        """
+        # Get specific subcategory if applicable
+        specific_category = self._get_specific_category(category)
+        
+        # Create the prompt
+        prompt = self._create_trivia_prompt(specific_category, difficulty, era)
+        
+        # Generate question using OpenAI
+        model = self.router.choose(difficulty)
+        response = await self._call_openai(prompt, model, difficulty)
+        
+        # Parse the response
+        question = self._parse_response(response, specific_category, difficulty, era, model)
+        
+        # Quality control validation
+        passed = self._validate_question_quality(question) and not self._is_near_duplicate(question)
+        if not passed:
+            self.logger.warning("Question failed quality check, regenerating...")
+            # Try once more with stricter prompt
+            stricter_prompt = self._create_stricter_prompt(specific_category, difficulty, era)
+            response = await self._call_openai(stricter_prompt, model, difficulty)
+            question = self._parse_response(response, specific_category, difficulty, era, model)
+            passed = self._validate_question_quality(question) and not self._is_near_duplicate(question)
+        
+        if passed:
+            await self._accept_questions([question], category, difficulty, era)
+        return question
+    
+    async def _generate_candidates(self, category: str, difficulty: str, era: str, k: int) -> TriviaQuestion:
+        """
+        Generate k candidates at once and return the first that passes validation.
+        
+        Replaces the serial stricter-prompt retry: a rejected candidate costs no
+        extra round trip because the others are already on their way. Every
+        passing candidate is banked; those not returned also go to the pool.
+        If none passes, the last resort is served but never banked. Raises if
+        no candidate could be generated at all.
+        """
+        if settings.PARALLEL_CANDIDATES_MODE == "batch":
+            return await self._generate_batch_candidates(category, difficulty, era, k)
+        
+        specific_category = self._get_specific_category(category)
+        prompt = self._create_trivia_prompt(specific_category, difficulty, era)
+        model = self.router.choose(difficulty)
+        pending = {asyncio.create_task(self._call_openai(prompt, model, difficulty)) for _ in range(k)}
+        
+        accepted: List[TriviaQuestion] = []
+        fallback = None
+        error = None
+        while pending and not accepted:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    question = self._parse_response(task.result(), specific_category, difficulty, era, model)
+                except Exception as e:
+                    error = error or e
+                    continue
+                
+                if self._check_candidate(question, accepted, category):
+                    accepted.append(question)
+                else:
+                    fallback = fallback or question
+        
+        if accepted:
+            # Finish the rest in the background; passing candidates are worth keeping
+            self._spawn(self._keep_candidates(pending, accepted, specific_category, category, difficulty, era, model))
+            await self._accept_questions(accepted[:1], category, difficulty, era)
+            return accepted[0]
+        
+        # Nothing passed; like the serial retry, serve the last resort unvalidated
+        if fallback:
+            return fallback
+        raise error or ValueError("No candidates generated")
+    
+    async def _keep_candidates(
+        self,
+        pending: Set[asyncio.Task],
+        accepted: List[TriviaQuestion],
+        specific_category: str,
+        category: str,
+        difficulty: str,
+        era: str,
+        model: str
+    ):
+        """Store passing candidates beyond the one served, including those still in flight."""
+        for response in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(response, BaseException):
+                continue
+            try:
+                question = self._parse_response(response, specific_category, difficulty, era, model)
+            except ValueError:
+                continue
+            if self._check_candidate(question, accepted, category):
+                accepted.append(question)
+        
+        extras = accepted[1:]
+        if not extras:
+            return
+        await self._accept_questions(extras, category, difficulty, era)
+        key = (category, difficulty, era)
+        if self.question_pool.is_poolable(key):
+            for question in extras:
+                self.question_pool.put(key, question)
+    
+    def _check_candidate(self, question: TriviaQuestion, accepted: List[TriviaQuestion], category: str) -> bool:
+        """Validate a candidate against quality rules and the other candidates, counting the result."""
+        passed = self._validate_question_quality(question) and not self._is_near_duplicate(question, accepted)
+        stats = self.candidate_stats.setdefault(category, {"candidates": 0, "accepted": 0})
+        stats["candidates"] += 1
+        stats["accepted"] += 1 if passed else 0
+        return passed
+    
+    async def _generate_batch_candidates(self, category: str, difficulty: str, era: str, k: int) -> TriviaQuestion:
+        """
+        Candidate generation as a single batched call; the first passing item is returned.
+        
+        generate_questions banks the whole batch, the returned item included.
+        """
+        first = asyncio.get_running_loop().create_future()
+        
+        def on_question(question: TriviaQuestion):
+            if not first.done():
+                first.set_result(question)
+        
+        task = asyncio.create_task(self.generate_questions(category, difficulty, era, k, on_question=on_question))
+        await asyncio.wait({task, first}, return_when=asyncio.FIRST_COMPLETED)
+        if not first.done():
+            task.result()  # raises if the call failed
+            raise ValueError("No batch candidate passed validation")
+        
+        question = first.result()
+        task.add_done_callback(lambda _: self._finish_batch_candidates(task, question, (category, difficulty, era), k))
+        return question
+    
+    def _finish_batch_candidates(self, task: asyncio.Task, served: TriviaQuestion, key: PoolKey, k: int):
+        """Count the batch's pass rate and pool the candidates not served; they're already banked."""
+        if task.cancelled() or task.exception() is not None:
+            return
+        
+        questions = task.result()
+        stats = self.candidate_stats.setdefault(key[0], {"candidates": 0, "accepted": 0})
+        stats["candidates"] += k
+        stats["accepted"] += len(questions)
+        
+        if not self.question_pool.is_poolable(key):
+            return
+        for question in questions:
+            if question is not served:
+                self.question_pool.put(key, question)
+    
+    def get_candidate_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the share of parallel candidates passing validation, per category."""
+        return {
+            category: dict(counts, acceptance_rate=(counts["accepted"] / counts["candidates"]) * 100)
+            for category, counts in self.candidate_stats.items()
+        }
+    
+    def _get_specific_category(self, category: str, rng: Optional[random.Random] = None) -> str:
+        """Get a specific subcategory or return the category itself, drawing from `rng` if given."""
+        rng = rng or random
         if category == "random":
             # Pick a random category and subcategory
-            random_cat = random.choice(list(self.categories.keys()))
+            random_cat = rng.choice(list(self.categories.keys()))
             if random_cat != "random":
-                return random.choice(self.categories[random_cat])
+                return rng.choice(self.categories[random_cat])
             return "General Knowledge"
         elif category in self.categories:
-            return random.choice(self.categories[category])
+            return rng.choice(self.categories[category])
         else:
             # For custom categories like "star trek", "physics", return as-is
             return category
     
     def _create_trivia_prompt(self, category: str, difficulty: str, era: str) -> str:
         """Create a prompt for OpenAI to generate trivia questions."""
+        if self.prompt_variant == "compact":
+            return self._create_compact_prompt(category, difficulty, era)
+        
         era_context = ""
         if era != "any":
             era_context = f" from the {era} era"
@@ -112,6 +1442,8 @@ class TriviaGenerator:
             "hard": "challenging, requiring specialized or detailed knowledge"
         }
         
+        explanation_rule, explanation_field = self._explanation_prompt_parts("    ", "the correct answer")
+        
         prompt = f"""Generate a high-quality multiple-choice trivia question about {category}{era_context}.
 
 Requirements:
@@ -119,8 +1451,7 @@ Requirements:
 - Provide exactly 4 answer choices (A, B, C, D)
 - Only one correct answer
 - Question should be clear and unambiguous
-- Avoid questions that require extremely specific dates or obscure facts
-- Include a brief explanation of the correct answer
+- Avoid questions that require extremely specific dates or obscure facts{explanation_rule}
 
 QUALITY CONTROL - AVOID THESE COMMON MISTAKES:
 - DON'T give away the answer in the question (e.g., "What process involves boiling peanuts?" → "Boiled Peanuts")
@@ -140,8 +1471,7 @@ Format your response as JSON:
         "C": "Third option",
         "D": "Fourth option"
     }},
-    "correct_answer": "A",
-    "explanation": "Brief explanation of why this is correct"
+    "correct_answer": "A"{explanation_field}
 }}
 
 Generate the question now:"""
@@ -150,6 +1480,9 @@ Generate the question now:"""
     
     def _create_stricter_prompt(self, category: str, difficulty: str, era: str) -> str:
         """Create a stricter prompt for quality control retry."""
+        if self.prompt_variant == "compact":
+            return self._create_compact_prompt(category, difficulty, era, strict=True)
+        
         era_context = ""
         if era != "any":
             era_context = f" from the {era} era"
@@ -160,6 +1493,8 @@ Generate the question now:"""
             "hard": "challenging, requiring specialized or detailed knowledge"
         }
         
+        _, explanation_field = self._explanation_prompt_parts("    ")
+        
         prompt = f"""Generate a HIGH-QUALITY multiple-choice trivia question about {category}{era_context}.
 
 CRITICAL REQUIREMENTS:
@@ -196,15 +1531,103 @@ Format your response as JSON:
         "C": "Third option",
         "D": "Fourth option"
     }},
-    "correct_answer": "A",
-    "explanation": "Brief explanation of why this is correct"
+    "correct_answer": "A"{explanation_field}
 }}
 
 Generate a quality question now:"""
         
         return prompt
     
+    def _create_batch_prompt(self, category: str, difficulty: str, era: str, count: int) -> str:
+        """Create a prompt asking for several distinct questions in one JSON array."""
+        if self.prompt_variant == "compact":
+            return self._create_compact_prompt(category, difficulty, era, count=count)
+        
+        era_context = ""
+        if era != "any":
+            era_context = f" from the {era} era"
+        
+        difficulty_context = {
+            "easy": "suitable for beginners, with well-known facts",
+            "medium": "moderately challenging, requiring some knowledge",
+            "hard": "challenging, requiring specialized or detailed knowledge"
+        }
+        
+        explanation_rule, explanation_field = self._explanation_prompt_parts("        ", "each correct answer")
+        
+        prompt = f"""Generate {count} different high-quality multiple-choice trivia questions about {category}{era_context}.
+
+Requirements:
+- Difficulty: {difficulty} ({difficulty_context[difficulty]})
+- Every question must cover a different fact
+- Provide exactly 4 answer choices (A, B, C, D) per question
+- Only one correct answer per question
+- Questions should be clear and unambiguous
+- Avoid questions that require extremely specific dates or obscure facts{explanation_rule}
+
+QUALITY CONTROL - AVOID THESE COMMON MISTAKES:
+- DON'T give away the answer in the question
+- DON'T include the exact answer words in the question
+- DON'T make one option clearly longer/more detailed than others
+- DO make all wrong answers plausible and related to the topic
+- DO vary which letter holds the correct answer
+
+Format your response as a JSON array with exactly {count} objects:
+[
+    {{
+        "question": "Your question here?",
+        "options": {{
+            "A": "First option",
+            "B": "Second option",
+            "C": "Third option",
+            "D": "Fourth option"
+        }},
+        "correct_answer": "A"{explanation_field}
+    }}
+]
+
+Generate the {count} questions now:"""
+        
+        return prompt
+    
+    def _explanation_prompt_parts(self, indent: str, subject: str = "the correct answer") -> Tuple[str, str]:
+        """The requirement line and JSON field asking for an explanation; both empty when explanations are deferred."""
+        if self.defer_explanations:
+            return "", ""
+        return (
+            f"\n- Include a brief explanation of {subject}",
+            f',\n{indent}"explanation": "Brief explanation of why this is correct"'
+        )
+    
+    def _create_compact_prompt(
+        self,
+        category: str,
+        difficulty: str,
+        era: str,
+        count: Optional[int] = None,
+        strict: bool = False
+    ) -> str:
+        """Create the short, request-specific half of a compact prompt; the rules are in COMPACT_SYSTEM_PROMPT."""
+        lines = [f"Topic: {category}"]
+        if era != "any":
+            lines.append(f"Era: {era}")
+        lines.append(f"Difficulty: {difficulty}")
+        if strict:
+            lines.append("The last attempt broke the rules; follow every rule strictly.")
+        if count:
+            lines.append(f"Respond with a JSON array with exactly {count} objects.")
+        else:
+            lines.append("Respond with one JSON object.")
+        return "\n".join(lines)
+    
     def _validate_question_quality(self, question: TriviaQuestion) -> bool:
+        """Validate question quality, feeding the result into the generating model's profile."""
+        passed = self._passes_quality_rules(question)
+        if question.model:
+            self.router.record_validation(question.model, question.difficulty, passed)
+        return passed
+    
+    def _passes_quality_rules(self, question: TriviaQuestion) -> bool:
         """Validate question quality to catch obvious issues."""
         try:
             question_text = question.question.lower()
@@ -275,66 +1698,301 @@ Generate a quality question now:"""
             self.logger.error(f"Error validating question quality: {e}")
             return True  # If validation fails, allow the question through
     
-    def _call_openai(self, prompt: str) -> str:
+    async def _call_openai(self, prompt: str, model: str, difficulty: str) -> str:
         """Make API call to OpenAI."""
+        response = await self._create_completion(prompt, model, difficulty)
+        return response.choices[0].message.content.strip()
+    
+    async def _create_completion(
+        self,
+        prompt: str,
+        model: str,
+        difficulty: str,
+        max_tokens: int = 500,
+        batch: bool = False
+    ):
+        """Make API call to OpenAI and return the raw completion."""
+        params = self._completion_params(prompt, model, max_tokens, batch)
+        
+        async def request():
+            started = time.monotonic()
+            response = await self.client.chat.completions.create(**params)
+            self.router.record_latency(model, difficulty, time.monotonic() - started)
+            return response
+        
+        def attempt():
+            # Each attempt, primary or hedge, is one call through the breaker
+            return openai_breaker.call(request)
+        
+        estimated_tokens = estimate_tokens(params["messages"], max_tokens)
+        
+        def hedge():
+            # A hedge is a second real call: it takes its own slot and token
+            # charge, and its usage is billed to the guild when it completes.
+            # If it wins, the abandoned primary is billed at the same usage.
+            return llm_scheduler.run(attempt, estimated_tokens=estimated_tokens)
+        
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a trivia question generator. Always respond with valid JSON in the exact format requested."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.7
+            return await llm_scheduler.run(
+                lambda: self.hedger.run(model, attempt, hedge),
+                estimated_tokens=estimated_tokens
             )
             
-            return response.choices[0].message.content.strip()
-            
+        except CircuitOpenError:
+            raise
         except Exception as e:
             self.logger.error(f"OpenAI API call failed: {e}")
             raise
     
-    def _parse_response(self, response: str, category: str, difficulty: str, era: str) -> TriviaQuestion:
+    async def _stream_completion(
+        self,
+        prompt: str,
+        model: str,
+        difficulty: str,
+        max_tokens: int = 500,
+        batch: bool = False
+    ):
+        """
+        Stream a completion from OpenAI, yielding raw chunks as they arrive.
+        
+        Streams are not hedged: a duplicate would hold a second scheduler slot
+        for the whole response, not just until the first token.
+        """
+        params = self._completion_params(prompt, model, max_tokens, batch)
+        started = None
+        tracked = None
+        
+        async def attempt():
+            nonlocal started, tracked
+            # The breaker judges the whole stream, not just its creation
+            tracked = openai_breaker.start()
+            started = time.monotonic()
+            try:
+                return await self.client.chat.completions.create(
+                    **params,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+            except BaseException as e:
+                openai_breaker.finish(tracked, e)
+                raise
+        
+        stream = await llm_scheduler.run(
+            attempt,
+            estimated_tokens=estimate_tokens(params["messages"], max_tokens),
+            stream=True
+        )
+        
+        error = None
+        try:
+            async for chunk in stream:
+                tracked.progress()
+                yield chunk
+            self.router.record_latency(model, difficulty, time.monotonic() - started)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            openai_breaker.finish(tracked, error)
+            await stream.close()
+    
+    def _completion_params(self, prompt: str, model: str, max_tokens: int, batch: bool) -> Dict:
+        """Request parameters for a generation call, including the structured output format if enabled."""
+        self.generation_calls += 1
+        params = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": self._system_prompt()},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.7
+        }
+        
+        mode = settings.OPENAI_STRUCTURED_OUTPUT
+        if mode == "json_schema":
+            if self.defer_explanations:
+                json_schema = SHORT_BATCH_RESPONSE_FORMAT if batch else SHORT_QUESTION_RESPONSE_FORMAT
+            else:
+                json_schema = BATCH_RESPONSE_FORMAT if batch else QUESTION_RESPONSE_FORMAT
+            params["response_format"] = {"type": "json_schema", "json_schema": json_schema}
+        elif mode == "json_object":
+            params["response_format"] = {"type": "json_object"}
+        
+        self._record_prompt_tokens(params)
+        return params
+    
+    def _system_prompt(self) -> str:
+        if self.prompt_variant != "compact":
+            return SYSTEM_PROMPT
+        return COMPACT_SHORT_SYSTEM_PROMPT if self.defer_explanations else COMPACT_SYSTEM_PROMPT
+    
+    def _record_prompt_tokens(self, params: Dict):
+        """Count and log the prompt tokens of a request under the current prompt variant."""
+        tokens = count_message_tokens(params["messages"], params["model"])
+        stats = self.prompt_stats.setdefault(self.prompt_variant, {"requests": 0, "prompt_tokens": 0})
+        stats["requests"] += 1
+        stats["prompt_tokens"] += tokens
+        self.logger.debug(f"Prompt to {params['model']}: {tokens} tokens ({self.prompt_variant} variant)")
+    
+    def _parse_response(
+        self,
+        response: str,
+        category: str,
+        difficulty: str,
+        era: str,
+        model: Optional[str] = None
+    ) -> TriviaQuestion:
         """Parse OpenAI response into TriviaQuestion object."""
         try:
-            # Clean the response - remove markdown code blocks if present
-            response = re.sub(r'```json\s*', '', response)
-            response = re.sub(r'```\s*$', '', response)
-            
-            # Parse JSON
-            data = json.loads(response)
-            
-            # Extract data
-            question_text = data["question"]
-            options_dict = data["options"]
-            correct_answer = data["correct_answer"]
-            explanation = data.get("explanation", "")
-            
-            # Convert options to list
-            options = [
-                options_dict["A"],
-                options_dict["B"], 
-                options_dict["C"],
-                options_dict["D"]
-            ]
-            
-            return TriviaQuestion(
-                question=question_text,
-                options=options,
-                correct_answer=correct_answer,
-                category=category,
-                difficulty=difficulty,
-                era=era if era != "any" else None,
-                explanation=explanation
-            )
-            
-        except (json.JSONDecodeError, KeyError) as e:
+            data, salvaged = self._load_json(response, model)
+            question = self._question_from_data(data, category, difficulty, era, model)
+        except (ValueError, KeyError, TypeError) as e:
+            self._record_parse("failed", model, difficulty)
             self.logger.error(f"Failed to parse OpenAI response: {e}")
             self.logger.debug(f"Response was: {response}")
             raise ValueError(f"Invalid response format from AI: {e}")
+        
+        self._record_parse("salvaged" if salvaged else "strict", model, difficulty)
+        return question
+    
+    def _parse_batch_response(
+        self,
+        response: str,
+        category: str,
+        difficulty: str,
+        era: str,
+        model: Optional[str] = None
+    ) -> List[TriviaQuestion]:
+        """Parse a JSON array response, skipping malformed items instead of failing the batch."""
+        try:
+            data, salvaged = self._load_json(response, model)
+        except ValueError as e:
+            self._record_parse("failed", model, difficulty)
+            self.logger.error(f"Failed to parse OpenAI batch response: {e}")
+            self.logger.debug(f"Response was: {response}")
+            return []
+        
+        # Some completions wrap the array in an object
+        if isinstance(data, dict):
+            data = data.get("questions", [data])
+        if not isinstance(data, list):
+            self._record_parse("failed", model, difficulty)
+            return []
+        
+        questions = []
+        seen = set()
+        for item in data:
+            try:
+                question = self._question_from_data(item, category, difficulty, era, model)
+            except (KeyError, TypeError) as e:
+                self.logger.warning(f"Skipping malformed batch item: {e}")
+                continue
+            
+            # Drop repeats within the same batch
+            text = question.question.strip().lower()
+            if text in seen:
+                continue
+            seen.add(text)
+            questions.append(question)
+        
+        self._record_parse("failed" if not questions else "salvaged" if salvaged else "strict", model, difficulty)
+        return questions
+    
+    def _load_json(self, response: str, model: Optional[str] = None) -> Tuple[object, bool]:
+        """
+        Decode a completion, salvaging malformed JSON rather than giving up.
+        
+        Returns (data, salvaged). Raises ValueError if nothing is recoverable.
+        """
+        try:
+            return json.loads(self._strip_code_fences(response)), False
+        except json.JSONDecodeError as e:
+            data = salvage_json(response)
+            if data is None:
+                raise ValueError(str(e))
+            self.logger.warning(f"Salvaged malformed JSON from {model or self.router.default_model}: {e}")
+            return data, True
+    
+    def _record_parse(self, outcome: str, model: Optional[str], difficulty: str):
+        """Count a parse outcome (strict, salvaged or failed) for a model; failures count against its profile."""
+        stats = self.parse_stats.setdefault(model or self.router.default_model, {"strict": 0, "salvaged": 0, "failed": 0})
+        stats[outcome] += 1
+        if outcome == "failed" and model:
+            self.router.record_validation(model, difficulty, False)
+    
+    def get_prompt_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get prompt tokens sent per prompt variant, with the average per request."""
+        return {
+            variant: dict(counts, avg_tokens=counts["prompt_tokens"] / counts["requests"] if counts["requests"] else 0.0)
+            for variant, counts in self.prompt_stats.items()
+        }
+    
+    def get_parse_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get parse outcomes per model, with the share of responses that failed."""
+        stats = {}
+        for model, counts in self.parse_stats.items():
+            total = sum(counts.values())
+            stats[model] = dict(counts, failure_rate=(counts["failed"] / total) * 100 if total else 0.0)
+        return stats
+    
+    def _strip_code_fences(self, response: str) -> str:
+        """Clean the response - remove markdown code blocks if present."""
+        response = re.sub(r'```json\s*', '', response)
+        response = re.sub(r'```\s*$', '', response)
+        return response
+    
+    def _question_from_data(
+        self,
+        data: Dict,
+        category: str,
+        difficulty: str,
+        era: str,
+        model: Optional[str] = None
+    ) -> TriviaQuestion:
+        """Build a TriviaQuestion from one parsed JSON object."""
+        # Extract data
+        question_text = data["question"]
+        options_dict = data["options"]
+        correct_answer = data["correct_answer"]
+        explanation = data.get("explanation", "")
+        
+        # Convert options to list
+        options = [
+            options_dict["A"],
+            options_dict["B"], 
+            options_dict["C"],
+            options_dict["D"]
+        ]
+        
+        return TriviaQuestion(
+            question=question_text,
+            options=options,
+            correct_answer=correct_answer,
+            category=category,
+            difficulty=difficulty,
+            era=era if era != "any" else None,
+            explanation=explanation,
+            model=model
+        )
     
     def _get_fallback_question(self, category: str, difficulty: str) -> TriviaQuestion:
-        """Return a fallback question if AI generation fails."""
+        """Return a fallback question if AI generation fails, from the packed corpus when one is built."""
+        try:
+            packed = self.fallback_corpus.pick(None if category == "random" else category, difficulty)
+        except Exception as e:
+            self.logger.error(f"Failed to read fallback corpus: {e}")
+            packed = None
+        if packed:
+            return TriviaQuestion(
+                question=packed["question"],
+                options=packed["options"],
+                correct_answer=packed["correct_answer"],
+                category=packed["category"],
+                difficulty=packed["difficulty"],
+                explanation=packed["explanation"]
+            )
+        
         fallback_questions = {
             "easy": {
                 "question": "What is the capital of France?",
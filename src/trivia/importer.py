@@ -0,0 +1,363 @@
+"""
+Bulk-import offline question packs into the question bank.
+
+    python -m src.trivia.importer pack.json [more.jsonl more.csv ...]
+
+JSON packs are a top-level array of questions, or an object holding one
+under "results" (Open Trivia DB exports) or "questions". JSONL has one
+question object per line. CSV needs a header. Each question may use one of
+these layouts:
+
+- Open Trivia DB: correct_answer (the answer's text) plus incorrect_answers
+  (a list, or in CSV a "|"-separated string or incorrect_answer_1..3 columns)
+- This bot: options ({"A": ..., "D": ...} or a list; in CSV option_a..option_d
+  columns) plus correct_answer (a letter or the answer's text)
+
+Fields that are optional everywhere: category, difficulty, era and
+explanation. HTML entities are unescaped. Files are read incrementally and
+inserted in chunked transactions, so memory stays flat however large the
+pack is. Questions go through the generator's quality rules, and the
+bank's text-hash index drops exact duplicates.
+"""
+import argparse
+import asyncio
+import csv
+import html
+import json
+import logging
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from src.database.database import db_manager
+from src.trivia.generator import TriviaGenerator, TriviaQuestion, trivia_generator
+
+READ_SIZE = 1 << 16
+# A single question bigger than this means the file is malformed, not that it's still arriving
+MAX_RECORD_SIZE = 1 << 20
+ARRAY_KEY = re.compile(r'"(?:results|questions)"\s*:\s*\[')
+LETTERS = "ABCD"
+
+def iter_json_array(stream: TextIO) -> Iterator[Any]:
+    """Yield the elements of a JSON pack's question array one at a time, reading in blocks."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    
+    def read() -> bool:
+        nonlocal buffer
+        chunk = stream.read(READ_SIZE)
+        buffer += chunk
+        return bool(chunk)
+    
+    # Find the array: the root itself, or a member of the root object
+    root = None
+    while True:
+        if root is None and buffer.strip():
+            buffer = buffer.lstrip()
+            root = buffer[0]
+            if root == "[":
+                buffer = buffer[1:]
+                break
+            if root != "{":
+                raise ValueError("Expected a JSON array, or an object with a \"results\" or \"questions\" array")
+        if root == "{":
+            match = ARRAY_KEY.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            buffer = buffer[-64:]  # the key may straddle two reads
+        if not read():
+            raise ValueError("No question array found")
+    
+    position = 0
+    while True:
+        # Skip separators up to the next element
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            buffer, position = "", 0
+            if not read():
+                raise ValueError("Unterminated question array")
+            continue
+        if buffer[position] == "]":
+            return
+        
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # Most likely cut off by the end of the block
+            if len(buffer) - position > MAX_RECORD_SIZE:
+                raise ValueError(f"Malformed question near character {position}")
+            buffer, position = buffer[position:], 0
+            if not read():
+                raise ValueError("Truncated question at end of file")
+            continue
+        
+        yield value
+        position = end
+        if position >= READ_SIZE:
+            buffer, position = buffer[position:], 0
+
+def iter_jsonl(stream: TextIO) -> Iterator[Optional[dict]]:
+    """Yield one question object per line; None for lines that aren't valid JSON."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+def iter_csv(stream: TextIO) -> Iterator[dict]:
+    """Yield CSV rows as dicts keyed by lower-case column name."""
+    for row in csv.DictReader(stream):
+        yield {(key or "").strip().lower(): value for key, value in row.items()}
+
+READERS = {"json": iter_json_array, "jsonl": iter_jsonl, "csv": iter_csv}
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower().lstrip(".")
+    if suffix in ("jsonl", "ndjson"):
+        return "jsonl"
+    if suffix in READERS:
+        return suffix
+    raise ValueError(f"Can't tell the format of {path}; pass --format")
+
+class QuestionImporter:
+    """Maps pack records onto questions, validates them and inserts them in chunks."""
+    
+    def __init__(
+        self,
+        generator: TriviaGenerator,
+        chunk_size: int = 500,
+        category: Optional[str] = None,
+        difficulty: str = "medium",
+        near_duplicates: bool = False,
+        progress_interval: float = 5.0,
+        seed: Optional[int] = None
+    ):
+        self.logger = logging.getLogger('TriviaBot.QuestionImporter')
+        self.generator = generator
+        self.chunk_size = chunk_size
+        self.category = category
+        self.difficulty = difficulty
+        self.near_duplicates = near_duplicates
+        self.progress_interval = progress_interval
+        self.rng = random.Random(seed)  # shuffles Open Trivia DB answers into A-D
+        
+        self._categories: Dict[str, str] = {}
+        self.stats = {"read": 0, "unreadable": 0, "rejected": 0, "near_duplicates": 0,
+                      "duplicates": 0, "inserted": 0, "failed": 0}
+        self.started = time.perf_counter()
+        self._last_progress = self.started
+    
+    async def import_records(self, records: Iterator[Optional[dict]]):
+        """Import a stream of records, keeping at most one chunk insert in flight."""
+        chunk: List[dict] = []
+        pending: Optional[Tuple[asyncio.Task, int]] = None
+        
+        for record in records:
+            self.stats["read"] += 1
+            row = self.to_row(record)
+            if row:
+                chunk.append(row)
+            
+            if len(chunk) >= self.chunk_size:
+                if pending:
+                    await self._finish(*pending)
+                pending = asyncio.create_task(self._insert(chunk)), len(chunk)
+                chunk = []
+                await asyncio.sleep(0)  # start the insert while the next chunk is parsed
+            
+            if time.perf_counter() - self._last_progress >= self.progress_interval:
+                self._last_progress = time.perf_counter()
+                print(self.progress(), file=sys.stderr)
+        
+        if pending:
+            await self._finish(*pending)
+        if chunk:
+            await self._finish(asyncio.create_task(self._insert(chunk)), len(chunk))
+    
+    def to_row(self, record: Optional[dict]) -> Optional[dict]:
+        """Bank row for a pack record, or None if it's unreadable, fails validation or is a near-duplicate."""
+        try:
+            question, category = self.to_question(record)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            self.stats["unreadable"] += 1
+            return None
+        
+        if not self.generator._validate_question_quality(question):
+            self.stats["rejected"] += 1
+            return None
+        
+        if self.near_duplicates:
+            if self.generator._is_near_duplicate(question):
+                self.stats["near_duplicates"] += 1
+                return None
+            document = self.generator._dedup_document(question.question, question.options, question.correct_answer)
+            self.generator.near_duplicates.add(document, None)
+        
+        return {
+            'text_hash': question.text_hash,
+            'question_text': question.question,
+            'options': question.options,
+            'correct_answer': question.correct_answer,
+            'category': category,
+            'subcategory': question.category,
+            'difficulty': question.difficulty,
+            'era': question.era or "any",
+            'explanation': question.explanation,
+            'source': 'import'
+        }
+    
+    def to_question(self, record: dict) -> Tuple[TriviaQuestion, str]:
+        """Map a record onto a TriviaQuestion. Returns (question, bank category)."""
+        text = self._text(record.get("question") or record["question_text"])
+        wrong = self._incorrect_answers(record)
+        
+        if wrong is not None:
+            # Open Trivia DB: the answer's text plus the wrong ones
+            correct = self._text(record["correct_answer"])
+            options = wrong + [correct]
+            self.rng.shuffle(options)
+        else:
+            options = self._options(record)
+            correct = self._text(record["correct_answer"])
+            if correct.upper() in LETTERS and len(correct) == 1:
+                correct = options[LETTERS.index(correct.upper())]
+        
+        if len(options) != 4 or not all(options) or not text or correct not in options:
+            raise ValueError("needs a question and four options, one of them correct")
+        
+        label = self._text(record.get("category") or "")
+        difficulty = (record.get("difficulty") or "").strip().lower()
+        question = TriviaQuestion(
+            question=text,
+            options=options,
+            correct_answer=LETTERS[options.index(correct)],
+            # Keep the pack's own label as the specific topic, like generated subcategories
+            category=label.split(":")[-1].strip() or self.category or "random",
+            difficulty=difficulty if difficulty in self.generator.difficulties else self.difficulty,
+            era=(record.get("era") or "").strip().lower() or None,
+            explanation=self._text(record.get("explanation") or "")
+        )
+        return question, self.category or self._bank_category(label)
+    
+    def progress(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        return (f"{self.stats['read']:,} read, {self.stats['inserted']:,} inserted "
+                f"({self.stats['read'] / elapsed if elapsed else 0:,.0f} rows/s)")
+    
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        stats = self.stats
+        return "\n".join([
+            f"read        {stats['read']:>10,}",
+            f"inserted    {stats['inserted']:>10,}",
+            f"duplicates  {stats['duplicates']:>10,}  (already in the bank or repeated in the pack)",
+            f"rejected    {stats['rejected']:>10,}  (failed quality rules)",
+            f"near dupes  {stats['near_duplicates']:>10,}",
+            f"unreadable  {stats['unreadable']:>10,}  (missing fields, not four options, bad JSON)",
+            f"failed      {stats['failed']:>10,}  (in chunks the database refused)",
+            f"{elapsed:.1f}s, {stats['read'] / elapsed if elapsed else 0:,.0f} rows/s"
+        ])
+    
+    async def _insert(self, rows: List[dict]) -> int:
+        """Insert a chunk in one transaction. Returns how many rows were new."""
+        # Duplicates within a chunk would only be ignored by the database anyway
+        unique = list({row['text_hash']: row for row in rows}.values())
+        return await db_manager.import_questions(unique)
+    
+    async def _finish(self, task: asyncio.Task, size: int):
+        try:
+            inserted = await task
+        except Exception as e:
+            self.logger.error(f"Chunk insert failed: {e}")
+            self.stats["failed"] += size
+            return
+        self.stats["inserted"] += inserted
+        self.stats["duplicates"] += size - inserted
+    
+    def _incorrect_answers(self, record: dict) -> Optional[List[str]]:
+        wrong = record.get("incorrect_answers")
+        if isinstance(wrong, str):
+            wrong = wrong.split("|")
+        if wrong is None and "incorrect_answer_1" in record:
+            wrong = [record.get(f"incorrect_answer_{i}") for i in (1, 2, 3)]
+        return [self._text(answer) for answer in wrong] if wrong is not None else None
+    
+    def _options(self, record: dict) -> List[str]:
+        options = record.get("options")
+        if isinstance(options, dict):
+            options = [options[letter] for letter in LETTERS]
+        elif options is None:
+            prefix = "option_" if "option_a" in record else ""
+            options = [record[prefix + letter.lower()] for letter in LETTERS]
+        return [self._text(option) for option in options]
+    
+    def _text(self, value: Any) -> str:
+        return html.unescape(str(value)).strip() if value is not None else ""
+    
+    def _bank_category(self, label: str) -> str:
+        """Built-in category for a pack's category label, e.g. "Entertainment: Film" -> entertainment."""
+        if label not in self._categories:
+            lowered = label.lower()
+            match = next((name for name in self.generator.categories if name != "random" and name in lowered), None)
+            if match is None:
+                match = next(
+                    (name for name, topics in self.generator.categories.items()
+                     if any(topic.lower() in lowered for topic in topics if topic != "Mixed Topics")),
+                    "random"
+                )
+            self._categories[label] = match
+        return self._categories[label]
+
+async def run_import(args: argparse.Namespace) -> QuestionImporter:
+    await db_manager.create_tables()
+    if args.near_duplicates:
+        await trivia_generator.rebuild_near_duplicate_index()
+    
+    importer = QuestionImporter(
+        trivia_generator,
+        chunk_size=args.chunk_size,
+        category=args.category,
+        difficulty=args.difficulty,
+        near_duplicates=args.near_duplicates,
+        progress_interval=args.progress,
+        seed=args.seed
+    )
+    for name in args.files:
+        path = Path(name)
+        file_format = args.format or detect_format(path)
+        with path.open(encoding="utf-8-sig", newline="") as stream:
+            try:
+                await importer.import_records(READERS[file_format](stream))
+            except ValueError as e:
+                importer.logger.error(f"Stopped reading {path}: {e}")
+    return importer
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Import question packs into the question bank")
+    parser.add_argument("files", nargs="+", help="JSON, JSONL or CSV question packs")
+    parser.add_argument("--format", choices=sorted(READERS), help="override detection by file extension")
+    parser.add_argument("--chunk-size", type=int, default=500, help="questions per insert transaction")
+    parser.add_argument("--category", default=None, help="bank category for every question, instead of mapping each")
+    parser.add_argument("--difficulty", default="medium", choices=["easy", "medium", "hard"],
+                        help="difficulty for questions that don't state one")
+    parser.add_argument("--near-duplicates", action="store_true",
+                        help="also reject near-duplicates (the index grows with the bank and the pack)")
+    parser.add_argument("--progress", type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument("--seed", type=int, default=None, help="seed for shuffling Open Trivia DB answers")
+    parser.add_argument("--verbose", action="store_true", help="log every rejected question")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    importer = asyncio.run(run_import(args))
+    print(importer.summary())
+
+if __name__ == "__main__":
+    main()
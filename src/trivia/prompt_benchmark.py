@@ -0,0 +1,125 @@
+"""
+Compare prompt variants on prompt size, latency and validation pass rate.
+
+    python -m src.trivia.prompt_benchmark --requests 30 --batch 5
+
+Requests go wherever OPENAI_BASE_URL points. The mock server
+(python -m src.utils.mock_openai) is enough to compare prompt sizes and
+check the plumbing; only a real model says anything about pass rates or
+prefix caching. Nothing is written to the question bank.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List
+
+from src.trivia.generator import TriviaGenerator
+from src.utils.openai_client import openai_client
+from src.utils.token_counter import tiktoken
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+async def run_variant(variant: str, args: argparse.Namespace) -> Dict[str, float]:
+    """Send `args.requests` generation calls with one prompt variant and measure them."""
+    # A generator of its own, so the variant and its stats stay out of the shared one
+    generator = TriviaGenerator()
+    generator.prompt_variant = variant
+    model = args.model or generator.router.default_model
+    rng = random.Random(args.seed)  # same topics for every variant
+    semaphore = asyncio.Semaphore(args.concurrency)
+    stats = {"requests": 0, "errors": 0, "questions": 0, "valid": 0, "usage_tokens": 0, "cached_tokens": 0}
+    latencies: List[float] = []
+    
+    async def one_request():
+        category = generator._get_specific_category(args.category, rng)
+        if args.batch > 1:
+            prompt = generator._create_batch_prompt(category, args.difficulty, "any", args.batch)
+        else:
+            prompt = generator._create_trivia_prompt(category, args.difficulty, "any")
+        
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await generator._create_completion(
+                    prompt, model, args.difficulty, max_tokens=150 * args.batch + 100, batch=args.batch > 1
+                )
+            except Exception as e:
+                stats["errors"] += 1
+                logging.getLogger('TriviaBot.PromptBenchmark').warning(f"Request failed: {e}")
+                return
+            latencies.append(time.perf_counter() - started)
+        
+        stats["requests"] += 1
+        usage = getattr(response, "usage", None)
+        if usage:
+            stats["usage_tokens"] += usage.prompt_tokens
+            details = getattr(usage, "prompt_tokens_details", None)
+            stats["cached_tokens"] += getattr(details, "cached_tokens", None) or 0
+        
+        content = response.choices[0].message.content.strip()
+        if args.batch > 1:
+            questions = generator._parse_batch_response(content, category, args.difficulty, "any", model)[:args.batch]
+        else:
+            try:
+                questions = [generator._parse_response(content, category, args.difficulty, "any", model)]
+            except ValueError:
+                questions = []
+        stats["questions"] += args.batch
+        stats["valid"] += sum(1 for question in questions if generator._validate_question_quality(question))
+    
+    await asyncio.gather(*(one_request() for _ in range(args.requests)))
+    # Counted locally by the generator for every request it built
+    prompt_stats = generator.get_prompt_stats().get(variant, {"avg_tokens": 0.0})
+    
+    requests = stats["requests"] or 1
+    return {
+        "variant": variant,
+        "requests": stats["requests"],
+        "errors": stats["errors"],
+        "prompt_tokens": prompt_stats["avg_tokens"],
+        "usage_tokens": stats["usage_tokens"] / requests,
+        "cached_share": (stats["cached_tokens"] / stats["usage_tokens"]) * 100 if stats["usage_tokens"] else 0.0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "pass_rate": (stats["valid"] / stats["questions"]) * 100 if stats["questions"] else 0.0
+    }
+
+async def benchmark(args: argparse.Namespace) -> List[Dict[str, float]]:
+    try:
+        return [await run_variant(variant.strip(), args) for variant in args.variants.split(",")]
+    finally:
+        await openai_client.close()
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compare trivia prompt variants")
+    parser.add_argument("--variants", default="full,compact", help="comma-separated prompt variants")
+    parser.add_argument("--requests", type=int, default=20, help="requests per variant")
+    parser.add_argument("--batch", type=int, default=1, help="questions per request; above 1 uses the batch prompt")
+    parser.add_argument("--category", default="random")
+    parser.add_argument("--difficulty", default="medium", choices=["easy", "medium", "hard"])
+    parser.add_argument("--model", default=None, help="model to use instead of the router's default")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show generator log messages")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    results = asyncio.run(benchmark(args))
+    
+    counter = "tiktoken" if tiktoken else "~4 chars/token"
+    print(f"{'variant':<10}{'requests':>9}{'errors':>8}{'prompt tok':>12}{'billed tok':>12}"
+          f"{'cached':>8}{'p50 s':>8}{'p90 s':>8}{'pass':>8}")
+    for result in results:
+        print(f"{result['variant']:<10}{result['requests']:>9}{result['errors']:>8}"
+              f"{result['prompt_tokens']:>12.0f}{result['usage_tokens']:>12.0f}{result['cached_share']:>7.0f}%"
+              f"{result['p50']:>8.2f}{result['p90']:>8.2f}{result['pass_rate']:>7.0f}%")
+    print(f"prompt tok counted locally ({counter}); billed tok and cached share from the API's usage")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Replay recorded trivia completions through the current parser and validator.
+
+    python -m src.trivia.replay cassettes/llm.jsonl
+
+Record a cassette with LLM_CASSETTE_MODE=record, then rerun this after
+changing parsing or validation to compare how many questions survive.
+No network calls are made.
+"""
+import argparse
+import json
+import logging
+import time
+from typing import Dict, List
+
+from src.trivia.generator import trivia_generator
+
+def completion_text(entry: Dict) -> str:
+    """Reassemble the completion text of a recorded response or stream."""
+    if "chunks" in entry:
+        return "".join(
+            chunk["choices"][0]["delta"].get("content") or ""
+            for chunk in entry["chunks"] if chunk.get("choices")
+        )
+    return entry["response"]["choices"][0]["message"]["content"] or ""
+
+def replay(path: str) -> Dict[str, float]:
+    """Parse and validate every trivia completion in a cassette, returning counts."""
+    stats = {"entries": 0, "trivia_responses": 0, "parse_failures": 0, "questions": 0, "valid": 0}
+    started = time.perf_counter()
+    
+    with open(path, encoding="utf-8") as cassette:
+        for line in cassette:
+            entry = json.loads(line)
+            stats["entries"] += 1
+            
+            messages: List[Dict] = entry["request"].get("messages", [])
+            system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+            if "trivia question generator" not in system:
+                continue
+            stats["trivia_responses"] += 1
+            
+            content = completion_text(entry).strip()
+            prompt = messages[-1]["content"] if messages else ""
+            if "JSON array" in prompt:
+                questions = trivia_generator._parse_batch_response(content, "replay", "medium", "any")
+            else:
+                try:
+                    questions = [trivia_generator._parse_response(content, "replay", "medium", "any")]
+                except ValueError:
+                    questions = []
+            
+            if not questions:
+                stats["parse_failures"] += 1
+            stats["questions"] += len(questions)
+            stats["valid"] += sum(1 for question in questions if trivia_generator._validate_question_quality(question))
+    
+    stats["seconds"] = time.perf_counter() - started
+    stats["entries_per_second"] = stats["entries"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Replay recorded trivia completions through the parser")
+    parser.add_argument("cassette", help="path to a cassette recorded with LLM_CASSETTE_MODE=record")
+    parser.add_argument("--verbose", action="store_true", help="show parser and validator log messages")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+    stats = replay(args.cassette)
+    
+    print(f"{stats['entries']} entries, {stats['trivia_responses']} trivia responses "
+          f"({stats['parse_failures']} unparseable)")
+    print(f"{stats['questions']} questions parsed, {stats['valid']} passed validation")
+    print(f"{stats['seconds']:.2f}s ({stats['entries_per_second']:.0f} entries/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import ast
+import json
+import re
+from typing import Any, Optional
+
+from src.trivia.streaming import IncrementalJSONParser
+
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"', "‘": "'", "’": "'"})
+TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+def salvage_json(text: str) -> Optional[Any]:
+    """
+    Recover what we can from a completion that isn't valid JSON.
+    
+    Tries progressively more forgiving readings: the JSON between the first
+    and last bracket (dropping fences and chatter around it), then with smart
+    quotes and trailing commas fixed, then as a Python literal (single-quoted
+    strings), and finally as a truncated document, keeping every field that
+    had fully arrived. Returns None if nothing usable is found.
+    """
+    start = min((i for i in (text.find("{"), text.find("[")) if i != -1), default=-1)
+    if start == -1:
+        return None
+    text = text[start:]
+    
+    end = max(text.rfind("}"), text.rfind("]"))
+    body = text[:end + 1] if end != -1 else text
+    repaired = TRAILING_COMMA.sub(r'\1', body.translate(SMART_QUOTES))
+    
+    for candidate in (body, repaired):
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+    
+    try:
+        literal = re.sub(r'\b(true|false|null)\b', lambda m: {"true": "True", "false": "False", "null": "None"}[m.group(1)], repaired)
+        value = ast.literal_eval(literal)
+        if isinstance(value, (dict, list)):
+            return value
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        pass
+    
+    # Truncated output: keep the complete parts
+    parser = IncrementalJSONParser()
+    try:
+        parser.feed(TRAILING_COMMA.sub(r'\1', text.translate(SMART_QUOTES)))
+    except ValueError:
+        pass
+    return parser.root or None
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import struct
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from config.settings import settings
+from src.database.database import db_manager
+
+class SeenFilter:
+    """
+    Rotating Bloom filter of the question hashes one user has been served.
+    
+    Two generations of BITS bits each are kept. Once the current generation
+    holds CAPACITY questions it becomes the previous one and the oldest is
+    dropped, so a user is guaranteed to be remembered for their last CAPACITY
+    questions (up to 2 * CAPACITY) in a fixed 2 * BITS / 8 bytes (4 KB).
+    Lookups and inserts are O(1): the HASHES bit positions are sliced straight
+    out of the question's SHA-1 text hash. False positive rate is ~0.1% when
+    both generations are full; a false positive only skips a question.
+    """
+    
+    BITS = 16384  # per generation, must be a power of two
+    INDEX_BITS = 14  # log2(BITS)
+    HASHES = 7
+    CAPACITY = 1000
+    
+    HEADER = struct.Struct('<I')
+    
+    def __init__(self, data: Optional[bytes] = None):
+        size = self.BITS // 8
+        if data and len(data) == self.HEADER.size + 2 * size:
+            self.count = self.HEADER.unpack_from(data)[0]
+            self.current = bytearray(data[self.HEADER.size:self.HEADER.size + size])
+            self.previous = bytearray(data[self.HEADER.size + size:])
+        else:
+            self.count = 0
+            self.current = bytearray(size)
+            self.previous = bytearray(size)
+    
+    def __contains__(self, text_hash: str) -> bool:
+        positions = self._positions(text_hash)
+        return self._test(self.current, positions) or self._test(self.previous, positions)
+    
+    def add(self, text_hash: str):
+        """Record a question hash as seen, rotating generations when full."""
+        if self.count >= self.CAPACITY:
+            self.previous = self.current
+            self.current = bytearray(self.BITS // 8)
+            self.count = 0
+        
+        for position in self._positions(text_hash):
+            self.current[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def to_bytes(self) -> bytes:
+        """Serialize for storage on the users table."""
+        return self.HEADER.pack(self.count) + bytes(self.current) + bytes(self.previous)
+    
+    def _positions(self, text_hash: str):
+        """Slice HASHES bit positions out of a hex SHA-1 digest."""
+        value = int(text_hash, 16)
+        mask = self.BITS - 1
+        return [(value >> (i * self.INDEX_BITS)) & mask for i in range(self.HASHES)]
+    
+    def _test(self, bits: bytearray, positions) -> bool:
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+class SeenQuestionTracker:
+    """
+    Keeps users' seen filters in an LRU cache, loading and saving them on the users table.
+    
+    Writes are batched: a filter is saved once SEEN_SAVE_EVERY questions
+    have been marked on it, when it is evicted, and by flush(), which runs
+    every SEEN_FLUSH_INTERVAL seconds and on shutdown. A crash loses at most
+    that many recent marks, which only risks a repeat question.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger('TriviaBot.SeenQuestions')
+        self.max_users = settings.SEEN_FILTER_CACHE_USERS
+        self.save_every = settings.SEEN_SAVE_EVERY
+        self.flush_interval = settings.SEEN_FLUSH_INTERVAL
+        self.filters: "OrderedDict[int, SeenFilter]" = OrderedDict()
+        # user_id -> questions marked since the filter was last saved
+        self._dirty: Dict[int, int] = {}
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending_saves = set()
+    
+    async def get(self, user_id: int) -> SeenFilter:
+        """Get a user's filter, loading it from the database on a cache miss."""
+        seen = self.filters.get(user_id)
+        if seen is not None:
+            self.filters.move_to_end(user_id)
+            return seen
+        
+        try:
+            data = await db_manager.get_seen_questions(user_id)
+        except Exception as e:
+            self.logger.warning(f"Failed to load seen questions for user {user_id}: {e}")
+            data = None
+        
+        # Another request may have loaded it while we were waiting
+        seen = self.filters.get(user_id) or SeenFilter(data)
+        self.filters[user_id] = seen
+        while len(self.filters) > self.max_users:
+            evicted_id, evicted = self.filters.popitem(last=False)
+            if self._dirty.pop(evicted_id, None):
+                self._save_in_background(evicted_id, evicted)
+        return seen
+    
+    async def mark_seen(self, user_id: int, text_hash: str):
+        """Record a served question; the filter is persisted in the background once enough marks build up."""
+        seen = await self.get(user_id)
+        seen.add(text_hash)
+        
+        marks = self._dirty.get(user_id, 0) + 1
+        if marks >= self.save_every:
+            self._dirty.pop(user_id, None)
+            self._save_in_background(user_id, seen)
+        else:
+            self._dirty[user_id] = marks
+        
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self.flush())
+    
+    async def flush(self):
+        """Save every cached filter with unsaved marks."""
+        self._last_flush = time.monotonic()
+        dirty, self._dirty = self._dirty, {}
+        await asyncio.gather(*(
+            self._save(user_id, self.filters[user_id]) for user_id in dirty if user_id in self.filters
+        ))
+    
+    def _save_in_background(self, user_id: int, seen: SeenFilter):
+        task = asyncio.create_task(self._save(user_id, seen))
+        self._pending_saves.add(task)
+        task.add_done_callback(self._pending_saves.discard)
+    
+    async def _save(self, user_id: int, seen: SeenFilter):
+        try:
+            await db_manager.save_seen_questions(user_id, seen.to_bytes())
+        except Exception as e:
+            self.logger.warning(f"Failed to save seen questions for user {user_id}: {e}")
+            if self.filters.get(user_id) is seen:
+                # Try again on the next flush
+                self._dirty.setdefault(user_id, 1)
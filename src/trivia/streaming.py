@@ -0,0 +1,173 @@
+import json
+from typing import Any, List, Optional
+
+WHITESPACE = " \t\r\n"
+LITERAL_END = ",}]" + WHITESPACE
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document as it streams in, exposing the partial result.
+    
+    Objects and arrays are linked into the tree as soon as they open, so
+    callers can read the fields that have arrived so far; `is_complete` tells
+    whether a container has been closed. Strings and other scalars only
+    appear once they are fully received. Anything before the first '{' or '['
+    (such as a markdown code fence) and after the root closes is ignored.
+    Each character is looked at once, so feeding a whole completion costs
+    about as much as parsing it in one go.
+    """
+    
+    def __init__(self):
+        self.root: Any = None
+        self.done = False
+        self._stack: List[Any] = []
+        self._keys: List[Optional[str]] = []
+        self._closed = set()
+        self._state = "start"
+        self._token: List[str] = []
+        self._escaped = False
+        self._string_is_key = False
+    
+    def feed(self, chunk: str):
+        """Consume the next piece of the document. Raises ValueError on malformed JSON."""
+        i = 0
+        length = len(chunk)
+        while i < length and not self.done:
+            state = self._state
+            
+            if state == "string":
+                i = self._read_string(chunk, i)
+                continue
+            
+            ch = chunk[i]
+            i += 1
+            
+            if state == "start":
+                if ch in "{[":
+                    self._open(ch)
+            elif state == "literal":
+                if ch in LITERAL_END:
+                    self._finish_literal()
+                    i -= 1  # let the delimiter be handled in the new state
+                else:
+                    self._token.append(ch)
+            elif ch in WHITESPACE:
+                continue
+            elif state == "value":
+                if ch == "]" and isinstance(self._stack[-1], list) and not self._stack[-1]:
+                    self._close()
+                else:
+                    self._start_value(ch)
+            elif state == "key":
+                if ch == '"':
+                    self._start_string(is_key=True)
+                elif ch == "}":
+                    self._close()
+                else:
+                    raise ValueError(f"Expected object key, got {ch!r}")
+            elif state == "colon":
+                if ch != ":":
+                    raise ValueError(f"Expected ':', got {ch!r}")
+                self._state = "value"
+            elif state == "after_value":
+                if ch == ",":
+                    self._state = "key" if isinstance(self._stack[-1], dict) else "value"
+                elif ch in "}]":
+                    self._close()
+                else:
+                    raise ValueError(f"Expected ',' or closing bracket, got {ch!r}")
+    
+    def is_complete(self, value: Any) -> bool:
+        """Whether a container from the tree has been closed."""
+        return id(value) in self._closed
+    
+    def _start_value(self, ch: str):
+        if ch in "{[":
+            self._open(ch)
+        elif ch == '"':
+            self._start_string(is_key=False)
+        elif ch in "-0123456789tfn":
+            self._state = "literal"
+            self._token = [ch]
+        else:
+            raise ValueError(f"Unexpected character {ch!r}")
+    
+    def _open(self, ch: str):
+        container = {} if ch == "{" else []
+        if self._stack:
+            self._add_value(container)
+        else:
+            self.root = container
+        self._stack.append(container)
+        self._keys.append(None)
+        self._state = "key" if ch == "{" else "value"
+    
+    def _close(self):
+        container = self._stack.pop()
+        self._keys.pop()
+        self._closed.add(id(container))
+        if self._stack:
+            self._state = "after_value"
+        else:
+            self.done = True
+    
+    def _add_value(self, value: Any):
+        parent = self._stack[-1]
+        if isinstance(parent, list):
+            parent.append(value)
+        else:
+            parent[self._keys[-1]] = value
+        self._state = "after_value"
+    
+    def _start_string(self, is_key: bool):
+        self._state = "string"
+        self._string_is_key = is_key
+        self._token = []
+        self._escaped = False
+    
+    def _read_string(self, chunk: str, i: int) -> int:
+        """Consume string characters from chunk[i:], returning the next index."""
+        length = len(chunk)
+        while i < length:
+            if self._escaped:
+                self._token.append(chunk[i])
+                self._escaped = False
+                i += 1
+                continue
+            
+            # Jump straight to the next character that matters
+            quote = chunk.find('"', i)
+            backslash = chunk.find('\\', i, quote if quote != -1 else length)
+            if backslash != -1:
+                self._token.append(chunk[i:backslash + 1])
+                self._escaped = True
+                i = backslash + 1
+            elif quote != -1:
+                self._token.append(chunk[i:quote])
+                self._finish_string()
+                return quote + 1
+            else:
+                self._token.append(chunk[i:])
+                return length
+        return i
+    
+    def _finish_string(self):
+        raw = "".join(self._token)
+        try:
+            value = json.loads(f'"{raw}"')
+        except ValueError:
+            value = raw
+        
+        if self._string_is_key:
+            self._keys[-1] = value
+            self._state = "colon"
+        else:
+            self._add_value(value)
+    
+    def _finish_literal(self):
+        raw = "".join(self._token)
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            raise ValueError(f"Invalid literal {raw!r}")
+        self._add_value(value)
@@ -0,0 +1,172 @@
+"""
+Out-of-process question generation, feeding the shared question bank.
+
+    python -m src.trivia.worker --concurrency 2
+
+Set GENERATION_WORKERS_ENABLED=true for the bot so it stops generating
+and only serves banked questions. Run as many workers as needed against
+the same database: each key is claimed for WORKER_CLAIM_TTL seconds
+before it is filled, so two workers never generate for the same key, and
+a key held by a worker that died frees up once its lease runs out.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from src.database.database import db_manager
+from src.trivia.generator import PoolKey, TriviaGenerator, trivia_generator
+from src.utils.circuit_breaker import openai_breaker
+
+class GenerationWorker:
+    """
+    Keeps unserved questions banked for every key, WORKER_READY_TARGET on average.
+    
+    The demand model shares the total among keys by forecast traffic. Each
+    pass counts the unserved questions per key, then claims and fills the
+    keys furthest below target, WORKER_CONCURRENCY at a time. Claims are
+    renewed after every batch and released when the key is full.
+    """
+    
+    def __init__(self, generator: TriviaGenerator, worker_id: Optional[str] = None):
+        self.logger = logging.getLogger('TriviaBot.GenerationWorker')
+        self.generator = generator
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.target = settings.WORKER_READY_TARGET
+        self.concurrency = settings.WORKER_CONCURRENCY
+        self.poll_interval = settings.WORKER_POLL_INTERVAL
+        self.claim_ttl = settings.WORKER_CLAIM_TTL
+        
+        self.stats = {"passes": 0, "claimed": 0, "contended": 0, "batches": 0, "generated": 0, "failures": 0}
+    
+    def keys(self) -> List[PoolKey]:
+        """Keys kept stocked: every built-in category at every difficulty, plus any era played recently."""
+        keys = [
+            (category, difficulty, "any")
+            for category in self.generator.categories
+            for difficulty in self.generator.difficulties
+        ]
+        return keys + [key for key in self.generator.demand.known_keys() if key not in keys]
+    
+    async def run(self, once: bool = False):
+        """Fill the bank until cancelled, or for a single pass with `once`."""
+        self.logger.info(f"Generation worker {self.worker_id} started")
+        while True:
+            try:
+                generated = await self.run_pass()
+            except Exception as e:
+                # The database may be briefly unreachable; try again next interval
+                self.logger.error(f"Worker pass failed: {e}")
+                generated = 0
+            if once:
+                return
+            if not generated:
+                await asyncio.sleep(self.poll_interval)
+    
+    async def run_pass(self) -> int:
+        """Top up every key below target that no other worker holds. Returns questions generated."""
+        self.stats["passes"] += 1
+        await self.generator.demand.maybe_refresh()
+        counts = await db_manager.get_ready_question_counts()
+        
+        keys = self.keys()
+        # No cap beyond the shared total: a key nobody else plays may take it all
+        targets = self.generator.demand.targets(keys, self.target, self.target * len(keys))
+        
+        deficits: Dict[PoolKey, int] = {}
+        for key in keys:
+            category, difficulty, era = key
+            ready = sum(
+                count for (c, d, e), count in counts.items()
+                if c == category and d == difficulty and (era == "any" or e == era)
+            )
+            if ready < targets[key]:
+                deficits[key] = targets[key] - ready
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def fill(key: PoolKey):
+            async with semaphore:
+                return await self._fill(key, deficits[key])
+        
+        # Busiest keys first
+        keys = self.generator.demand.hottest(deficits)
+        return sum(await asyncio.gather(*(fill(key) for key in keys)))
+    
+    async def _fill(self, key: PoolKey, deficit: int) -> int:
+        """Claim a key and generate batches for it until its deficit is covered."""
+        # Let a tripped breaker recover instead of hammering OpenAI
+        if not openai_breaker.available():
+            return 0
+        if not await db_manager.claim_generation_key(*key, self.worker_id, self.claim_ttl):
+            self.stats["contended"] += 1
+            return 0
+        self.stats["claimed"] += 1
+        
+        generated = 0
+        try:
+            while generated < deficit and openai_breaker.available():
+                count = min(deficit - generated, self.generator.batch_size)
+                try:
+                    questions = await self.generator.generate_questions(*key, count)
+                except Exception as e:
+                    self.stats["failures"] += 1
+                    self.logger.warning(f"Generation failed for {key}: {e}")
+                    break
+                
+                self.stats["batches"] += 1
+                if not questions:
+                    break
+                generated += len(questions)
+                
+                # Renew the lease; losing it means another worker took over
+                if not await db_manager.claim_generation_key(*key, self.worker_id, self.claim_ttl):
+                    self.logger.warning(f"Lost claim on {key}")
+                    return generated
+        finally:
+            self.stats["generated"] += generated
+        
+        await db_manager.release_generation_key(*key, self.worker_id)
+        return generated
+
+async def run_worker(args: argparse.Namespace):
+    await db_manager.create_tables()
+    # Reject near-duplicates of everything already banked, not just this run's questions
+    await trivia_generator.rebuild_near_duplicate_index()
+    
+    worker = GenerationWorker(trivia_generator, args.worker_id)
+    try:
+        await worker.run(once=args.once)
+    finally:
+        await trivia_generator.budget.flush()
+        await trivia_generator.client.close()
+        logging.getLogger('TriviaBot.GenerationWorker').info(f"Worker stats: {worker.stats}")
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Generate trivia questions into the shared question bank")
+    parser.add_argument("--concurrency", type=int, default=None, help="keys filled at once (WORKER_CONCURRENCY)")
+    parser.add_argument("--target", type=int, default=None, help="unserved questions per key (WORKER_READY_TARGET)")
+    parser.add_argument("--worker-id", default=None, help="claim owner name; defaults to host:pid")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args(argv)
+    
+    if args.concurrency is not None:
+        settings.WORKER_CONCURRENCY = args.concurrency
+    if args.target is not None:
+        settings.WORKER_READY_TARGET = args.target
+    
+    logging.basicConfig(
+        level=logging.INFO if not settings.DEBUG_MODE else logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    try:
+        asyncio.run(run_worker(args))
+    except KeyboardInterrupt:
+        print("Worker stopped by user.")
+
+if __name__ == "__main__":
+    main()
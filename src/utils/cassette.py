@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+class CassetteClient:
+    """
+    Record/replay layer over the OpenAI client's chat completions.
+    
+    In record mode every request is passed through and its response appended
+    to a JSONL cassette, keyed by a hash of the request parameters. In replay
+    mode responses are served from the cassette with no network calls; a
+    request recorded several times replays its responses in turn. Streamed
+    requests are recorded and replayed chunk by chunk.
+    """
+    
+    # Transport options that don't change what the model returns
+    IGNORED_PARAMS = {"stream_options"}
+    
+    def __init__(self, client, path: str, mode: str):
+        self.logger = logging.getLogger('TriviaBot.Cassette')
+        self.client = client
+        self.path = path
+        self.mode = mode
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        
+        self.entries: Dict[str, List[Dict]] = defaultdict(list)
+        self._replay_positions: Dict[str, int] = defaultdict(int)
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        self._load()
+        
+        self._file = None
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+    
+    async def create(self, **params):
+        """Drop-in for client.chat.completions.create."""
+        key = self.request_key(params)
+        
+        if self.mode == "replay":
+            return self._replay(key, params)
+        
+        response = await self.client.chat.completions.create(**params)
+        if params.get("stream"):
+            return RecordingStream(response, lambda chunks: self._record(key, params, {"chunks": chunks}))
+        self._record(key, params, {"response": response.model_dump()})
+        return response
+    
+    async def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        await self.client.close()
+    
+    def request_key(self, params: Dict[str, Any]) -> str:
+        """Hash of the prompt and generation parameters."""
+        relevant = {name: value for name, value in params.items() if name not in self.IGNORED_PARAMS}
+        return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    
+    def get_stats(self) -> Dict[str, int]:
+        stats = dict(self.stats)
+        stats["entries"] = sum(len(entries) for entries in self.entries.values())
+        return stats
+    
+    def _replay(self, key: str, params: Dict[str, Any]):
+        entries = self.entries.get(key)
+        if not entries:
+            self.stats["misses"] += 1
+            raise CassetteMissError(f"No recorded response for request {key[:12]}")
+        
+        self.stats["hits"] += 1
+        position = self._replay_positions[key]
+        self._replay_positions[key] = position + 1
+        entry = entries[position % len(entries)]
+        
+        if params.get("stream"):
+            return ReplayStream([ChatCompletionChunk.model_validate(chunk) for chunk in entry["chunks"]])
+        return ChatCompletion.model_validate(entry["response"])
+    
+    def _record(self, key: str, params: Dict[str, Any], result: Dict[str, Any]):
+        entry = {"key": key, "request": params, **result}
+        self.entries[key].append(entry)
+        self.stats["recorded"] += 1
+        if self._file:
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            self._file.flush()
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            if self.mode == "replay":
+                self.logger.warning(f"Cassette {self.path} not found; every request will miss")
+            return
+        
+        with open(self.path, encoding="utf-8") as cassette:
+            for line_number, line in enumerate(cassette, 1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    self.logger.warning(f"Skipping corrupt cassette line {line_number}")
+                    continue
+                self.entries[entry["key"]].append(entry)
+        
+        self.logger.info(f"Loaded {sum(len(e) for e in self.entries.values())} cassette entries from {self.path}")
+
+class RecordingStream:
+    """Passes a completion stream through, saving its chunks once it finishes."""
+    
+    def __init__(self, stream, on_complete):
+        self.stream = stream
+        self.on_complete = on_complete
+    
+    async def __aiter__(self):
+        chunks = []
+        async for chunk in self.stream:
+            chunks.append(chunk.model_dump())
+            yield chunk
+        # Only complete streams are recorded; an abandoned one would replay truncated
+        self.on_complete(chunks)
+    
+    async def close(self):
+        await self.stream.close()
+
+class ReplayStream:
+    """Async iterator over recorded completion chunks."""
+    
+    def __init__(self, chunks: List[ChatCompletionChunk]):
+        self.chunks = chunks
+    
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+    
+    async def close(self):
+        pass
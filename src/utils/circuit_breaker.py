@@ -0,0 +1,145 @@
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from config.settings import settings
+
+T = TypeVar("T")
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+class BreakerCall:
+    """A call let through by CircuitBreaker.start(), judged once it finishes."""
+    
+    def __init__(self, probe: bool):
+        self.probe = probe
+        self.longest_wait = 0.0
+        self._last_progress = time.monotonic()
+    
+    def progress(self):
+        """Mark the call as still alive, e.g. when a stream chunk arrives."""
+        now = time.monotonic()
+        self.longest_wait = max(self.longest_wait, now - self._last_progress)
+        self._last_progress = now
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency until it has had time to recover.
+    
+    Outcomes of recent calls are kept in a rolling window. When the share of
+    failed or slow calls reaches CIRCUIT_FAILURE_RATE the circuit opens and
+    calls are rejected instantly. After CIRCUIT_COOLDOWN seconds it goes
+    half-open and lets a single probe through: success closes it again,
+    failure reopens it for another cooldown.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(f'TriviaBot.CircuitBreaker.{name}')
+        self.name = name
+        self.enabled = settings.CIRCUIT_BREAKER_ENABLED
+        self.failure_rate = settings.CIRCUIT_FAILURE_RATE
+        self.min_calls = settings.CIRCUIT_MIN_CALLS
+        self.slow_call_seconds = settings.CIRCUIT_SLOW_CALL_SECONDS
+        self.cooldown = settings.CIRCUIT_COOLDOWN
+        
+        self._outcomes: Deque[bool] = deque(maxlen=settings.CIRCUIT_WINDOW)  # True for a failed or slow call
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+        self.stats = {"opened": 0, "rejected": 0}
+    
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+    
+    def available(self) -> bool:
+        """Whether a call would be let through right now."""
+        if not self.enabled:
+            return True
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probing)
+    
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Run a request through the breaker, raising CircuitOpenError if it is open."""
+        tracked = self.start()
+        try:
+            result = await request()
+        except BaseException as e:
+            self.finish(tracked, e)
+            raise
+        self.finish(tracked)
+        return result
+    
+    def start(self) -> BreakerCall:
+        """
+        Let a call through, raising CircuitOpenError if the circuit is open.
+        
+        For calls that outlive a single await, such as a stream read to the
+        end; every started call must be passed to finish().
+        """
+        probe = False
+        if self.enabled:
+            state = self.state
+            if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            
+            probe = state == self.HALF_OPEN
+            if probe:
+                self._probing = True
+        return BreakerCall(probe)
+    
+    def finish(self, tracked: BreakerCall, error: Optional[BaseException] = None):
+        """Record how a started call ended; it is slow if it ever went CIRCUIT_SLOW_CALL_SECONDS without progress."""
+        if not self.enabled:
+            return
+        if error is not None and not isinstance(error, Exception):
+            # Cancelled: says nothing about the dependency's health
+            if tracked.probe:
+                self._probing = False
+            return
+        
+        tracked.progress()
+        self._record(error is None and tracked.longest_wait <= self.slow_call_seconds, tracked.probe)
+    
+    def get_stats(self) -> Dict[str, object]:
+        """Get the breaker state and the failure rate over the current window."""
+        stats = dict(self.stats)
+        stats["state"] = self.state if self.enabled else "disabled"
+        stats["failure_rate"] = (sum(self._outcomes) / len(self._outcomes)) * 100 if self._outcomes else 0.0
+        return stats
+    
+    def _record(self, healthy: bool, probe: bool):
+        if probe:
+            self._probing = False
+            if healthy:
+                self.logger.info(f"{self.name} probe succeeded, closing circuit")
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        
+        self._outcomes.append(not healthy)
+        if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+            if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+    
+    def _open(self):
+        if self._state != self.OPEN:
+            self.stats["opened"] += 1
+            self.logger.warning(f"{self.name} circuit opened; serving local fallbacks for {self.cooldown:.0f}s")
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+# Shared by every OpenAI caller, since they all depend on the same upstream
+openai_breaker = CircuitBreaker("openai")
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from config.settings import settings
+
+T = TypeVar("T")
+
+class LatencyHistogram:
+    """Rolling window of recent request latencies for one model."""
+    
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+    
+    def __len__(self) -> int:
+        return len(self.samples)
+    
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency below which p percent of recent requests finished."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+        return ordered[index]
+
+class RequestHedger:
+    """
+    Issues a duplicate request when the first one runs past the observed tail latency.
+    
+    Latencies are tracked per model. Once a model has enough samples, a request
+    still running at the HEDGE_PERCENTILE latency gets one hedged copy; the first
+    to succeed wins and the other is cancelled. Hedges are capped per minute and
+    as a fraction of all requests so the extra spend stays bounded.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger('TriviaBot.RequestHedger')
+        self.enabled = settings.HEDGE_ENABLED
+        self.percentile = settings.HEDGE_PERCENTILE
+        self.min_samples = settings.HEDGE_MIN_SAMPLES
+        self.max_per_minute = settings.HEDGE_MAX_PER_MINUTE
+        self.max_ratio = settings.HEDGE_MAX_RATIO
+        self.window = settings.HEDGE_LATENCY_WINDOW
+        
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._recent_hedges: Deque[float] = deque()
+        self.stats = {"requests": 0, "hedges": 0, "wins": 0, "losses": 0, "throttled": 0}
+    
+    async def run(
+        self,
+        model: str,
+        request: Callable[[], Awaitable[T]],
+        hedge_request: Optional[Callable[[], Awaitable[T]]] = None
+    ) -> T:
+        """
+        Run a request, hedging it if it outlives the model's tail latency.
+        
+        The histogram gets one sample per request: the time until a result
+        came back, whichever attempt delivered it.
+        
+        Args:
+            model: Model name the latency histogram is kept under
+            request: Factory starting a fresh attempt each time it is called
+            hedge_request: Factory for the hedged copy, e.g. one that takes its
+                own scheduler slot and token charge; defaults to `request`
+        """
+        histogram = self.histograms.setdefault(model, LatencyHistogram(self.window))
+        self.stats["requests"] += 1
+        
+        delay = None
+        if self.enabled and len(histogram) >= self.min_samples:
+            delay = histogram.percentile(self.percentile)
+        
+        started = time.monotonic()
+        primary = asyncio.ensure_future(request())
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                result = primary.result()
+                histogram.record(time.monotonic() - started)
+                return result
+            
+            if not self._take_hedge_slot():
+                self.stats["throttled"] += 1
+                result = await primary
+                histogram.record(time.monotonic() - started)
+                return result
+            
+            self.stats["hedges"] += 1
+            self.logger.debug(f"Hedging {model} request after {delay:.2f}s")
+            hedge = asyncio.ensure_future((hedge_request or request)())
+            
+            winner = await self._first_success(primary, hedge)
+            self.stats["wins" if winner is hedge else "losses"] += 1
+            # When the hedge wins, the primary's latency is at least this long
+            histogram.record(time.monotonic() - started)
+            return winner.result()
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Get hedge counters and each model's current hedge threshold."""
+        stats = dict(self.stats)
+        stats["win_rate"] = (stats["wins"] / stats["hedges"]) * 100 if stats["hedges"] else 0.0
+        stats["thresholds"] = {
+            model: histogram.percentile(self.percentile)
+            for model, histogram in self.histograms.items()
+        }
+        return stats
+    
+    async def _first_success(self, *tasks: asyncio.Future) -> asyncio.Future:
+        """Wait for the first task to succeed, raising the first error if they all fail."""
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task
+                error = error or task.exception()
+        raise error
+    
+    def _take_hedge_slot(self) -> bool:
+        """Check the hedge budget and reserve a hedge if there is room."""
+        now = time.monotonic()
+        while self._recent_hedges and now - self._recent_hedges[0] > 60:
+            self._recent_hedges.popleft()
+        
+        if len(self._recent_hedges) >= self.max_per_minute:
+            return False
+        if self.stats["hedges"] + 1 > self.stats["requests"] * self.max_ratio:
+            return False
+        
+        self._recent_hedges.append(now)
+        return True
@@ -0,0 +1,260 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar, Union
+
+import openai
+from config.settings import settings
+from src.utils.token_counter import count_message_tokens
+
+T = TypeVar("T")
+
+class Priority(IntEnum):
+    """Scheduling classes for LLM calls; lower values go first."""
+    INTERACTIVE = 0
+    PERSONALITY = 1
+    BACKGROUND = 2
+
+class PriorityHandle:
+    """A priority that can be raised later with LLMScheduler.promote(), for background work a user may end up waiting on."""
+    
+    def __init__(self, priority: Priority):
+        self.priority = priority
+
+# Priority of LLM calls made from the current task. Background loops set this
+# once at the top, and tasks they create inherit it.
+llm_priority: ContextVar[Union[Priority, PriorityHandle]] = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+def estimate_tokens(messages: List[Dict], max_tokens: int) -> int:
+    """Worst-case tokens for a request: the prompt plus the full completion."""
+    return count_message_tokens(messages) + max_tokens
+
+class LLMScheduler:
+    """
+    Central gate every OpenAI call goes through.
+    
+    Calls wait in a priority queue for one of LLM_MAX_CONCURRENCY slots;
+    LLM_INTERACTIVE_RESERVE of them are kept free from background work so a
+    user never queues behind a pool refill. Estimated tokens are charged
+    against a rolling per-minute budget and corrected with the real usage
+    once a response arrives. Rate limits, server errors and connection
+    failures are retried with exponential backoff and full jitter, waiting
+    at least as long as the server's Retry-After asks.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger('TriviaBot.LLMScheduler')
+        self.max_concurrency = settings.LLM_MAX_CONCURRENCY
+        self.interactive_reserve = min(settings.LLM_INTERACTIVE_RESERVE, self.max_concurrency - 1)
+        self.tokens_per_minute = settings.LLM_TOKENS_PER_MINUTE
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.backoff_base = settings.LLM_BACKOFF_BASE
+        self.backoff_max = settings.LLM_BACKOFF_MAX
+        
+        self.active = 0
+        self._queue: List[tuple] = []  # (priority, sequence, future, tokens, handle)
+        self._sequence = itertools.count()
+        self._token_window: Deque[List[float]] = deque()  # [timestamp, tokens]
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "tokens": 0}
+        
+        # Called as listener(model, usage) for every completed call that reported usage
+        self.usage_listeners: List[Callable] = []
+    
+    async def run(
+        self,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        priority: Union[Priority, PriorityHandle, None] = None,
+        stream: bool = False
+    ) -> T:
+        """
+        Run an LLM request under the scheduler, retrying transient failures.
+        
+        Args:
+            request: Factory starting a fresh attempt each time it is called
+            estimated_tokens: Prompt plus max completion tokens, charged until usage is known
+            priority: Defaults to the calling task's llm_priority; a handle is read on every attempt
+            stream: The request returns a stream; its slot is held until the stream is closed
+        """
+        priority = llm_priority.get() if priority is None else priority
+        self.stats["calls"] += 1
+        
+        for attempt in itertools.count():
+            entry = await self._acquire(priority, estimated_tokens)
+            try:
+                result = await request()
+            except Exception as e:
+                self._release(entry)
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                self.stats["retries"] += 1
+                self.logger.warning(f"LLM call failed ({e}); retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._release(entry)
+                raise
+            
+            if stream:
+                return ScheduledStream(result, lambda model, usage: self._release(entry, usage, model))
+            self._release(entry, getattr(result, "usage", None), getattr(result, "model", None))
+            return result
+    
+    def promote(self, handle: PriorityHandle, priority: Priority = Priority.INTERACTIVE):
+        """Raise a handle to `priority`, including calls made under it that are already queued."""
+        if priority >= handle.priority:
+            return
+        handle.priority = priority
+        self._queue = [
+            (int(priority),) + entry[1:] if entry[4] is handle else entry
+            for entry in self._queue
+        ]
+        heapq.heapify(self._queue)
+        self._dispatch()
+    
+    def get_stats(self) -> Dict[str, object]:
+        """Get call counters, current load and tokens spent in the last minute."""
+        self._expire_tokens()
+        stats = dict(self.stats)
+        stats["active"] = self.active
+        stats["queued"] = {p.name.lower(): 0 for p in Priority}
+        for priority, _, future, _, _ in self._queue:
+            if not future.done():
+                stats["queued"][Priority(priority).name.lower()] += 1
+        stats["tokens_last_minute"] = int(sum(tokens for _, tokens in self._token_window))
+        return stats
+    
+    async def _acquire(self, priority: Union[Priority, PriorityHandle], tokens: int) -> List[float]:
+        """Wait for a slot and token budget; returns the token window entry charged."""
+        handle = priority if isinstance(priority, PriorityHandle) else None
+        level = handle.priority if handle else priority
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (int(level), next(self._sequence), future, tokens, handle))
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled; hand the slot back
+                self._release(future.result())
+            raise
+    
+    def _release(self, entry: List[float], usage=None, model: Optional[str] = None):
+        self.active -= 1
+        if usage is not None and getattr(usage, "total_tokens", None) is not None:
+            entry[1] = usage.total_tokens
+            for listener in self.usage_listeners:
+                try:
+                    listener(model, usage)
+                except Exception as e:
+                    self.logger.warning(f"Usage listener failed: {e}")
+        self.stats["tokens"] += int(entry[1])
+        self._dispatch()
+    
+    def _dispatch(self):
+        """Grant slots to the highest-priority waiters the limits allow."""
+        self._expire_tokens()
+        while self._queue:
+            priority, _, future, tokens, _ = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)  # cancelled while waiting
+                continue
+            
+            limit = self.max_concurrency
+            if priority == Priority.BACKGROUND:
+                limit -= self.interactive_reserve
+            if self.active >= limit:
+                return
+            
+            if self.tokens_per_minute and self._token_window:
+                used = sum(spent for _, spent in self._token_window)
+                if used + tokens > self.tokens_per_minute:
+                    self._schedule_wakeup()
+                    return
+            
+            heapq.heappop(self._queue)
+            self.active += 1
+            entry = [time.monotonic(), tokens]
+            self._token_window.append(entry)
+            future.set_result(entry)
+    
+    def _expire_tokens(self):
+        cutoff = time.monotonic() - 60
+        while self._token_window and self._token_window[0][0] <= cutoff:
+            self._token_window.popleft()
+    
+    def _schedule_wakeup(self):
+        """Dispatch again once the oldest token charge leaves the window."""
+        if self._wakeup is not None:
+            return
+        delay = max(0.0, self._token_window[0][0] + 60 - time.monotonic())
+        
+        def wakeup():
+            self._wakeup = None
+            self._dispatch()
+        
+        self._wakeup = asyncio.get_running_loop().call_later(delay + 0.01, wakeup)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the error isn't worth retrying."""
+        if attempt >= self.max_retries:
+            return None
+        
+        retry_after = None
+        if isinstance(error, openai.RateLimitError):
+            self.stats["rate_limited"] += 1
+            retry_after = self._retry_after(error)
+        elif isinstance(error, openai.APIStatusError):
+            if error.status_code < 500 and error.status_code not in (408, 409):
+                return None
+            retry_after = self._retry_after(error)
+        elif not isinstance(error, openai.APIConnectionError):
+            return None
+        
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after) if retry_after is not None else delay
+    
+    def _retry_after(self, error: openai.APIStatusError) -> Optional[float]:
+        headers = error.response.headers if getattr(error, "response", None) is not None else {}
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            pass  # HTTP-date form; fall back to our own backoff
+        return None
+
+class ScheduledStream:
+    """A completion stream that keeps its scheduler slot until it's closed."""
+    
+    def __init__(self, stream, on_close: Callable):
+        self.stream = stream
+        self.on_close = on_close
+        self._model = None
+        self._usage = None
+        self._closed = False
+    
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            self._model = getattr(chunk, "model", None) or self._model
+            if getattr(chunk, "usage", None) is not None:
+                self._usage = chunk.usage
+            yield chunk
+    
+    async def close(self):
+        if not self._closed:
+            self._closed = True
+            self.on_close(self._model, self._usage)
+        await self.stream.close()
+
+# Global scheduler instance shared by every LLM caller
+llm_scheduler = LLMScheduler()
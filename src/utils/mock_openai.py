@@ -0,0 +1,296 @@
+"""
+Local stand-in for the OpenAI chat completions API, for offline load tests and benchmarks.
+
+Point the bot at it with OPENAI_BASE_URL=http://127.0.0.1:8100/v1 and run:
+
+    python -m src.utils.mock_openai --latency lognormal:0.8:0.4 --error-rate 0.02
+
+Trivia prompts get canned, valid question JSON (a single object or an array,
+whichever the prompt asks for); everything else gets a short persona-style
+line. Latency, server errors, rate limits, hangs and malformed JSON can all be
+injected, and a fixed --seed makes a run reproducible.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+import uuid
+from typing import Dict, List
+
+from aiohttp import web
+
+# Made-up words so canned questions never look like near-duplicates of each other
+SYLLABLES = ["ka", "lo", "mi", "ven", "tor", "sa", "ri", "bel", "zu", "ne", "dar", "phi", "mon", "qua", "les", "tiv"]
+
+QUESTION_TEMPLATES = [
+    "Which {a} first described the {b} of {c} {d}?",
+    "In which {a} was the {b} {c} discovered by {d}?",
+    "What {a} connects the {b} {c} to {d}?",
+    "Who introduced the {a} {b} during the {c} {d}?"
+]
+
+PERSONA_LINES = [
+    "Well, that was certainly an answer.",
+    "Bold choice. Wrong, but bold.",
+    "Even a broken clock gets trivia right twice a day.",
+    "I'm almost impressed. Almost."
+]
+
+class LatencyModel:
+    """
+    Samples response latencies from a distribution spec.
+    
+    Specs: "fixed:S", "uniform:LOW:HIGH", "exponential:MEAN" and
+    "lognormal:MEDIAN:SIGMA", all in seconds.
+    """
+    
+    def __init__(self, spec: str, rng: random.Random):
+        self.spec = spec
+        self.rng = rng
+        name, *params = spec.split(":")
+        self.name = name
+        self.params = [float(p) for p in params]
+        
+        expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+        if expected.get(name) != len(self.params):
+            raise ValueError(f"Invalid latency spec: {spec}")
+    
+    def sample(self) -> float:
+        if self.name == "fixed":
+            return self.params[0]
+        if self.name == "uniform":
+            return self.rng.uniform(*self.params)
+        if self.name == "exponential":
+            return self.rng.expovariate(1 / self.params[0])
+        median, sigma = self.params
+        return median * self.rng.lognormvariate(0, sigma)
+
+class MockOpenAIServer:
+    """Serves /v1/chat/completions with configurable latency and failure injection."""
+    
+    def __init__(self, args: argparse.Namespace):
+        self.logger = logging.getLogger('TriviaBot.MockOpenAI')
+        self.rng = random.Random(args.seed)
+        self.latency = LatencyModel(args.latency, self.rng)
+        self.args = args
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0, "hangs": 0, "invalid": 0}
+    
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_get("/stats", self.get_stats)
+        return app
+    
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+    
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.stats["requests"] += 1
+        roll = self.rng.random()
+        
+        # Each failure mode gets its own slice of [0, 1)
+        if roll < self.args.error_rate:
+            self.stats["errors"] += 1
+            await asyncio.sleep(self.latency.sample() / 2)
+            return self._error(500, "server_error", "The server had an error while processing your request.")
+        roll -= self.args.error_rate
+        
+        if roll < self.args.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return self._error(
+                429, "rate_limit_exceeded", "Rate limit reached.",
+                headers={"Retry-After": str(self.args.retry_after)}
+            )
+        roll -= self.args.rate_limit_rate
+        
+        if roll < self.args.hang_rate:
+            self.stats["hangs"] += 1
+            await asyncio.sleep(self.args.hang_seconds)
+            return self._error(504, "timeout", "Upstream timed out.")
+        roll -= self.args.hang_rate
+        
+        invalid = roll < self.args.invalid_rate
+        if invalid:
+            self.stats["invalid"] += 1
+        
+        content = self._content(body.get("messages", []), invalid, body.get("response_format"))
+        model = body.get("model", "gpt-3.5-turbo")
+        latency = self.latency.sample()
+        self.stats["ok"] += 1
+        
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return await self._stream(request, model, content, latency, include_usage)
+        
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": self._usage(body.get("messages", []), content)
+        })
+    
+    async def _stream(
+        self,
+        request: web.Request,
+        model: str,
+        content: str,
+        latency: float,
+        include_usage: bool
+    ) -> web.StreamResponse:
+        """Send the content as server-sent events, spreading the latency across chunks."""
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        pieces = [content[i:i + self.args.chunk_size] for i in range(0, len(content), self.args.chunk_size)]
+        # Time to first token, then an even trickle for the rest
+        await asyncio.sleep(latency * self.args.first_token_share)
+        delay = latency * (1 - self.args.first_token_share) / max(1, len(pieces))
+        
+        for piece in pieces:
+            await self._send_event(response, self._chunk(completion_id, model, [{
+                "index": 0, "delta": {"content": piece}, "finish_reason": None
+            }]))
+            await asyncio.sleep(delay)
+        
+        await self._send_event(response, self._chunk(completion_id, model, [{
+            "index": 0, "delta": {}, "finish_reason": "stop"
+        }]))
+        if include_usage:
+            chunk = self._chunk(completion_id, model, [])
+            chunk["usage"] = self._usage([], content)
+            await self._send_event(response, chunk)
+        
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+    
+    async def _send_event(self, response: web.StreamResponse, data: Dict):
+        await response.write(f"data: {json.dumps(data)}\n\n".encode("utf-8"))
+    
+    def _chunk(self, completion_id: str, model: str, choices: List[Dict]) -> Dict:
+        return {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices
+        }
+    
+    def _usage(self, messages: List[Dict], content: str) -> Dict[str, int]:
+        """Rough token counts at ~4 characters per token."""
+        prompt_tokens = sum(len(message.get("content", "")) for message in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    
+    def _error(self, status: int, code: str, message: str, headers: Dict[str, str] = None) -> web.Response:
+        return web.json_response(
+            {"error": {"message": message, "type": code, "code": code}},
+            status=status,
+            headers=headers
+        )
+    
+    def _content(self, messages: List[Dict], invalid: bool, response_format: Dict = None) -> str:
+        """Build the completion text for a request."""
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        prompt = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        
+        if "explain trivia answers" in system:
+            return self._explanation()
+        if "trivia question generator" not in system:
+            return self.rng.choice(PERSONA_LINES)
+        
+        # Deferred-explanation prompts leave the field out
+        explain = "explanation" in system + prompt
+        count_match = re.search(r"JSON array with exactly (\d+) objects", prompt)
+        if count_match:
+            payload = [self._question(explain) for _ in range(int(count_match.group(1)))]
+        else:
+            payload = self._question(explain)
+        
+        if invalid:
+            return self._corrupt(payload)
+        if response_format:
+            # JSON modes need an object at the root and never add fences
+            if isinstance(payload, list):
+                payload = {"questions": payload}
+            return json.dumps(payload)
+        return "```json\n" + json.dumps(payload, indent=2) + "\n```"
+    
+    def _question(self, explain: bool = True) -> Dict:
+        """A well-formed, unique-looking trivia question."""
+        words = {slot: self._word() for slot in "abcd"}
+        options = {letter: self._word().title() for letter in "ABCD"}
+        question = {
+            "question": self.rng.choice(QUESTION_TEMPLATES).format(**words),
+            "options": options,
+            "correct_answer": self.rng.choice("ABCD")
+        }
+        if explain:
+            question["explanation"] = self._explanation()
+        return question
+    
+    def _explanation(self) -> str:
+        return f"The {self._word()} {self._word()} records of {self._word()} settle it."
+    
+    def _word(self) -> str:
+        return "".join(self.rng.choice(SYLLABLES) for _ in range(self.rng.randint(2, 4)))
+    
+    def _corrupt(self, payload) -> str:
+        """Produce one of the ways real completions go wrong."""
+        text = json.dumps(payload, indent=2)
+        mode = self.rng.choice(["truncated", "missing_field", "prose", "trailing_comma", "smart_quotes"])
+        if mode == "truncated":
+            return text[:self.rng.randint(1, max(1, len(text) - 1))]
+        if mode == "missing_field":
+            items = payload if isinstance(payload, list) else [payload]
+            for item in items:
+                item.pop("correct_answer", None)
+            return json.dumps(payload)
+        if mode == "trailing_comma":
+            return text.replace('"\n', '",\n')
+        if mode == "smart_quotes":
+            return text.replace('": "', '": “').replace('",', '”,')
+        return "Sure! Here is a great trivia question for you:\n" + text.replace('"', "'")
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local mock of the OpenAI chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible runs")
+    parser.add_argument("--latency", default="lognormal:0.8:0.4",
+                        help="fixed:S | uniform:LOW:HIGH | exponential:MEAN | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--first-token-share", type=float, default=0.2,
+                        help="share of the latency spent before the first streamed chunk")
+    parser.add_argument("--chunk-size", type=int, default=12, help="characters per streamed chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests failing with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="share of requests that hang")
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="share of completions with broken JSON")
+    return parser.parse_args(argv)
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    server = MockOpenAIServer(args)
+    web.run_app(server.create_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import logging
+import random
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+from config.settings import settings
+
+# Request classes a model is chosen for: question difficulties plus persona lines
+ROUTES = ["easy", "medium", "hard", "persona"]
+
+class ModelProfile:
+    """Rolling latency and validation pass rate of one model on one route."""
+    
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.passes: Deque[bool] = deque(maxlen=window)
+    
+    def latency(self, p: float) -> Optional[float]:
+        """Latency below which p percent of recent calls finished."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+    
+    @property
+    def pass_rate(self) -> Optional[float]:
+        return sum(self.passes) / len(self.passes) if self.passes else None
+
+class ModelRouter:
+    """
+    Picks the model for each OpenAI call from live latency and quality profiles.
+    
+    Every model in LLM_MODELS is profiled per route (difficulty or persona):
+    call latency, and the share of its questions passing validation. Easy,
+    medium and persona requests go to the fastest model whose pass rate is at
+    least MODEL_MIN_PASS_RATE. Hard questions go to the model with the best
+    pass rate among those whose p90 latency fits MODEL_LATENCY_BUDGET. A model
+    needs MODEL_MIN_SAMPLES on a route before it is considered; the others get
+    MODEL_EXPLORE_RATE of each route's requests so their profiles fill in and
+    stay current. MODEL_ROUTES pins routes to a model, bypassing all of this.
+    """
+    
+    def __init__(self):
+        self.logger = logging.getLogger('TriviaBot.ModelRouter')
+        self.models = [model.strip() for model in settings.LLM_MODELS.split(",") if model.strip()]
+        self.default_model = self.models[0]
+        self.overrides = self._parse_overrides(settings.MODEL_ROUTES)
+        self.latency_budget = settings.MODEL_LATENCY_BUDGET
+        self.min_pass_rate = settings.MODEL_MIN_PASS_RATE
+        self.min_samples = settings.MODEL_MIN_SAMPLES
+        self.explore_rate = settings.MODEL_EXPLORE_RATE
+        self.window = settings.MODEL_PROFILE_WINDOW
+        
+        self.profiles: Dict[Tuple[str, str], ModelProfile] = {}
+        self.decisions: Dict[str, str] = {}
+    
+    def choose(self, route: str) -> str:
+        """Model to use for a request on a route."""
+        route = route if route in ROUTES else "medium"
+        if route in self.overrides:
+            return self.overrides[route]
+        
+        model, _ = self._decide(route)
+        # Keep the other models' profiles current, or build them in the first place
+        others = [m for m in self.models if m != model]
+        if others and random.random() < self.explore_rate:
+            return random.choice(others)
+        
+        if self.decisions.get(route) != model:
+            self.logger.info(f"Routing {route} requests to {model}")
+            self.decisions[route] = model
+        return model
+    
+    def record_latency(self, model: str, route: str, seconds: float):
+        """Record how long a successful call took."""
+        self._profile(model, route).latencies.append(seconds)
+    
+    def record_validation(self, model: str, route: str, passed: bool):
+        """Record whether a response from the model was usable."""
+        self._profile(model, route).passes.append(passed)
+    
+    def get_table(self) -> Dict[str, Dict]:
+        """The current routing decision for every route, with the profiles behind it."""
+        table = {}
+        for route in ROUTES:
+            if route in self.overrides:
+                model, reason = self.overrides[route], "override"
+            else:
+                model, reason = self._decide(route)
+            profiles = {}
+            for candidate in self.models:
+                profile = self.profiles.get((candidate, route))
+                profiles[candidate] = {
+                    "samples": len(profile.latencies) if profile else 0,
+                    "p50": profile.latency(50) if profile else None,
+                    "p90": profile.latency(90) if profile else None,
+                    "pass_rate": profile.pass_rate if profile else None
+                }
+            table[route] = {"model": model, "reason": reason, "profiles": profiles}
+        return table
+    
+    def _decide(self, route: str) -> Tuple[str, str]:
+        """Best model for a route from the profiles so far. Returns (model, reason)."""
+        profiled = [m for m in self.models if self._profiled(m, route)]
+        if not profiled:
+            return self.default_model, "default"
+        
+        if route == "hard":
+            in_budget = [m for m in profiled if self._profile(m, route).latency(90) <= self.latency_budget]
+            candidates = in_budget or profiled
+            best = max(candidates, key=lambda m: (self._profile(m, route).pass_rate, -self._profile(m, route).latency(50)))
+            return best, "best pass rate within budget" if in_budget else "best pass rate, none within budget"
+        
+        acceptable = [m for m in profiled if self._profile(m, route).pass_rate >= self.min_pass_rate]
+        candidates = acceptable or profiled
+        fastest = min(candidates, key=lambda m: self._profile(m, route).latency(50))
+        return fastest, "fastest acceptable" if acceptable else "fastest, none acceptable"
+    
+    def _profiled(self, model: str, route: str) -> bool:
+        profile = self.profiles.get((model, route))
+        return (
+            profile is not None
+            and len(profile.latencies) >= self.min_samples
+            and len(profile.passes) >= self.min_samples
+        )
+    
+    def _profile(self, model: str, route: str) -> ModelProfile:
+        key = (model, route)
+        if key not in self.profiles:
+            self.profiles[key] = ModelProfile(self.window)
+        return self.profiles[key]
+    
+    def _parse_overrides(self, spec: str) -> Dict[str, str]:
+        """Parse "route=model,route=model" into a dict, skipping unknown routes."""
+        overrides = {}
+        for entry in filter(None, (part.strip() for part in spec.split(","))):
+            route, _, model = entry.partition("=")
+            route, model = route.strip().lower(), model.strip()
+            if route not in ROUTES or not model:
+                self.logger.warning(f"Ignoring invalid MODEL_ROUTES entry: {entry}")
+                continue
+            overrides[route] = model
+        return overrides
+
+# Global model router shared by trivia generation and persona lines
+model_router = ModelRouter()
@@ -0,0 +1,38 @@
+import openai
+from config.settings import settings
+from src.utils.cassette import CassetteClient
+
+def create_openai_client() -> openai.AsyncOpenAI:
+    """
+    Create the AsyncOpenAI client shared by every LLM caller.
+    
+    All requests go through one keep-alive connection pool, so concurrent
+    calls reuse TLS connections and never hold an executor thread.
+    
+    Limits and timeouts are built from the SDK's own HTTP types: newer SDKs
+    ship their own httpx fork and reject objects from the standalone package.
+    """
+    Limits = type(openai.DEFAULT_CONNECTION_LIMITS)
+    http_client = openai.DefaultAsyncHttpxClient(
+        limits=Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY
+        )
+    )
+    
+    client = openai.AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        http_client=http_client,
+        timeout=openai.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+        max_retries=settings.OPENAI_MAX_RETRIES
+    )
+    
+    # Record or replay every completion for development and regression benchmarks
+    if settings.LLM_CASSETTE_MODE in ("record", "replay"):
+        return CassetteClient(client, settings.LLM_CASSETTE_PATH, settings.LLM_CASSETTE_MODE)
+    return client
+
+# Global shared OpenAI client instance
+openai_client = create_openai_client()
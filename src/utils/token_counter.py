@@ -0,0 +1,42 @@
+import logging
+from functools import lru_cache
+from typing import Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # optional; counts fall back to an approximation
+    tiktoken = None
+
+logger = logging.getLogger('TriviaBot.TokenCounter')
+
+# Chat formatting overhead per message and per reply, as documented for OpenAI chat models
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None if tiktoken or its data isn't available."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use; offline hosts approximate instead
+        logger.warning(f"tiktoken unavailable, approximating token counts: {e}")
+        return None
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Tokens in a piece of text: exact with tiktoken installed, otherwise ~4 characters per token."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = "gpt-3.5-turbo") -> int:
+    """Prompt tokens a list of chat messages will be billed as."""
+    return TOKENS_PER_REPLY + sum(
+        TOKENS_PER_MESSAGE + count_tokens(message.get("content") or "", model) for message in messages
+    )
@@ -0,0 +1,34 @@
+import asyncio
+import importlib
+import os
+
+import pytest
+
+# Importing the generator builds the OpenAI client and database engine from
+# settings; no test talks to either, so placeholders are enough.
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+# Modules holding their own reference to the shared db_manager
+DATABASE_USERS = [
+    "src.trivia.budget",
+    "src.trivia.demand",
+    "src.trivia.generator",
+    "src.trivia.importer",
+    "src.trivia.seen",
+    "src.trivia.worker"
+]
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh SQLite file database standing in for db_manager everywhere."""
+    from config.settings import settings
+    from src.database.database import DatabaseManager
+    
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'trivia.db'}")
+    manager = DatabaseManager()
+    asyncio.run(manager.create_tables())
+    for name in DATABASE_USERS:
+        monkeypatch.setattr(importlib.import_module(name), "db_manager", manager)
+    yield manager
+    manager.engine.dispose()
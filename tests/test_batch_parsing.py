@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from src.trivia.generator import trivia_generator
+
+def item(question, correct="B", **overrides):
+    data = {
+        "question": question,
+        "options": {"A": "Venus", "B": "Mars", "C": "Jupiter", "D": "Saturn"},
+        "correct_answer": correct,
+        "explanation": "Iron oxide makes its surface red."
+    }
+    data.update(overrides)
+    return data
+
+def parse(response):
+    return trivia_generator._parse_batch_response(response, "Astronomy", "easy", "any", "test-model")
+
+def test_valid_items_survive_a_malformed_one():
+    broken = item("Which planet has the most moons?")
+    del broken["options"]
+    response = json.dumps([item("Which planet is known as the Red Planet?"), broken, item("Which planet is the hottest?", "A")])
+    
+    questions = parse(response)
+    
+    assert [q.question for q in questions] == ["Which planet is known as the Red Planet?", "Which planet is the hottest?"]
+    assert questions[1].correct_answer == "A"
+    assert questions[0].options == ["Venus", "Mars", "Jupiter", "Saturn"]
+    assert questions[0].era is None
+
+def test_repeats_within_a_batch_are_dropped():
+    response = json.dumps([item("Which planet is red?"), item("  which planet is RED?  ")])
+    assert len(parse(response)) == 1
+
+def test_object_wrapping_the_array():
+    response = json.dumps({"questions": [item("Which planet is red?"), item("Which planet is largest?", "C")]})
+    assert len(parse(response)) == 2
+
+def test_truncated_batch_keeps_complete_items():
+    full = json.dumps([item("Which planet is red?"), item("Which planet is largest?", "C")])
+    truncated = full[:full.index("largest") + 3]
+    
+    questions = parse("```json\n" + truncated)
+    
+    assert [q.question for q in questions] == ["Which planet is red?"]
+
+@pytest.mark.parametrize("response", ["", "no json here", "[]", '"just a string"'])
+def test_unusable_responses_give_no_questions(response):
+    assert parse(response) == []
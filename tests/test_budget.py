@@ -0,0 +1,104 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from config.settings import settings
+from src.trivia.budget import GenerationBudget, TokenBucket, estimate_cost, usage_guild
+from src.trivia.generator import TriviaGenerator, TriviaQuestion
+from src.trivia.seen import SeenFilter
+
+def usage(total):
+    return SimpleNamespace(total_tokens=total, prompt_tokens=total // 2, completion_tokens=total - total // 2)
+
+def test_bucket_refills_up_to_capacity_and_may_overdraw():
+    bucket = TokenBucket(capacity=2, rate=1000)
+    bucket.spend(5)
+    assert bucket.level < 0
+    bucket.updated -= 1
+    assert bucket.refill() == 2
+
+def test_user_budget_allows_a_burst_then_limits():
+    budget = GenerationBudget()
+    for _ in range(budget.user_burst):
+        assert budget.try_spend(1, None)
+
+    assert not budget.try_spend(1, None)
+    assert budget.try_spend(2, None)
+    assert budget.get_stats()["user_limited"] == 1
+
+def test_allows_does_not_spend_until_charged():
+    budget = GenerationBudget()
+    for _ in range(budget.user_burst * 2):
+        assert budget.allows(1, None)
+
+    for _ in range(budget.user_burst):
+        budget.charge(1)
+    assert not budget.allows(1, None)
+
+def test_guild_is_limited_once_its_tokens_are_spent():
+    budget = GenerationBudget()
+
+    async def spend():
+        usage_guild.set(7)
+        budget.record_usage("gpt-3.5-turbo", usage(budget.guild_burst + 1000))
+
+    asyncio.run(spend())
+
+    assert not budget.try_spend(1, 7)
+    assert budget.try_spend(1, 8)
+    assert [(guild, model) for guild, _, model in budget._pending] == [("7", "gpt-3.5-turbo")]
+
+def test_disabled_budget_allows_everything(monkeypatch):
+    monkeypatch.setattr(settings, "BUDGET_ENABLED", False)
+    budget = GenerationBudget()
+    assert all(budget.try_spend(1, 7) for _ in range(budget.user_burst * 2))
+
+def test_cost_uses_the_longest_matching_model_prefix():
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1000, 1000) == pytest.approx(0.00075)
+    assert estimate_cost("gpt-4o", 1000, 0) == pytest.approx(0.0025)
+    assert estimate_cost("some-other-model", 1000, 0) == pytest.approx(0.0005)
+
+def test_prefetch_charges_the_user_only_when_claimed(monkeypatch):
+    monkeypatch.setattr(settings, "QUESTION_BANK_ENABLED", False)
+    generator = TriviaGenerator()
+    generator.seen_questions.filters[1] = SeenFilter()
+    key = ("custom topic", "easy", "any")
+    billed_guilds = []
+
+    async def generate_shared(*key):
+        billed_guilds.append(usage_guild.get())
+        return TriviaQuestion("Which topic is this about?", ["A1", "B22", "C333", "D4444"], "A", key[0], "easy")
+
+    generator._generate_shared = generate_shared
+    bucket = generator.budget._user_bucket(1)
+
+    async def run():
+        usage_guild.set(7)
+        generator.prefetcher.record_request(1, key)
+        generator.prefetcher.schedule(1)
+        await generator.prefetcher.pending[1][1]
+        before_claim = bucket.refill()
+
+        question = await generator.prefetcher.claim(1, key)
+        return question, before_claim
+
+    question, before_claim = asyncio.run(run())
+
+    assert question is not None
+    assert before_claim == generator.budget.user_burst
+    assert bucket.refill() == pytest.approx(generator.budget.user_burst - 1, abs=0.01)
+    assert billed_guilds == [None]
+
+def test_failed_live_generation_is_refunded(monkeypatch):
+    monkeypatch.setattr(settings, "QUESTION_BANK_ENABLED", False)
+    generator = TriviaGenerator()
+
+    async def generate_shared(*key):
+        raise ConnectionError("upstream down")
+
+    generator._generate_shared = generate_shared
+    question, source = asyncio.run(generator._find_question(None, "history", "easy", "any", user_id=1, guild_id=7))
+
+    assert source == "degraded"
+    assert generator.budget._user_bucket(1).refill() == pytest.approx(generator.budget.user_burst)
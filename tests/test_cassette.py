@@ -0,0 +1,115 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from src.utils.cassette import CassetteClient, CassetteMissError
+
+REQUEST = {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": "Ask me something"}], "temperature": 0.7}
+
+def completion(content):
+    return ChatCompletion.model_validate({
+        "id": "c", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]
+    })
+
+def chunk(content):
+    return ChatCompletionChunk.model_validate({
+        "id": "c", "object": "chat.completion.chunk", "created": 0, "model": "gpt-3.5-turbo",
+        "choices": [{"index": 0, "delta": {"content": content}}]
+    })
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+    
+    async def __aiter__(self):
+        for c in self.chunks:
+            yield c
+    
+    async def close(self):
+        pass
+
+def upstream(*responses):
+    responses = list(responses)
+    
+    async def create(**params):
+        return responses.pop(0)
+    
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+def record(path, requests, responses):
+    cassette = CassetteClient(upstream(*responses), str(path), "record")
+    
+    async def run():
+        for request in requests:
+            response = await cassette.create(**request)
+            if request.get("stream"):
+                [c async for c in response]
+    
+    asyncio.run(run())
+    cassette._file.close()
+
+def replay(path, request):
+    cassette = CassetteClient(None, str(path), "replay")
+    return cassette, asyncio.run(cassette.create(**request))
+
+def test_replay_serves_recorded_responses_in_turn(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    record(path, [REQUEST, REQUEST], [completion("first"), completion("second")])
+    
+    cassette = CassetteClient(None, str(path), "replay")
+    
+    async def run():
+        return [(await cassette.create(**REQUEST)).choices[0].message.content for _ in range(3)]
+    
+    assert asyncio.run(run()) == ["first", "second", "first"]
+    assert cassette.get_stats()["hits"] == 3
+
+def test_unrecorded_request_misses(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    record(path, [REQUEST], [completion("first")])
+    
+    with pytest.raises(CassetteMissError):
+        replay(path, dict(REQUEST, temperature=0.2))
+
+def test_transport_options_do_not_change_the_key():
+    cassette = CassetteClient(None, "unused.jsonl", "off")
+    assert cassette.request_key(REQUEST) == cassette.request_key(dict(REQUEST, stream_options={"include_usage": True}))
+    assert cassette.request_key(REQUEST) != cassette.request_key(dict(REQUEST, model="gpt-4o"))
+
+def test_streams_replay_chunk_by_chunk(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    request = dict(REQUEST, stream=True)
+    record(path, [request], [FakeStream([chunk("Hel"), chunk("lo")])])
+    
+    _, stream = replay(path, request)
+    
+    async def read():
+        return [c.choices[0].delta.content async for c in stream]
+    
+    assert asyncio.run(read()) == ["Hel", "lo"]
+
+def test_abandoned_stream_is_not_recorded(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    cassette = CassetteClient(upstream(FakeStream([chunk("Hel"), chunk("lo")])), str(path), "record")
+    
+    async def run():
+        stream = await cassette.create(**dict(REQUEST, stream=True))
+        async for _ in stream:
+            break
+    
+    asyncio.run(run())
+    assert cassette.get_stats()["recorded"] == 0
+
+def test_corrupt_lines_are_skipped(tmp_path):
+    path = tmp_path / "llm.jsonl"
+    record(path, [REQUEST], [completion("first")])
+    with open(path, "a") as cassette_file:
+        cassette_file.write("{not json\n")
+    
+    cassette, response = replay(path, REQUEST)
+    
+    assert response.choices[0].message.content == "first"
+    assert cassette.get_stats()["entries"] == 1
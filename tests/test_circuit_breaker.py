@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from config.settings import settings
+from src.trivia.generator import TriviaGenerator
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+async def ok():
+    return "ok"
+
+async def fail():
+    raise ConnectionError("upstream down")
+
+def call(breaker, request):
+    return asyncio.run(breaker.call(request))
+
+def trip(breaker):
+    for _ in range(breaker.min_calls):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+
+def test_opens_once_the_failure_rate_is_reached():
+    breaker = CircuitBreaker("test")
+    trip(breaker)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.available()
+    with pytest.raises(CircuitOpenError):
+        call(breaker, ok)
+    assert breaker.get_stats()["rejected"] == 1
+
+def test_stays_closed_below_min_calls():
+    breaker = CircuitBreaker("test")
+    for _ in range(breaker.min_calls - 1):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test")
+    trip(breaker)
+    breaker.cooldown = 0
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+    assert breaker._state == CircuitBreaker.OPEN
+
+    assert call(breaker, ok) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("test")
+    breaker.slow_call_seconds = -1
+    for _ in range(breaker.min_calls):
+        call(breaker, ok)
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_failed_live_generation_serves_a_degraded_question(monkeypatch):
+    monkeypatch.setattr(settings, "QUESTION_BANK_ENABLED", False)
+    generator = TriviaGenerator()
+    single_calls = []
+
+    async def generate_questions(*args, **kwargs):
+        raise ConnectionError("upstream down")
+
+    async def generate_single(*args):
+        single_calls.append(args)
+
+    generator.generate_questions = generate_questions
+    generator._generate_single = generate_single
+
+    question, source = asyncio.run(generator._find_question(None, "history", "easy", "any"))
+
+    assert source == "degraded"
+    assert question.difficulty == "easy"
+    assert single_calls == []
@@ -0,0 +1,107 @@
+import os
+import random
+import struct
+
+import pytest
+
+from src.trivia.build_corpus import FingerprintSet
+from src.trivia.corpus import MAGIC, CorpusWriter, FallbackCorpus
+
+OPTIONS = ["Venus", "Mars", "Jupiter", "Saturn"]
+
+def build(path, questions):
+    writer = CorpusWriter(str(path))
+    for category, difficulty, text in questions:
+        writer.add(category, difficulty, text, OPTIONS, "B", f"Because {text}", f"{category} topic")
+    writer.finish()
+    return FallbackCorpus(str(path))
+
+@pytest.fixture
+def corpus(tmp_path):
+    questions = [("Science", "easy", f"Science easy {i}") for i in range(5)]
+    questions += [("History", "easy", "History easy 0"), ("History", "hard", "History hard 0")]
+    corpus = build(tmp_path / "corpus.bin", questions)
+    yield corpus
+    corpus.close()
+
+def test_write_then_pick_round_trip(corpus):
+    picked = corpus.pick("History", "hard")
+    
+    assert picked == {
+        "question": "History hard 0",
+        "options": OPTIONS,
+        "correct_answer": "B",
+        "explanation": "Because History hard 0",
+        "category": "History topic",
+        "difficulty": "hard"
+    }
+    assert len(corpus) == 7
+    assert set(corpus.keys) == {("science", "easy"), ("history", "easy"), ("history", "hard")}
+
+def test_pick_covers_every_question_in_a_key(corpus):
+    rng = random.Random(0)
+    picked = {corpus.pick("science", "easy", rng)["question"] for _ in range(200)}
+    assert picked == {f"Science easy {i}" for i in range(5)}
+
+def test_unknown_category_falls_back_to_the_difficulty(corpus):
+    rng = random.Random(0)
+    picks = [corpus.pick(category, "easy", rng) for category in [None, "Geography"] * 50]
+    
+    assert {pick["difficulty"] for pick in picks} == {"easy"}
+    assert {pick["category"] for pick in picks} == {"Science topic", "History topic"}
+
+def test_unknown_difficulty_falls_back_to_any_question(corpus):
+    assert corpus.pick("science", "medium")["question"] in {
+        "History hard 0", "History easy 0", *(f"Science easy {i}" for i in range(5))
+    }
+
+def test_unicode_and_long_text(tmp_path):
+    text = "Which café serves “crème brûlée”? " + "x" * 70000
+    corpus = build(tmp_path / "corpus.bin", [("Food", "medium", text)])
+    assert corpus.pick("food", "medium")["question"] == text
+    corpus.close()
+
+def test_missing_or_invalid_file_gives_no_question(tmp_path):
+    assert FallbackCorpus(str(tmp_path / "missing.bin")).pick("science", "easy") is None
+    
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"not a corpus")
+    assert FallbackCorpus(str(bad)).pick("science", "easy") is None
+    
+    truncated = tmp_path / "truncated.bin"
+    truncated.write_bytes(MAGIC + struct.pack("<I", 3))
+    assert FallbackCorpus(str(truncated)).pick("science", "easy") is None
+    
+    whole = build(tmp_path / "whole.bin", [("Science", "easy", "Which planet is red?")])
+    whole.close()
+    cut = tmp_path / "cut.bin"
+    cut.write_bytes((tmp_path / "whole.bin").read_bytes()[:40])
+    assert FallbackCorpus(str(cut)).pick("science", "easy") is None
+
+def test_empty_corpus(tmp_path):
+    corpus = build(tmp_path / "corpus.bin", [])
+    assert not corpus.available()
+    assert corpus.pick("science", "easy") is None
+
+def test_rebuilt_file_is_remapped(tmp_path):
+    path = tmp_path / "corpus.bin"
+    corpus = build(path, [("Science", "easy", "Old question")])
+    assert corpus.pick("science", "easy")["question"] == "Old question"
+    
+    build(path, [("Science", "easy", "New question")])
+    os.utime(path, ns=(0, 1))  # make sure the change is visible on coarse clocks
+    
+    assert corpus.pick("science", "easy")["question"] == "New question"
+    corpus.close()
+
+def test_fingerprint_set_matches_a_python_set():
+    fingerprints = FingerprintSet(capacity=4)
+    expected = set()
+    rng = random.Random(1)
+    for _ in range(20000):
+        value = rng.getrandbits(8) if rng.random() < 0.5 else rng.getrandbits(64)
+        assert fingerprints.add(value) == ((value or 1) not in expected)
+        expected.add(value or 1)
+    
+    assert len(fingerprints) == len(expected)
+    assert len(fingerprints.slots) >= 2 * len(expected)
@@ -0,0 +1,88 @@
+import pytest
+
+import src.trivia.dedup as dedup_module
+from src.trivia.dedup import NearDuplicateIndex, normalize_question_text
+
+ORIGINAL = "What is the capital of France? Paris"
+REWORDED = "Which city is the capital of France? Paris"
+UNRELATED = "Which element has the chemical symbol Au? Gold"
+
+def test_normalize_drops_case_punctuation_and_spacing():
+    assert normalize_question_text("  What's   the CAPITAL of France?! ") == "what s the capital of france"
+
+def test_identical_text_is_a_duplicate():
+    index = NearDuplicateIndex()
+    index.add(ORIGINAL, 7)
+    
+    assert index.similarity(ORIGINAL, ORIGINAL) == 1.0
+    assert index.find_duplicate(ORIGINAL) == 7
+
+def test_rewording_and_plurals_are_caught():
+    index = NearDuplicateIndex()
+    index.add(ORIGINAL, 1)
+    index.add("How many moons does Mars have? Two", 2)
+    
+    assert index.find_duplicate(REWORDED) == 1
+    assert index.find_duplicate("How many moon does Mars have? Two") == 2
+
+def test_swapped_subject_and_answer_are_not_a_duplicate():
+    index = NearDuplicateIndex()
+    index.add("Who did Brutus betray? Caesar", 1)
+    
+    assert index.find_duplicate("Who did Caesar betray? Brutus") is None
+
+def test_unrelated_question_is_not_a_duplicate():
+    index = NearDuplicateIndex()
+    index.add(ORIGINAL, 1)
+    
+    assert index.similarity(ORIGINAL, UNRELATED) < 0.2
+    assert index.find_duplicate(UNRELATED) is None
+
+@pytest.mark.parametrize("threshold, expected", [(0.4, 1), (0.95, None)])
+def test_threshold_decides_borderline_matches(threshold, expected):
+    index = NearDuplicateIndex(threshold=threshold)
+    index.add(ORIGINAL, 1)
+    
+    similarity = index.similarity(ORIGINAL, REWORDED)
+    assert 0.4 <= similarity < 0.95
+    assert index.find_duplicate(REWORDED) == expected
+
+def test_best_match_wins():
+    index = NearDuplicateIndex()
+    index.add("What is the capital city of France and its largest? Paris", 1)
+    index.add(ORIGINAL, 2)
+    
+    assert index.find_duplicate(ORIGINAL) == 2
+
+def test_add_many_matches_add_and_unknown_ids_are_minus_one():
+    documents = [(ORIGINAL, None), (UNRELATED, 5)]
+    one_by_one = NearDuplicateIndex()
+    for text, question_id in documents:
+        one_by_one.add(text, question_id)
+    bulk = NearDuplicateIndex()
+    bulk.add_many(documents)
+    
+    for index in (one_by_one, bulk):
+        assert len(index) == 2
+        assert index.find_duplicate(REWORDED) == -1
+        assert index.find_duplicate(UNRELATED) == 5
+
+def test_recent_additions_are_found_before_and_after_merging(monkeypatch):
+    monkeypatch.setattr(dedup_module, "MERGE_SIZE", 3)
+    index = NearDuplicateIndex()
+    index.add(ORIGINAL, 1)
+    index.add(UNRELATED, 2)
+    assert index.find_duplicate(REWORDED) == 1
+    
+    index.add("How many moons does Mars have? Two", 3)
+    assert index._recent_count == 0
+    assert index.find_duplicate(REWORDED) == 1
+    assert index.find_duplicate(UNRELATED) == 2
+
+def test_clear_forgets_everything():
+    index = NearDuplicateIndex()
+    index.add(ORIGINAL, 1)
+    index.clear()
+    
+    assert len(index) == 0
+    assert index.find_duplicate(ORIGINAL) is None
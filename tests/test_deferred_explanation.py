@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.trivia.generator as generator_module
+from src.trivia.generator import SHORT_QUESTION_SCHEMA, TriviaGenerator, TriviaQuestion
+from src.utils.circuit_breaker import CircuitBreaker
+
+def deferred_generator(monkeypatch, reply):
+    monkeypatch.setattr(generator_module, "openai_breaker", CircuitBreaker("test"))
+    generator = TriviaGenerator()
+    generator.defer_explanations = True
+    requests = []
+    
+    async def create(**params):
+        requests.append(params)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+    
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return generator, requests
+
+def question(correct="B", explanation=None):
+    return TriviaQuestion("Which planet is known as the Red Planet?", ["Venus", "Mars", "Jupiter", "Saturn"], correct, "Astronomy", "easy", explanation=explanation)
+
+def explain(generator, q):
+    async def run():
+        generator.request_explanation(q)
+        await q.wait_for_explanation(1)
+    asyncio.run(run())
+
+@pytest.mark.parametrize("correct", ["B", "b"])
+def test_explanation_is_fetched_for_the_correct_option(monkeypatch, correct):
+    generator, requests = deferred_generator(monkeypatch, "  Iron oxide makes it red.  ")
+    q = question(correct)
+    
+    explain(generator, q)
+    
+    assert q.explanation == "Iron oxide makes it red."
+    assert "Correct answer: B) Mars" in requests[0]["messages"][1]["content"]
+
+def test_failed_fetch_leaves_the_question_without_one(monkeypatch):
+    generator, _ = deferred_generator(monkeypatch, ConnectionError("down"))
+    q = question()
+    
+    explain(generator, q)
+    
+    assert q.explanation == ""
+    assert q.explanation_ready.done()
+
+def test_existing_explanation_is_not_refetched(monkeypatch):
+    generator, requests = deferred_generator(monkeypatch, "unused")
+    explain(generator, question(explanation="Already here."))
+    assert requests == []
+
+def test_deferred_prompts_leave_the_explanation_out(monkeypatch):
+    generator, _ = deferred_generator(monkeypatch, "unused")
+    
+    prompt = generator._create_trivia_prompt("Astronomy", "easy", "any")
+    params = generator._completion_params(prompt, "m", 500, batch=False)
+    
+    assert "explanation" not in prompt
+    assert "explanation" not in SHORT_QUESTION_SCHEMA["properties"]
+    assert "explanation" not in params["messages"][1]["content"]
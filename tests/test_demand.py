@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.trivia.demand import DemandModel
+
+CATEGORIES = {"Science": ["Chemistry", "Physics"], "History": ["Ancient History"], "random": ["Mixed Topics"]}
+SCIENCE = ("Science", "easy", "any")
+HISTORY = ("History", "easy", "any")
+FRIDAY_NIGHT = datetime(2026, 10, 16, 21)
+
+def model(slots=None, days=7.0):
+    demand = DemandModel(CATEGORIES)
+    demand.enabled = True
+    demand.min_target = 1
+    demand.slots = slots or {}
+    demand.days_observed = days
+    return demand
+
+def test_forecast_blends_this_weekday_and_hour_with_every_day_at_this_hour():
+    demand = model({SCIENCE: {(5, 21): 14, (2, 21): 7}}, days=14)
+
+    # Two Friday nights seen: 7 a week; 21 games at 21:00 over 14 days: 1.5 a day
+    assert demand.forecast(SCIENCE, FRIDAY_NIGHT) == pytest.approx((7 + 1.5) / 2)
+    assert demand.forecast(SCIENCE, FRIDAY_NIGHT + timedelta(hours=1)) == 0
+    assert demand.forecast(HISTORY, FRIDAY_NIGHT) == 0
+
+def test_targets_share_the_total_by_forecast():
+    demand = model({SCIENCE: {(w, h): 3 for w in range(7) for h in range(24)},
+                    HISTORY: {(w, h): 1 for w in range(7) for h in range(24)}})
+
+    assert demand.targets([SCIENCE, HISTORY, ("Science", "hard", "any")], base=10, cap=100) == {
+        SCIENCE: 23,
+        HISTORY: 8,
+        ("Science", "hard", "any"): 1
+    }
+    assert demand.targets([SCIENCE, HISTORY], base=10, cap=12)[SCIENCE] == 12
+    assert demand.hottest([HISTORY, SCIENCE]) == [SCIENCE, HISTORY]
+
+def test_without_history_every_key_keeps_the_base_target():
+    assert model().targets([SCIENCE, HISTORY], base=10, cap=100) == {SCIENCE: 10, HISTORY: 10}
+
+def test_refresh_maps_topics_back_to_their_category(database):
+    demand = model()
+    now = datetime.utcnow()
+
+    async def run():
+        for category in ["Chemistry", "physics", "Science", "Star Trek"]:
+            await database.save_game_session({
+                "user_id": 1,
+                "question_text": "Which gas do plants absorb?",
+                "category": category,
+                "difficulty": "easy",
+                "correct_answer": "Carbon dioxide",
+                "created_at": now - timedelta(days=2)
+            })
+        await demand.refresh()
+
+    asyncio.run(run())
+
+    assert demand.known_keys() == [SCIENCE]
+    assert sum(demand.slots[SCIENCE].values()) == 3
+    assert demand.days_observed == pytest.approx(2, abs=0.01)
+
+def test_games_count_under_the_key_that_was_requested(database):
+    demand = model()
+
+    async def run():
+        for requested in (("random", "hard", "any"), ("science", "easy", "any"), (None, None, None)):
+            await database.save_game_session({
+                "user_id": 1,
+                "question_text": "Which gas do plants absorb?",
+                "category": "Chemistry",  # a fallback question, so no bank row to go by
+                "difficulty": "easy",
+                "requested_category": requested[0],
+                "requested_difficulty": requested[1],
+                "requested_era": requested[2],
+                "correct_answer": "Carbon dioxide"
+            })
+        await demand.refresh()
+
+    asyncio.run(run())
+
+    assert sorted(demand.known_keys()) == [SCIENCE, ("random", "hard", "any")]
+    assert sum(demand.slots[SCIENCE].values()) == 2
+
+def test_hit_rate_table():
+    demand = model({SCIENCE: {(w, h): 1 for w in range(7) for h in range(24)}})
+    demand.record(HISTORY, True)
+    demand.record(HISTORY, False)
+
+    table = demand.get_table([SCIENCE])
+
+    assert [row["key"] for row in table] == [SCIENCE, HISTORY]
+    assert table[0]["hit_rate"] is None
+    assert table[1]["hit_rate"] == 50
@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.trivia.generator as generator_module
+from src.trivia.generator import TriviaGenerator
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.hedging import LatencyHistogram, RequestHedger
+
+def primed_hedger(latency=0.01):
+    hedger = RequestHedger()
+    hedger.enabled = True
+    hedger.max_ratio = 1
+    histogram = hedger.histograms.setdefault("m", LatencyHistogram(hedger.window))
+    for _ in range(hedger.min_samples):
+        histogram.record(latency)
+    return hedger
+
+def delayed(result, seconds, calls=None):
+    async def request():
+        if calls is not None:
+            calls.append(result)
+        await asyncio.sleep(seconds)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return request
+
+def test_percentile():
+    histogram = LatencyHistogram()
+    for i in range(1, 101):
+        histogram.record(i)
+    assert histogram.percentile(90) == 91
+    assert LatencyHistogram().percentile(90) is None
+
+def test_no_hedge_without_enough_samples():
+    hedger = RequestHedger()
+    calls = []
+    result = asyncio.run(hedger.run("m", delayed("primary", 0.05, calls), delayed("hedge", 0, calls)))
+
+    assert result == "primary"
+    assert calls == ["primary"]
+    assert len(hedger.histograms["m"]) == 1
+
+def test_slow_request_is_hedged_and_the_hedge_wins():
+    hedger = primed_hedger()
+    result = asyncio.run(hedger.run("m", delayed("primary", 1), delayed("hedge", 0)))
+
+    assert result == "hedge"
+    assert hedger.stats["hedges"] == hedger.stats["wins"] == 1
+    assert len(hedger.histograms["m"]) == hedger.min_samples + 1
+
+def test_failed_hedge_waits_for_the_primary():
+    hedger = primed_hedger()
+    result = asyncio.run(hedger.run("m", delayed("primary", 0.1), delayed(ConnectionError("down"), 0)))
+
+    assert result == "primary"
+    assert hedger.stats["losses"] == 1
+
+def test_both_failing_raises():
+    hedger = primed_hedger()
+    with pytest.raises(ConnectionError):
+        asyncio.run(hedger.run("m", delayed(ConnectionError("primary"), 0.1), delayed(ConnectionError("hedge"), 0)))
+
+def test_hedges_are_capped_by_ratio():
+    hedger = primed_hedger()
+    hedger.max_ratio = 0.1
+    calls = []
+    asyncio.run(hedger.run("m", delayed("primary", 0.05, calls), delayed("hedge", 0, calls)))
+
+    assert calls == ["primary"]
+    assert hedger.stats["throttled"] == 1
+
+def test_hedged_attempts_go_through_the_breaker(monkeypatch):
+    breaker = CircuitBreaker("test")
+    monkeypatch.setattr(generator_module, "openai_breaker", breaker)
+    generator = TriviaGenerator()
+    generator.hedger = primed_hedger()
+    calls = []
+
+    async def create(**params):
+        calls.append(params)
+        if len(calls) == 1:
+            await asyncio.sleep(0.1)
+            return SimpleNamespace(choices=[])
+        raise ConnectionError("hedge failed")
+
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    asyncio.run(generator._create_completion("prompt", "m", "easy"))
+
+    assert len(calls) == 2
+    assert list(breaker._outcomes) == [True, False]  # the hedge's failure, then the primary's success
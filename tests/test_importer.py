@@ -0,0 +1,113 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+import src.trivia.importer as importer_module
+from src.trivia.generator import TriviaGenerator
+from src.trivia.importer import QuestionImporter, iter_csv, iter_json_array, iter_jsonl
+
+OPENTDB = {
+    "category": "Science: Computers",
+    "difficulty": "easy",
+    "question": "Which company created the &quot;Java&quot; programming language?",
+    "correct_answer": "Sun Microsystems",
+    "incorrect_answers": ["Microsoft", "Oracle Corporation", "Apple Computer"]
+}
+NATIVE = {
+    "question": "Which planet is known as the Red Planet?",
+    "options": {"A": "Venus", "B": "Mars", "C": "Jupiter", "D": "Saturn"},
+    "correct_answer": "b",
+    "category": "Astronomy"
+}
+
+def make_importer(**kwargs):
+    return QuestionImporter(TriviaGenerator(), seed=1, **kwargs)
+
+@pytest.mark.parametrize("pack", [
+    [OPENTDB, NATIVE],
+    {"response_code": 0, "results": [OPENTDB, NATIVE]},
+    {"questions": [OPENTDB, NATIVE]}
+])
+def test_json_packs_stream_their_question_array(pack, monkeypatch):
+    monkeypatch.setattr(importer_module, "READ_SIZE", 16)  # elements straddle many reads
+    assert list(iter_json_array(io.StringIO(json.dumps(pack)))) == [OPENTDB, NATIVE]
+
+@pytest.mark.parametrize("text", ['{"count": 2}', '"questions"', '[{"question": "cut off'])
+def test_malformed_json_packs_raise(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text)))
+
+def test_jsonl_yields_none_for_bad_lines():
+    stream = io.StringIO(json.dumps(NATIVE) + "\n\nnot json\n")
+    assert list(iter_jsonl(stream)) == [NATIVE, None]
+
+def test_csv_columns_are_lower_cased():
+    stream = io.StringIO("Question,Option_A,Option_B,Option_C,Option_D,Correct_Answer\nQ?,w,x,y,z,A\n")
+    assert list(iter_csv(stream)) == [{
+        "question": "Q?", "option_a": "w", "option_b": "x", "option_c": "y", "option_d": "z", "correct_answer": "A"
+    }]
+
+def test_open_trivia_db_record_is_shuffled_and_mapped():
+    question, category = make_importer().to_question(OPENTDB)
+
+    assert question.question == 'Which company created the "Java" programming language?'
+    assert sorted(question.options) == ["Apple Computer", "Microsoft", "Oracle Corporation", "Sun Microsystems"]
+    assert question.options[ord(question.correct_answer) - ord("A")] == "Sun Microsystems"
+    assert (question.category, question.difficulty, category) == ("Computers", "easy", "science")
+
+def test_native_record_takes_a_letter_or_the_answer_text():
+    importer = make_importer()
+    by_letter, category = importer.to_question(NATIVE)
+    by_text, _ = importer.to_question(dict(NATIVE, correct_answer="Mars"))
+
+    assert by_letter.correct_answer == by_text.correct_answer == "B"
+    assert by_letter.difficulty == "medium"
+    assert category == "science"  # Astronomy is one of science's topics
+
+def test_csv_record_with_incorrect_answer_columns():
+    record = {
+        "question": "Which planet is known as the Red Planet?",
+        "correct_answer": "Mars",
+        "incorrect_answer_1": "Venus",
+        "incorrect_answer_2": "Jupiter",
+        "incorrect_answer_3": "Saturn",
+        "category": "Quiz Night"
+    }
+    question, category = make_importer().to_question(record)
+
+    assert question.options[ord(question.correct_answer) - ord("A")] == "Mars"
+    assert category == "random"
+
+def test_import_counts_every_outcome(database):
+    importer = make_importer(chunk_size=2)
+    records = [
+        OPENTDB,
+        NATIVE,
+        dict(NATIVE, question="  which planet is known as the RED planet?"),  # duplicate text
+        dict(NATIVE, question="Which planet is Mars?"),  # names the answer
+        dict(NATIVE, options=["Venus", "Mars"]),
+        None
+    ]
+
+    asyncio.run(importer.import_records(iter(records)))
+
+    assert importer.stats == {
+        "read": 6, "unreadable": 2, "rejected": 1, "near_duplicates": 0,
+        "duplicates": 1, "inserted": 2, "failed": 0
+    }
+    rows = asyncio.run(database.get_bank_candidates("science", "any", "any", limit=10))
+    assert sorted(row["subcategory"] for row in rows) == ["Astronomy", "Computers"]
+
+def test_failed_chunk_is_counted(database, monkeypatch):
+    importer = make_importer(chunk_size=1)
+
+    async def import_questions(rows):
+        raise RuntimeError("database refused")
+
+    monkeypatch.setattr(database, "import_questions", import_questions)
+    asyncio.run(importer.import_records(iter([OPENTDB, NATIVE])))
+
+    assert importer.stats["failed"] == 2
+    assert importer.stats["inserted"] == 0
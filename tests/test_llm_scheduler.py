@@ -0,0 +1,149 @@
+import asyncio
+import importlib
+import time
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from src.utils.llm_scheduler import LLMScheduler, Priority, PriorityHandle, llm_priority
+
+# The SDK's own HTTP package, which may be a fork of httpx
+http = importlib.import_module(type(openai.DEFAULT_CONNECTION_LIMITS).__module__.split(".")[0])
+
+def scheduler(concurrency=1, reserve=0):
+    scheduler = LLMScheduler()
+    scheduler.max_concurrency = concurrency
+    scheduler.interactive_reserve = reserve
+    scheduler.backoff_base = 0.001
+    return scheduler
+
+def status_error(cls, status, headers=None):
+    request = http.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return cls("error", response=http.Response(status, headers=headers or {}, request=request), body=None)
+
+def returning(value, order=None, release=None):
+    async def request():
+        if release is not None:
+            await release.wait()
+        if order is not None:
+            order.append(value)
+        return value
+    return request
+
+def test_interactive_calls_overtake_queued_background_work():
+    s = scheduler()
+    order = []
+    
+    async def run():
+        release = asyncio.Event()
+        busy = asyncio.create_task(s.run(returning("busy", order, release)))
+        await asyncio.sleep(0)
+        background = asyncio.create_task(s.run(returning("background", order), priority=Priority.BACKGROUND))
+        interactive = asyncio.create_task(s.run(returning("interactive", order)))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(busy, background, interactive)
+    
+    asyncio.run(run())
+    assert order == ["busy", "interactive", "background"]
+
+def test_background_work_never_takes_the_interactive_reserve():
+    s = scheduler(concurrency=2, reserve=1)
+    
+    async def run():
+        release = asyncio.Event()
+        llm_priority.set(Priority.BACKGROUND)
+        first = asyncio.create_task(s.run(returning(1, release=release)))
+        second = asyncio.create_task(s.run(returning(2, release=release)))
+        await asyncio.sleep(0)
+        stats = s.get_stats()
+        release.set()
+        await asyncio.gather(first, second)
+        return stats
+    
+    stats = asyncio.run(run())
+    assert stats["active"] == 1
+    assert stats["queued"]["background"] == 1
+
+def test_promoted_handle_moves_queued_calls_ahead():
+    s = scheduler(concurrency=2, reserve=1)
+    s.active = 1
+    handle = PriorityHandle(Priority.BACKGROUND)
+    
+    async def run():
+        task = asyncio.create_task(s.run(returning("done"), priority=handle))
+        await asyncio.sleep(0)
+        assert not task.done()
+        s.promote(handle)
+        return await asyncio.wait_for(task, timeout=1)
+    
+    assert asyncio.run(run()) == "done"
+    assert handle.priority == Priority.INTERACTIVE
+
+def test_rate_limits_are_retried_no_sooner_than_retry_after():
+    s = scheduler()
+    attempts = []
+    
+    async def request():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise status_error(openai.RateLimitError, 429, {"retry-after-ms": "50"})
+        return "ok"
+    
+    assert asyncio.run(s.run(request)) == "ok"
+    assert attempts[1] - attempts[0] >= 0.05
+    assert s.stats["rate_limited"] == s.stats["retries"] == 1
+
+def test_client_errors_are_not_retried():
+    s = scheduler()
+    attempts = []
+    
+    async def request():
+        attempts.append(1)
+        raise status_error(openai.BadRequestError, 400)
+    
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(s.run(request))
+    assert attempts == [1]
+    assert s.active == 0
+
+def test_retries_stop_after_max_retries():
+    s = scheduler()
+    s.max_retries = 2
+    attempts = []
+    
+    async def request():
+        attempts.append(1)
+        raise status_error(openai.InternalServerError, 503)
+    
+    with pytest.raises(openai.InternalServerError):
+        asyncio.run(s.run(request))
+    assert len(attempts) == 3
+
+def test_token_budget_holds_calls_until_the_window_frees_up():
+    s = scheduler(concurrency=4)
+    s.tokens_per_minute = 100
+    
+    async def run():
+        await s.run(returning("first"), estimated_tokens=80)
+        second = asyncio.create_task(s.run(returning("second"), estimated_tokens=80))
+        await asyncio.sleep(0)
+        assert not second.done()
+        # Age the first charge out of the window
+        s._token_window[0][0] -= 60
+        s._dispatch()
+        return await asyncio.wait_for(second, timeout=1)
+    
+    assert asyncio.run(run()) == "second"
+
+def test_real_usage_replaces_the_estimate_and_reaches_listeners():
+    s = scheduler()
+    heard = []
+    s.usage_listeners.append(lambda model, usage: heard.append((model, usage.total_tokens)))
+    response = SimpleNamespace(model="m", usage=SimpleNamespace(total_tokens=42))
+    
+    asyncio.run(s.run(returning(response), estimated_tokens=500))
+    
+    assert heard == [("m", 42)]
+    assert s.get_stats()["tokens_last_minute"] == 42
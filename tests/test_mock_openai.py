@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from config.settings import settings
+from src.trivia.generator import trivia_generator
+from src.utils.mock_openai import LatencyModel, MockOpenAIServer, parse_args
+from src.utils.openai_client import create_openai_client
+
+SYSTEM = {"role": "system", "content": "You are a trivia question generator. Include an explanation."}
+
+def server(*argv):
+    return MockOpenAIServer(parse_args(["--seed", "1", "--latency", "fixed:0", *argv]))
+
+def test_batch_prompt_gets_the_requested_number_of_questions():
+    messages = [SYSTEM, {"role": "user", "content": "Return a JSON array with exactly 4 objects."}]
+    content = server()._content(messages, invalid=False)
+    
+    questions = trivia_generator._parse_batch_response(content, "Science", "easy", "any")
+    
+    assert len(questions) == 4
+    assert all(len(q.options) == 4 and q.correct_answer in "ABCD" for q in questions)
+    assert all(q.explanation for q in questions)
+
+def test_json_modes_wrap_arrays_in_an_object():
+    messages = [SYSTEM, {"role": "user", "content": "Return a JSON array with exactly 2 objects."}]
+    content = server()._content(messages, invalid=False, response_format={"type": "json_object"})
+    assert len(json.loads(content)["questions"]) == 2
+
+def test_corrupted_completions_never_break_the_parser():
+    mock = server()
+    messages = [SYSTEM, {"role": "user", "content": "Return a JSON array with exactly 3 objects."}]
+    for _ in range(200):
+        content = mock._content(messages, invalid=True)
+        questions = trivia_generator._parse_batch_response(content, "Science", "easy", "any")
+        assert len(questions) <= 3
+
+@pytest.mark.parametrize("spec", ["fixed", "uniform:1", "gamma:1", "fixed:x"])
+def test_invalid_latency_specs(spec):
+    with pytest.raises(ValueError):
+        LatencyModel(spec, None)
+
+def test_sdk_client_round_trip(monkeypatch):
+    async def run():
+        runner = web.AppRunner(server().create_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        
+        monkeypatch.setattr(settings, "OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+        monkeypatch.setattr(settings, "LLM_CASSETTE_MODE", "off")
+        client = create_openai_client()
+        try:
+            return await client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[SYSTEM, {"role": "user", "content": "One question please."}]
+            )
+        finally:
+            await client.close()
+            await runner.cleanup()
+    
+    response = asyncio.run(run())
+    
+    question = json.loads(response.choices[0].message.content.strip("`").removeprefix("json"))
+    assert set(question) == {"question", "options", "correct_answer", "explanation"}
+    assert response.usage.total_tokens > 0
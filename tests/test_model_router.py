@@ -0,0 +1,53 @@
+import pytest
+
+from config.settings import settings
+from src.utils.model_router import ModelRouter
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MODELS", "cheap, fast, strong")
+    monkeypatch.setattr(settings, "MODEL_EXPLORE_RATE", 0)
+    monkeypatch.setattr(settings, "MODEL_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "MODEL_LATENCY_BUDGET", 5)
+    monkeypatch.setattr(settings, "MODEL_MIN_PASS_RATE", 0.8)
+    return ModelRouter()
+
+def profile(router, model, route, latency, pass_rate, samples=10):
+    for i in range(samples):
+        router.record_latency(model, route, latency)
+        router.record_validation(model, route, i < pass_rate * samples)
+
+def test_first_model_is_used_until_others_are_profiled(router):
+    profile(router, "fast", "easy", 1, 1.0, samples=2)
+    assert router.choose("easy") == "cheap"
+
+def test_easy_routes_to_the_fastest_acceptable_model(router):
+    profile(router, "cheap", "easy", 0.5, 0.5)
+    profile(router, "fast", "easy", 1, 0.9)
+    profile(router, "strong", "easy", 3, 1.0)
+    
+    assert router.choose("easy") == "fast"
+    assert router.get_table()["easy"]["reason"] == "fastest acceptable"
+
+def test_hard_routes_to_the_best_pass_rate_within_budget(router):
+    profile(router, "fast", "hard", 1, 0.7)
+    profile(router, "strong", "hard", 4, 0.9)
+    profile(router, "cheap", "hard", 9, 1.0)
+    
+    assert router.choose("hard") == "strong"
+
+def test_unknown_routes_use_medium(router):
+    profile(router, "strong", "medium", 0.1, 1.0)
+    assert router.choose("trivia") == "strong"
+
+def test_overrides_pin_routes_and_skip_invalid_entries(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_ROUTES", "hard=gpt-4o, bogus=x, persona=")
+    router = ModelRouter()
+    
+    assert router.overrides == {"hard": "gpt-4o"}
+    assert router.choose("hard") == "gpt-4o"
+    assert router.get_table()["hard"]["reason"] == "override"
+
+def test_exploration_tries_the_other_models(router):
+    router.explore_rate = 1
+    assert {router.choose("easy") for _ in range(50)} == {"fast", "strong"}
@@ -0,0 +1,30 @@
+import openai
+
+from config.settings import settings
+from src.utils.cassette import CassetteClient
+from src.utils.openai_client import create_openai_client
+
+def test_client_is_built_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", "http://localhost:8000/v1")
+    monkeypatch.setattr(settings, "OPENAI_MAX_CONNECTIONS", 7)
+    monkeypatch.setattr(settings, "OPENAI_TIMEOUT", 12)
+    monkeypatch.setattr(settings, "OPENAI_CONNECT_TIMEOUT", 3)
+    
+    client = create_openai_client()
+    
+    assert isinstance(client, openai.AsyncOpenAI)
+    assert str(client.base_url) == "http://localhost:8000/v1/"
+    assert client.max_retries == settings.OPENAI_MAX_RETRIES
+    assert client.timeout.read == 12
+    assert client.timeout.connect == 3
+    assert isinstance(client._client, openai.DefaultAsyncHttpxClient)
+    assert client._client._transport._pool._max_connections == 7
+
+def test_cassette_mode_wraps_the_client(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "LLM_CASSETTE_MODE", "replay")
+    monkeypatch.setattr(settings, "LLM_CASSETTE_PATH", str(tmp_path / "llm.jsonl"))
+    
+    client = create_openai_client()
+    
+    assert isinstance(client, CassetteClient)
+    assert isinstance(client.client, openai.AsyncOpenAI)
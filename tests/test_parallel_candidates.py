@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+
+from config.settings import settings
+from src.trivia.generator import TriviaGenerator
+
+KEY = ("science", "easy", "any")
+
+RED_PLANET = {"question": "Which planet is known as the Red Planet?",
+              "options": {"A": "Venus", "B": "Mars", "C": "Jupiter", "D": "Saturn"}, "correct_answer": "B"}
+OXYGEN = {"question": "Which gas do humans need to breathe to survive?",
+          "options": {"A": "Hydrogen", "B": "Oxygen", "C": "Nitrogen", "D": "Helium"}, "correct_answer": "B"}
+GIVEAWAY = {"question": "Which planet, Mars, is the red one here?",
+            "options": {"A": "Venus", "B": "Mars", "C": "Jupiter", "D": "Saturn"}, "correct_answer": "B"}
+
+def candidate_generator(monkeypatch, responses):
+    """Candidates arrive in list order; an exception stands for a failed call."""
+    monkeypatch.setattr(settings, "QUESTION_BANK_ENABLED", False)
+    generator = TriviaGenerator()
+    responses = list(enumerate(responses))
+    
+    async def call_openai(prompt, model, difficulty):
+        position, response = responses.pop(0)
+        await asyncio.sleep(position * 0.01)
+        if isinstance(response, Exception):
+            raise response
+        return json.dumps(response)
+    
+    generator._call_openai = call_openai
+    generator.banked = []
+    
+    async def accept_questions(questions, *key):
+        generator.banked.extend(question.question for question in questions)
+    
+    generator._accept_questions = accept_questions
+    return generator
+
+async def generate(generator, k):
+    question = await generator._generate_candidates(*KEY, k)
+    while generator._background_tasks:
+        await asyncio.gather(*generator._background_tasks)
+    return question
+
+def test_first_passing_candidate_is_served_and_the_rest_pooled(monkeypatch):
+    generator = candidate_generator(monkeypatch, [GIVEAWAY, RED_PLANET, OXYGEN])
+    
+    question = asyncio.run(generate(generator, 3))
+    
+    assert question.question == RED_PLANET["question"]
+    assert [q.question for q in generator.question_pool.queues[KEY]] == [OXYGEN["question"]]
+    assert generator.get_candidate_stats()["science"]["candidates"] == 3
+    assert generator.get_candidate_stats()["science"]["accepted"] == 2
+    assert sorted(generator.banked) == sorted([RED_PLANET["question"], OXYGEN["question"]])
+
+def test_near_duplicate_candidates_are_not_kept(monkeypatch):
+    generator = candidate_generator(monkeypatch, [RED_PLANET, dict(RED_PLANET, question="Which planet is called the Red Planet?")])
+    
+    asyncio.run(generate(generator, 2))
+    
+    assert len(generator.question_pool.queues.get(KEY, [])) == 0
+
+def test_last_resort_is_an_unvalidated_candidate(monkeypatch):
+    generator = candidate_generator(monkeypatch, [GIVEAWAY, ValueError("bad json")])
+    assert asyncio.run(generate(generator, 2)).question == GIVEAWAY["question"]
+    assert generator.banked == []
+
+def test_failed_serial_retry_is_served_but_not_banked(monkeypatch):
+    generator = candidate_generator(monkeypatch, [GIVEAWAY, GIVEAWAY])
+    assert asyncio.run(generator._generate_fresh(*KEY)).question == GIVEAWAY["question"]
+    assert generator.banked == []
+
+def test_serial_retry_that_passes_is_banked(monkeypatch):
+    generator = candidate_generator(monkeypatch, [GIVEAWAY, RED_PLANET])
+    asyncio.run(generator._generate_fresh(*KEY))
+    assert generator.banked == [RED_PLANET["question"]]
+
+def test_raises_when_every_call_fails(monkeypatch):
+    generator = candidate_generator(monkeypatch, [ConnectionError("down"), ConnectionError("down")])
+    with pytest.raises(ConnectionError):
+        asyncio.run(generate(generator, 2))
+
+def test_batch_mode_serves_the_first_streamed_question(monkeypatch):
+    monkeypatch.setattr(settings, "PARALLEL_CANDIDATES_MODE", "batch")
+    generator = candidate_generator(monkeypatch, [])
+    parsed = [generator._question_from_data(item, "Astronomy", "easy", "any") for item in (RED_PLANET, OXYGEN)]
+    
+    async def generate_questions(category, difficulty, era, n, on_question=None):
+        for question in parsed:
+            on_question(question)
+            await asyncio.sleep(0)
+        return parsed
+    
+    generator.generate_questions = generate_questions
+    
+    async def run():
+        question = await generator._generate_single(*KEY)
+        await asyncio.sleep(0.01)
+        return question
+    
+    monkeypatch.setattr(settings, "PARALLEL_CANDIDATES", 3)
+    assert asyncio.run(run()) is parsed[0]
+    assert generator.banked == []  # generate_questions banks the batch itself
+    assert list(generator.question_pool.queues[KEY]) == [parsed[1]]
+    assert generator.get_candidate_stats()["science"]["candidates"] == 3
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import src.trivia.generator as generator_module
+from src.trivia.generator import TriviaGenerator, TriviaQuestion
+from src.trivia.seen import SeenFilter
+from src.utils.llm_scheduler import LLMScheduler
+
+KEY = ("history", "easy", "any")
+
+def question(category="Ancient History", difficulty="easy", era=None):
+    return TriviaQuestion(
+        question="Which empire built Hadrian's Wall?",
+        options=["Roman", "Persian", "Ottoman", "Mongol"],
+        correct_answer="A",
+        category=category,
+        difficulty=difficulty,
+        era=era
+    )
+
+def pooled(generator):
+    return list(generator.question_pool.queues.get(KEY, []))
+
+@pytest.mark.parametrize("source, returned", [
+    ("pool", True),
+    ("live", True),
+    ("bank", False),
+    ("reuse", False),
+    ("degraded", False),
+    ("budget", False)
+])
+def test_only_pooled_and_generated_questions_are_released(source, returned):
+    generator = TriviaGenerator()
+    generator.prefetcher._release(KEY, question(), source)
+    assert len(pooled(generator)) == (1 if returned else 0)
+
+@pytest.mark.parametrize("mismatch", [
+    question(category="Physics"),
+    question(difficulty="hard"),
+    question(era="modern")
+])
+def test_questions_for_another_key_are_not_released(mismatch):
+    generator = TriviaGenerator()
+    generator.prefetcher._release(KEY, mismatch, "live")
+    assert pooled(generator) == []
+
+def test_custom_and_random_keys_match_by_name():
+    generator = TriviaGenerator()
+    assert generator._matches_key(question(category="Star Trek"), ("star trek", "easy", "any"))
+    assert generator._matches_key(question(category="Physics"), ("random", "easy", "any"))
+    assert not generator._matches_key(question(category="Physics"), ("star trek", "easy", "any"))
+
+def test_claim_raises_a_pending_prefetch_to_interactive(monkeypatch):
+    scheduler = LLMScheduler()
+    scheduler.max_concurrency = 2
+    scheduler.interactive_reserve = 1
+    scheduler.active = 1  # the one slot background work may use is taken
+    monkeypatch.setattr(generator_module, "llm_scheduler", scheduler)
+    
+    generator = TriviaGenerator()
+    generator.seen_questions.filters[1] = SeenFilter()
+    
+    async def find_question(seen, *key, **kwargs):
+        async def generate():
+            return question()
+        return await scheduler.run(generate), "live"
+    
+    generator._find_question = find_question
+    
+    async def run():
+        generator.prefetcher.record_request(1, KEY)
+        generator.prefetcher.schedule(1)
+        await asyncio.sleep(0.01)
+        assert scheduler.get_stats()["queued"]["background"] == 1
+        return await asyncio.wait_for(generator.prefetcher.claim(1, KEY), timeout=1)
+    
+    assert asyncio.run(run()) == question()
+    assert generator.prefetcher.stats["hits"] == 1
@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import src.utils.token_counter as token_counter
+from src.trivia import prompt_benchmark
+from src.trivia.generator import (
+    COMPACT_SHORT_SYSTEM_PROMPT, COMPACT_SYSTEM_PROMPT, SYSTEM_PROMPT, TriviaGenerator, trivia_generator
+)
+from src.utils.token_counter import count_message_tokens, count_tokens
+
+def generator(variant):
+    generator = TriviaGenerator()
+    generator.prompt_variant = variant
+    return generator
+
+def test_compact_prompts_keep_the_rules_in_the_system_message():
+    compact = generator("compact")
+    
+    prompt = compact._create_batch_prompt("Astronomy", "hard", "modern", 5)
+    params = compact._completion_params(prompt, "gpt-3.5-turbo", 850, batch=True)
+    
+    assert prompt == "Topic: Astronomy\nEra: modern\nDifficulty: hard\nRespond with a JSON array with exactly 5 objects."
+    assert params["messages"][0]["content"] == COMPACT_SYSTEM_PROMPT
+    assert "follow every rule strictly" in compact._create_stricter_prompt("Astronomy", "hard", "any")
+
+def test_compact_prompts_send_fewer_tokens():
+    full, compact = generator("full"), generator("compact")
+    for g in (full, compact):
+        g._completion_params(g._create_trivia_prompt("Astronomy", "easy", "any"), "gpt-3.5-turbo", 500, batch=False)
+    
+    assert full.prompt_stats["full"]["requests"] == 1
+    assert compact.get_prompt_stats()["compact"]["avg_tokens"] < full.get_prompt_stats()["full"]["avg_tokens"]
+
+def test_system_prompt_follows_variant_and_explanation_mode():
+    compact = generator("compact")
+    assert generator("full")._system_prompt() == SYSTEM_PROMPT
+    assert compact._system_prompt() == COMPACT_SYSTEM_PROMPT
+    compact.defer_explanations = True
+    assert compact._system_prompt() == COMPACT_SHORT_SYSTEM_PROMPT
+    assert "explanation" not in COMPACT_SHORT_SYSTEM_PROMPT
+
+def test_counts_approximate_without_an_encoding(monkeypatch):
+    monkeypatch.setattr(token_counter, "_encoding", lambda model: None)
+    assert count_tokens("abcdefgh") == 2
+    assert count_tokens("abcdefghi") == 3
+
+def test_message_counts_include_chat_overhead(monkeypatch):
+    monkeypatch.setattr(token_counter, "_encoding", lambda model: None)
+    messages = [{"role": "system", "content": "abcd"}, {"role": "user", "content": None}]
+    assert count_message_tokens(messages) == 3 + (3 + 1) + (3 + 0)
+
+def test_benchmark_leaves_the_shared_generator_and_global_rng_alone(monkeypatch):
+    async def create_completion(self, prompt, model, difficulty, max_tokens=500, batch=False):
+        self._completion_params(prompt, model, max_tokens, batch)
+        content = json.dumps({"question": "Which planet is known as the Red Planet?",
+                              "options": {"A": "Venus", "B": "Mars", "C": "Jupiter", "D": "Saturn"},
+                              "correct_answer": "B"})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+    monkeypatch.setattr(TriviaGenerator, "_create_completion", create_completion)
+    args = argparse.Namespace(requests=3, batch=1, category="random", difficulty="easy",
+                              model="gpt-3.5-turbo", concurrency=2, seed=0)
+    variant, state = trivia_generator.prompt_variant, random.getstate()
+
+    result = asyncio.run(prompt_benchmark.run_variant("compact", args))
+
+    assert result["requests"] == 3 and result["prompt_tokens"] > 0
+    assert trivia_generator.prompt_variant == variant
+    assert "compact" not in trivia_generator.prompt_stats
+    assert random.getstate() == state
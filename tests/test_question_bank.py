@@ -0,0 +1,72 @@
+import asyncio
+
+from src.trivia.generator import TriviaGenerator, TriviaQuestion
+
+def question(text="Which planet is known as the Red Planet?"):
+    return TriviaQuestion(text, ["Venus", "Mars", "Jupiter", "Saturn"], "B", "Astronomy", "easy")
+
+async def settle(generator):
+    while generator._background_tasks:
+        await asyncio.gather(*generator._background_tasks)
+
+def test_saved_questions_get_bank_ids_and_dedupe_by_normalized_text(database):
+    generator = TriviaGenerator()
+    first, repeat = question(), question("  which planet is known as the RED planet?")
+    
+    async def run():
+        await generator._save_to_bank([first], "science", "easy", "any")
+        await generator._save_to_bank([repeat], "science", "easy", "any")
+        return await database.get_bank_candidates("science", "easy", "any")
+    
+    rows = asyncio.run(run())
+    
+    assert first.question_id is not None
+    assert repeat.question_id == first.question_id
+    assert [row["question_text"] for row in rows] == [first.question]
+
+def test_bank_question_is_served_and_counted(database):
+    generator = TriviaGenerator()
+    
+    async def run():
+        await generator._save_to_bank([question()], "science", "easy", "any")
+        served = await generator.get_question("science", "easy")
+        await settle(generator)
+        return served, await database.get_ready_question_counts()
+    
+    served, ready = asyncio.run(run())
+    
+    assert served.question == question().question
+    assert served.category == "Astronomy"
+    assert served.request_key == ("science", "easy", "any")
+    assert generator.serve_stats["bank"] == 1
+    assert ready == {}
+
+def test_question_served_before_it_was_banked_is_counted(database):
+    generator = TriviaGenerator()
+    streamed = question()
+    streamed.served = True  # handed out mid-stream, before the batch landed
+    
+    async def run():
+        await generator._save_to_bank([streamed, question("Which planet has the most moons?")], "science", "easy", "any")
+        await settle(generator)
+        return await database.get_ready_question_counts()
+    
+    assert asyncio.run(run()) == {("science", "easy", "any"): 1}
+
+def test_unserved_questions_are_preferred(database):
+    generator = TriviaGenerator()
+    questions = [question(f"Which planet is number {i} from the Sun?") for i in range(1, 9)]
+    
+    async def run():
+        await generator._save_to_bank(questions, "science", "easy", "any")
+        for served in questions[1:]:
+            await database.record_question_served(served.question_id)
+        picks = [await generator._get_bank_question(None, "science", "easy", "any") for _ in range(10)]
+        
+        await database.record_question_served(questions[0].question_id)
+        return picks, await generator._get_bank_question(None, "science", "easy", "any")
+    
+    picks, fallback = asyncio.run(run())
+    
+    assert {pick.question for pick in picks} == {questions[0].question}
+    assert fallback is not None  # served questions still fill in once none are left
@@ -0,0 +1,123 @@
+import asyncio
+
+from config.settings import settings
+from src.trivia.generator import TriviaGenerator, TriviaQuestion
+from src.trivia.seen import SeenFilter
+
+KEY = ("science", "easy", "any")
+
+def question(i):
+    return TriviaQuestion(f"Science question number {i}?", ["A", "BB", "CCC", "DDDD"], "A", "Physics", "easy")
+
+def test_take_is_first_in_first_out_and_counts_hits():
+    pool = TriviaGenerator().question_pool
+    for i in range(2):
+        pool.put(KEY, question(i))
+    
+    assert pool.take("Science", "EASY", "any").question == question(0).question
+    assert pool.take("science", "easy", "any").question == question(1).question
+    assert pool.take("science", "easy", "any") is None
+    assert pool.get_stats()["hits"] == 2
+    assert pool.get_stats()["misses"] == 1
+
+def test_questions_the_user_has_seen_are_left_for_others():
+    pool = TriviaGenerator().question_pool
+    for i in range(2):
+        pool.put(KEY, question(i))
+    seen = SeenFilter()
+    seen.add(question(0).text_hash)
+    
+    assert pool.take(*KEY, seen=seen).question == question(1).question
+    assert pool.take(*KEY, seen=seen) is None
+    assert pool.take(*KEY).question == question(0).question
+
+def test_custom_categories_are_not_pooled():
+    pool = TriviaGenerator().question_pool
+    pool.put(("star trek", "easy", "any"), question(0))
+    assert pool.take("star trek", "easy", "any") is None
+
+def test_put_refuses_a_full_key():
+    pool = TriviaGenerator().question_pool
+    assert all(pool.put(KEY, question(i)) for i in range(pool.max_size))
+    assert not pool.put(KEY, question(pool.max_size))
+
+def test_pool_is_off_when_generation_workers_run(monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_WORKERS_ENABLED", True)
+    pool = TriviaGenerator().question_pool
+    pool.put(KEY, question(0))
+    assert pool.take(*KEY) is None
+
+def test_watermarks_follow_the_demand_target():
+    pool = TriviaGenerator().question_pool
+    pool.high_watermark, pool.low_watermark = 5, 2
+    pool.targets[KEY] = 10
+    assert pool._watermarks(KEY) == (4, 10)
+    assert pool._watermarks(("history", "easy", "any")) == (2, 5)
+
+def test_refill_tops_up_to_the_high_watermark_in_batches():
+    generator = TriviaGenerator()
+    generator.batch_size = 2
+    pool = generator.question_pool
+    pool.high_watermark = 5
+    requested = []
+    
+    async def generate_questions(category, difficulty, era, n):
+        requested.append(n)
+        return [question(len(requested) * 10 + i) for i in range(n)]
+    
+    generator.generate_questions = generate_questions
+    pool._track(KEY)
+    asyncio.run(pool._refill(KEY))
+    
+    assert requested == [2, 2, 1]
+    assert len(pool.queues[KEY]) == 5
+
+def test_failed_refill_leaves_the_key_short():
+    generator = TriviaGenerator()
+    pool = generator.question_pool
+    
+    async def generate_questions(*args):
+        raise ConnectionError("upstream down")
+    
+    generator.generate_questions = generate_questions
+    pool._track(KEY)
+    asyncio.run(pool._refill(KEY))
+    
+    assert len(pool.queues[KEY]) == 0
+
+def test_take_below_the_low_watermark_wakes_the_refill_task():
+    pool = TriviaGenerator().question_pool
+    pool._wakeup = asyncio.Event()
+    pool.put(KEY, question(0))
+    
+    pool.take(*KEY)
+    
+    assert pool._wakeup.is_set()
+
+def started_pool(slots):
+    generator = TriviaGenerator()
+    generator.batch_size = 5
+    generator.demand.slots = slots
+    generator.demand.refreshed_at = float("inf")  # keep the test's history
+    generator.demand.days_observed = 7.0
+    keys = []
+    
+    async def generate_questions(category, difficulty, era, count):
+        keys.append((category, difficulty, era))
+        return [question(i) for i in range(count)]
+    
+    generator.generate_questions = generate_questions
+    
+    async def run():
+        generator.question_pool.start()
+        await asyncio.sleep(0.05)
+        await generator.question_pool.stop()
+    
+    asyncio.run(run())
+    return keys
+
+def test_start_without_history_generates_nothing():
+    assert started_pool({}) == []
+
+def test_start_warms_only_keys_with_demand():
+    assert started_pool({KEY: {(0, 0): 3}}) == [KEY]
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from config.settings import settings
+from src.trivia.generator import TriviaGenerator, TriviaQuestion
+
+def question():
+    return TriviaQuestion(
+        "Which planet is known as the Red Planet?",
+        ["Venus", "Mars", "Jupiter", "Saturn"],
+        "b",
+        "Astronomy",
+        "easy"
+    )
+
+def test_shuffled_copy_moves_the_options_and_keeps_the_answer():
+    original = question()
+    original.explanation_ready = asyncio.Event()
+    for _ in range(20):
+        copy = original.shuffled()
+        assert copy.options != original.options
+        assert sorted(copy.options) == sorted(original.options)
+        assert copy.options[ord(copy.correct_answer) - ord("A")] == "Mars"
+        assert copy.explanation_ready is None
+    assert original.options == ["Venus", "Mars", "Jupiter", "Saturn"]
+
+def reuse(database, monkeypatch, min_age_days, played_days_ago=None):
+    monkeypatch.setattr(settings, "REUSE_MIN_AGE_DAYS", min_age_days)
+    generator = TriviaGenerator()
+
+    async def run():
+        banked = question()
+        await generator._save_to_bank([banked], "science", "easy", "any")
+        if played_days_ago is not None:
+            await database.save_game_session({
+                "user_id": 1,
+                "question_id": banked.question_id,
+                "question_text": banked.question,
+                "correct_answer": "Mars",
+                "created_at": datetime.utcnow() - timedelta(days=played_days_ago)
+            })
+        return await generator._get_reused_question(1, "science", "easy", "any")
+
+    return asyncio.run(run())
+
+def test_aged_question_is_reused_shuffled(database, monkeypatch):
+    reused = reuse(database, monkeypatch, min_age_days=-1)
+
+    assert reused.question == question().question
+    assert reused.options != question().options
+    assert reused.options[ord(reused.correct_answer) - ord("A")] == "Mars"
+
+def test_recent_question_is_not_reused(database, monkeypatch):
+    assert reuse(database, monkeypatch, min_age_days=14) is None
+
+def test_question_the_user_played_recently_is_not_reused(database, monkeypatch):
+    assert reuse(database, monkeypatch, min_age_days=-1, played_days_ago=3) is None
+
+def test_question_played_before_the_cooldown_is_reused(database, monkeypatch):
+    assert reuse(database, monkeypatch, min_age_days=-1, played_days_ago=60) is not None
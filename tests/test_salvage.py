@@ -0,0 +1,32 @@
+import pytest
+
+from src.trivia.salvage import salvage_json
+
+def test_chatter_and_fences_around_the_json():
+    text = 'Sure! Here you go:\n```json\n{"question": "Which planet is red?", "correct_answer": "B"}\n```\nEnjoy!'
+    assert salvage_json(text) == {"question": "Which planet is red?", "correct_answer": "B"}
+
+def test_smart_quotes_and_trailing_commas():
+    text = '{“question”: “Which planet is red?”, "options": ["Mars", "Venus",],}'
+    assert salvage_json(text) == {"question": "Which planet is red?", "options": ["Mars", "Venus"]}
+
+def test_single_quoted_python_style_literal():
+    text = "{'question': 'Which planet is red?', 'valid': true, 'explanation': null}"
+    assert salvage_json(text) == {"question": "Which planet is red?", "valid": True, "explanation": None}
+
+def test_escaped_quotes_inside_strings_are_kept():
+    text = 'Answer: {"question": "Who said \\"Eureka\\"?", "correct_answer": "A"} done'
+    assert salvage_json(text) == {"question": 'Who said "Eureka"?', "correct_answer": "A"}
+
+def test_truncated_array_keeps_complete_items():
+    text = '[{"question": "Which planet is red?", "correct_answer": "B"}, {"question": "Which planet is lar'
+    assert salvage_json(text) == [{"question": "Which planet is red?", "correct_answer": "B"}, {}]
+
+def test_truncated_after_brace_inside_a_string():
+    # The last closing bracket is inside a string, so the bracket-trimmed body is invalid
+    text = '{"question": "What does } mean?", "explanation": "It closes a blo'
+    assert salvage_json(text) == {"question": "What does } mean?"}
+
+@pytest.mark.parametrize("text", ["", "no json at all", "{", "}{", "[@]"])
+def test_nothing_recoverable(text):
+    assert salvage_json(text) is None
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+import src.trivia.seen as seen_module
+from src.trivia.seen import SeenFilter, SeenQuestionTracker
+
+def text_hash(i):
+    return hashlib.sha1(f"question {i}".encode()).hexdigest()
+
+def test_added_hashes_are_seen():
+    seen = SeenFilter()
+    seen.add(text_hash(1))
+    
+    assert text_hash(1) in seen
+    assert text_hash(2) not in seen
+
+def test_round_trip_through_bytes():
+    seen = SeenFilter()
+    for i in range(10):
+        seen.add(text_hash(i))
+    
+    restored = SeenFilter(seen.to_bytes())
+    
+    assert restored.count == 10
+    assert all(text_hash(i) in restored for i in range(10))
+    assert len(seen.to_bytes()) == SeenFilter.HEADER.size + SeenFilter.BITS // 4
+
+def test_malformed_data_starts_empty():
+    seen = SeenFilter(b"\x01\x02\x03")
+    assert seen.count == 0
+    assert text_hash(1) not in seen
+
+def test_last_capacity_questions_survive_rotation():
+    seen = SeenFilter()
+    total = SeenFilter.CAPACITY * 2
+    for i in range(total):
+        seen.add(text_hash(i))
+    
+    # Both generations are full; the next add drops the older one
+    assert all(text_hash(i) in seen for i in range(total - SeenFilter.CAPACITY, total))
+
+def test_oldest_generation_is_forgotten():
+    seen = SeenFilter()
+    for i in range(SeenFilter.CAPACITY * 2 + 1):
+        seen.add(text_hash(i))
+    
+    forgotten = sum(text_hash(i) not in seen for i in range(SeenFilter.CAPACITY))
+    assert forgotten >= SeenFilter.CAPACITY * 0.99
+
+def test_false_positive_rate_when_saturated():
+    seen = SeenFilter()
+    for i in range(SeenFilter.CAPACITY * 2):
+        seen.add(text_hash(i))
+    assert seen.count == SeenFilter.CAPACITY
+    
+    trials = 20000
+    false_positives = sum(text_hash(-i - 1) in seen for i in range(trials))
+    assert false_positives / trials < 0.005
+
+def tracker(monkeypatch, save_every=3, flush_interval=3600, max_users=10):
+    saves = []
+    
+    async def get_seen_questions(user_id):
+        return None
+    
+    async def save_seen_questions(user_id, data):
+        saves.append(user_id)
+    
+    monkeypatch.setattr(seen_module, "db_manager", SimpleNamespace(
+        get_seen_questions=get_seen_questions, save_seen_questions=save_seen_questions
+    ))
+    seen = SeenQuestionTracker()
+    seen.save_every, seen.flush_interval, seen.max_users = save_every, flush_interval, max_users
+    return seen, saves
+
+async def mark(seen, user_id, count, start=0):
+    for i in range(start, start + count):
+        await seen.mark_seen(user_id, text_hash(i))
+    await asyncio.gather(*seen._pending_saves)
+
+def test_filters_are_saved_every_few_marks(monkeypatch):
+    seen, saves = tracker(monkeypatch)
+    asyncio.run(mark(seen, 1, 7))
+    
+    assert saves == [1, 1]
+    assert seen._dirty == {1: 1}
+
+def test_flush_saves_unsaved_filters(monkeypatch):
+    seen, saves = tracker(monkeypatch)
+    
+    async def run():
+        await mark(seen, 1, 1)
+        await mark(seen, 2, 2)
+        await seen.flush()
+    
+    asyncio.run(run())
+    assert sorted(saves) == [1, 2]
+    assert seen._dirty == {}
+
+def test_interval_triggers_a_flush(monkeypatch):
+    seen, saves = tracker(monkeypatch, flush_interval=0)
+    
+    async def run():
+        await mark(seen, 1, 1)
+        await seen._flush_task
+    
+    asyncio.run(run())
+    assert saves == [1]
+
+def test_evicted_filter_with_unsaved_marks_is_saved(monkeypatch):
+    seen, saves = tracker(monkeypatch, max_users=1)
+    
+    async def run():
+        await mark(seen, 1, 1)
+        await mark(seen, 2, 1)
+    
+    asyncio.run(run())
+    assert saves == [1]
+    assert list(seen.filters) == [2]
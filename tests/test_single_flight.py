@@ -0,0 +1,71 @@
+import asyncio
+
+from src.trivia.generator import TriviaGenerator, TriviaQuestion
+
+KEY = ("science", "easy", "any")
+
+def flight_generator(batch_size, calls):
+    generator = TriviaGenerator()
+    generator.batch_size = batch_size
+    
+    async def generate_questions(category, difficulty, era, n, on_question=None):
+        batch = len(calls)
+        calls.append(n)
+        questions = []
+        for i in range(n):
+            await asyncio.sleep(0)
+            question = TriviaQuestion(f"Batch {batch} question {i}?", ["A", "BB", "CCC", "DDDD"], "A", "Physics", difficulty)
+            questions.append(question)
+            on_question(question)
+        return questions
+    
+    generator.generate_questions = generate_questions
+    return generator
+
+def request_concurrently(generator, count):
+    async def run():
+        return await asyncio.gather(*(generator._generate_shared(*KEY) for _ in range(count)))
+    return asyncio.run(run())
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+    generator = flight_generator(5, calls)
+    
+    questions = request_concurrently(generator, 3)
+    
+    assert calls == [5]
+    assert len({q.question for q in questions}) == 3
+    assert generator.batch_stats["coalesced"] == 2
+    # The two questions nobody claimed go to the pool
+    assert len(generator.question_pool.queues[KEY]) == 2
+    assert generator._flights == {}
+
+def test_waiters_left_over_start_the_next_batch():
+    calls = []
+    generator = flight_generator(2, calls)
+    
+    questions = request_concurrently(generator, 4)
+    
+    assert calls == [2, 2]
+    assert len({q.question for q in questions}) == 4
+    # Requests 2-4 joined the first batch; joining the second doesn't count again
+    assert generator.batch_stats["coalesced"] == 3
+
+def test_failed_batch_fails_every_waiter():
+    generator = TriviaGenerator()
+    calls = []
+    
+    async def generate_questions(*args, **kwargs):
+        calls.append(args)
+        await asyncio.sleep(0)
+        raise ConnectionError("upstream down")
+    
+    generator.generate_questions = generate_questions
+    
+    async def run():
+        return await asyncio.gather(*(generator._generate_shared(*KEY) for _ in range(3)), return_exceptions=True)
+    
+    results = asyncio.run(run())
+    
+    assert len(calls) == 1
+    assert all(isinstance(result, ConnectionError) for result in results)
@@ -0,0 +1,121 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import src.trivia.generator as generator_module
+from src.trivia.generator import TriviaGenerator
+from src.trivia.streaming import IncrementalJSONParser
+from src.utils.circuit_breaker import CircuitBreaker
+
+DOCUMENT = json.dumps([
+    {"question": 'Who said "Eureka"?', "options": {"A": "Archimedes", "B": "Euclid"}, "correct_answer": "A"},
+    {"question": "Path C:\\temp\\new?", "score": -1.5e3, "ok": True, "note": None, "tags": []}
+])
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    return parser
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(DOCUMENT)])
+def test_any_chunking_matches_json_loads(size):
+    parser = feed_in_chunks(DOCUMENT, size)
+    assert parser.done
+    assert parser.root == json.loads(DOCUMENT)
+
+def test_escaped_quote_split_across_chunks():
+    text = '{"question": "He said \\"hi\\" twice"}'
+    split = text.index('\\"') + 1  # chunk ends right after the backslash
+    
+    parser = IncrementalJSONParser()
+    parser.feed(text[:split])
+    assert parser.root == {}
+    parser.feed(text[split:])
+    
+    assert parser.root == {"question": 'He said "hi" twice'}
+
+def test_unicode_escapes():
+    parser = feed_in_chunks('["caf\\u00e9", "\\ud83d\\ude00"]', 4)
+    assert parser.root == ["café", "😀"]
+
+def test_partial_document_exposes_complete_fields_only():
+    parser = IncrementalJSONParser()
+    parser.feed('[{"question": "Which planet is red?", "correct_answer": "B"}, {"question": "Which pla')
+    
+    first, second = parser.root
+    assert first == {"question": "Which planet is red?", "correct_answer": "B"}
+    assert parser.is_complete(first)
+    assert second == {}  # the string hasn't finished arriving
+    assert not parser.is_complete(second)
+    assert not parser.done
+
+def test_number_only_appears_once_delimited():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": 12')
+    assert parser.root == {}
+    parser.feed('3}')
+    assert parser.root == {"a": 123}
+
+def test_code_fence_and_trailing_text_are_ignored():
+    parser = feed_in_chunks('```json\n{"a": [1, 2]}\n```\nHope that helps!', 5)
+    assert parser.done
+    assert parser.root == {"a": [1, 2]}
+
+@pytest.mark.parametrize("text", ['{"a" 1}', '{a: 1}', '[1 2]', '[tru]', '{"a": @}'])
+def test_malformed_json_raises(text):
+    with pytest.raises(ValueError):
+        IncrementalJSONParser().feed(text)
+
+class FakeStream:
+    def __init__(self, chunks, error=None, delay=0):
+        self.chunks = chunks
+        self.error = error
+        self.delay = delay
+    
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield chunk
+        if self.error:
+            raise self.error
+    
+    async def close(self):
+        pass
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None, model="m")
+
+def stream_through(monkeypatch, stream):
+    breaker = CircuitBreaker("test")
+    monkeypatch.setattr(generator_module, "openai_breaker", breaker)
+    generator = TriviaGenerator()
+    
+    async def create(**params):
+        return stream
+    
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    
+    async def consume():
+        return [c async for c in generator._stream_completion("prompt", "m", "easy")]
+    
+    return breaker, consume
+
+def test_breaker_records_a_stream_when_it_finishes(monkeypatch):
+    breaker, consume = stream_through(monkeypatch, FakeStream([chunk("[")] * 3))
+    assert len(asyncio.run(consume())) == 3
+    assert list(breaker._outcomes) == [False]
+
+def test_breaker_counts_a_stream_failing_midway(monkeypatch):
+    breaker, consume = stream_through(monkeypatch, FakeStream([chunk("[")], error=ConnectionError("reset")))
+    with pytest.raises(ConnectionError):
+        asyncio.run(consume())
+    assert list(breaker._outcomes) == [True]
+
+def test_breaker_counts_a_stalled_stream_as_slow(monkeypatch):
+    breaker, consume = stream_through(monkeypatch, FakeStream([chunk("[")] * 2, delay=0.05))
+    breaker.slow_call_seconds = 0.04
+    asyncio.run(consume())
+    assert list(breaker._outcomes) == [True]
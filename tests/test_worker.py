@@ -0,0 +1,94 @@
+import asyncio
+
+import src.trivia.worker as worker_module
+from src.trivia.generator import TriviaGenerator, TriviaQuestion
+from src.trivia.worker import GenerationWorker
+from src.utils.circuit_breaker import CircuitBreaker
+
+KEY = ("science", "easy", "any")
+
+def question(i):
+    return TriviaQuestion(f"Which element is number {i}?", ["A1", "B22", "C333", "D4444"], "A", "Chemistry", "easy")
+
+def make_worker(monkeypatch, worker_id="worker-1"):
+    breaker = CircuitBreaker("test")
+    monkeypatch.setattr(worker_module, "openai_breaker", breaker)
+    generator = TriviaGenerator()
+    generator.batch_size = 3
+    calls = []
+
+    async def generate_questions(category, difficulty, era, count):
+        calls.append(((category, difficulty, era), count))
+        questions = [question(len(calls) * 10 + i) for i in range(count)]
+        await generator._save_to_bank(questions, category, difficulty, era)
+        return questions
+
+    generator.generate_questions = generate_questions
+    return GenerationWorker(generator, worker_id), calls, breaker
+
+def test_fill_generates_batches_up_to_the_deficit_and_releases_the_key(database, monkeypatch):
+    worker, calls, _ = make_worker(monkeypatch)
+
+    async def run():
+        generated = await worker._fill(KEY, 7)
+        return generated, await database.claim_generation_key(*KEY, "worker-2", 60)
+
+    generated, other_claimed = asyncio.run(run())
+
+    assert generated == 7
+    assert [count for _, count in calls] == [3, 3, 1]
+    assert worker.stats["batches"] == 3
+    assert other_claimed
+
+def test_key_held_by_another_worker_is_contended(database, monkeypatch):
+    worker, calls, _ = make_worker(monkeypatch)
+
+    async def run():
+        await database.claim_generation_key(*KEY, "worker-2", 60)
+        return await worker._fill(KEY, 5)
+
+    assert asyncio.run(run()) == 0
+    assert calls == []
+    assert worker.stats["contended"] == 1
+
+def test_expired_claim_can_be_taken_over(database, monkeypatch):
+    worker, calls, _ = make_worker(monkeypatch)
+
+    async def run():
+        await database.claim_generation_key(*KEY, "worker-2", -1)
+        return await worker._fill(KEY, 2)
+
+    assert asyncio.run(run()) == 2
+    assert worker.stats["claimed"] == 1
+
+def test_fill_stops_on_a_failed_batch(database, monkeypatch):
+    worker, _, _ = make_worker(monkeypatch)
+
+    async def generate_questions(*args):
+        raise ConnectionError("upstream down")
+
+    worker.generator.generate_questions = generate_questions
+
+    assert asyncio.run(worker._fill(KEY, 5)) == 0
+    assert worker.stats["failures"] == 1
+
+def test_fill_skips_while_the_breaker_is_open(database, monkeypatch):
+    worker, calls, breaker = make_worker(monkeypatch)
+    breaker._open()
+
+    assert asyncio.run(worker._fill(KEY, 5)) == 0
+    assert calls == []
+    assert worker.stats["claimed"] == 0
+
+def test_pass_fills_only_keys_below_target(database, monkeypatch):
+    worker, calls, _ = make_worker(monkeypatch)
+    worker.target = 2
+    stocked = ("history", "easy", "any")
+    worker.keys = lambda: [KEY, stocked]
+
+    async def run():
+        await worker.generator._save_to_bank([question(1), question(2)], *stocked)
+        return await worker.run_pass()
+
+    assert asyncio.run(run()) == 2
+    assert calls == [(KEY, 2)]